@@ -0,0 +1,56 @@
+# --Import time benchmark for the Physics package----------
+# Run with: python -m physics.benchmarks.import_time
+#
+# Each case is timed in a fresh python process.  'lazy' is what importing physics.value costs now, while 'eager' also
+# builds the unit tables and imports tensorflow (if installed), which is what every import used to pay.  The 'cached'
+# case loads the UnitRegistry from the on-disk registry cache (see physics.registry_cache).
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+cases = {
+    'baseline (python + pint + numpy)': 'import pint, numpy',
+    'lazy (import physics.value)': 'import physics.value',
+    'eager (+ unit tables and tensorflow)': 'import physics.value, physics.units, physics.conf;'
+                                            'physics.units.unit_tables(); physics.conf.import_tf()',
+}
+
+
+def time_import(statement, repeat=5, env=None):
+    """
+    Times a statement in a fresh python process
+
+    Args:
+        statement (str): The python statement to run
+        repeat (int, optional): The number of processes to time.  Default is 5
+        env (dict, optional): Extra environment variables for the process
+
+    Returns:
+        float of the median time in seconds
+    """
+    process_env = dict(os.environ, **(env or {}))
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', statement], env=process_env)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main(repeat=5):
+    results = {name: time_import(statement, repeat=repeat) for name, statement in cases.items()}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {'PHYSICS_CACHE_DIR': cache_dir}
+        # the first process writes the cache
+        time_import(cases['lazy (import physics.value)'], repeat=1, env=env)
+        results['cached (lazy + registry cache)'] = time_import(cases['lazy (import physics.value)'], repeat=repeat, env=env)
+    for name, seconds in results.items():
+        print('{0:<40} {1:8.1f} ms'.format(name, seconds * 1e3))
+    return results
+
+
+if __name__ == '__main__':
+    main()
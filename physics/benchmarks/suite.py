@@ -0,0 +1,225 @@
+# --Benchmark suite for the Physics package----------
+# Run with: python -m physics.benchmarks.suite [--output results.json] [--baseline baseline.json]
+#
+# Each benchmark times an operation of the package and checks its result against the same operation with plain Pint
+# Quantities (the oracle), so a faster path can not silently give a different answer.  The results are written as JSON
+# and, if a baseline file from an earlier run is given, compared to it.  The exit code is 1 if a result is wrong or a
+# benchmark is slower than the baseline by more than the tolerance.
+#
+# To store a baseline:  python -m physics.benchmarks.suite --output baseline.json
+# To check a release:   python -m physics.benchmarks.suite --baseline baseline.json
+import argparse
+import json
+import operator
+import pickle
+import platform
+import sys
+import time
+import numpy as np
+import pint
+from physics.value import Value, ValueArray, MetaValue, ureg
+from physics.benchmarks.import_time import time_import
+
+
+class BenchmarkMetaValue(MetaValue):
+    # a MetaValue holding a Value, like SemiPy PhysicalProperty
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _quantity(result):
+    # give the result of a physics operation as a Pint Quantity (or the result itself if it has no unit)
+    if isinstance(result, (Value, ValueArray, MetaValue)):
+        return ureg.Quantity(np.asarray(result.magnitude), result.unit)
+    if isinstance(result, (list, tuple)):
+        return [_quantity(r) for r in result]
+    return result
+
+
+def matches(result, expected, rtol=1e-9):
+    """
+    Checks the result of a physics operation against the result of the Pint oracle
+
+    Args:
+        result: The result of the physics operation (Value, ValueArray, list of these, bool or np.ndarray)
+        expected: The result of the same operation with Pint Quantities
+
+    Returns:
+        bool
+    """
+    result = _quantity(result)
+    if isinstance(expected, list):
+        return len(result) == len(expected) and all(matches(r, e, rtol) for r, e in zip(result, expected))
+    if isinstance(expected, ureg.Quantity):
+        if not isinstance(result, ureg.Quantity) or result.dimensionality != expected.dimensionality:
+            return False
+        return bool(np.allclose(result.to(expected.units).magnitude, expected.magnitude, rtol=rtol, atol=0.0))
+    return bool(np.all(np.asarray(result) == np.asarray(expected)))
+
+
+def _cases():
+    # give {name: (physics function, pint function)}, both are called with no arguments
+    v, mv, a = Value(2.0, ureg.volt), Value(500.0, ureg.millivolt), Value(4.0, ureg.amp)
+    qv, qmv, qa = ureg.Quantity(2.0, ureg.volt), ureg.Quantity(500.0, ureg.millivolt), ureg.Quantity(4.0, ureg.amp)
+    cases = {
+        'construct Value': (lambda: Value(1.5, ureg.volt), lambda: ureg.Quantity(1.5, ureg.volt)),
+    }
+
+    # the arithmetic operators, with different prefixes for add and sub
+    for name, op, x, y, qx, qy in [('add', operator.add, v, mv, qv, qmv),
+                                   ('sub', operator.sub, v, mv, qv, qmv),
+                                   ('mul', operator.mul, v, a, qv, qa),
+                                   ('truediv', operator.truediv, v, a, qv, qa),
+                                   ('mul float', operator.mul, v, 3.0, qv, 3.0)]:
+        cases['Value ' + name] = (lambda op=op, x=x, y=y: op(x, y), lambda op=op, x=qx, y=qy: op(x, y))
+    cases['Value pow'] = (lambda: v ** 2, lambda: qv ** 2)
+    cases['Value neg'] = (lambda: -v, lambda: -qv)
+    cases['Value abs'] = (lambda: abs(v), lambda: abs(qv))
+
+    # the comparison operators, between prefixes
+    for name, op in [('eq', operator.eq), ('ne', operator.ne), ('lt', operator.lt), ('le', operator.le),
+                     ('gt', operator.gt), ('ge', operator.ge)]:
+        cases['Value ' + name] = (lambda op=op: op(v, mv), lambda op=op: op(qv, qmv))
+
+    # array_like at several sizes
+    for size in [10, 1000, 100000]:
+        array = np.linspace(0, 1, size)
+        cases['array_like {0}'.format(size)] = (lambda array=array: Value.array_like(array, ureg.volt),
+                                                lambda array=array: ureg.Quantity(array, ureg.volt))
+
+    # unit conversions
+    big = Value(3000.0, ureg.volt)
+    ohm = Value(2.0, ureg.amp) * Value(3.0, ureg.ohm)
+    cases['adjust_unit'] = (lambda: v.adjust_unit(ureg.millivolt), lambda: qv.to(ureg.millivolt))
+    cases['base_units'] = (lambda: v.base_units(), lambda: qv.to_base_units())
+    cases['reduced_units'] = (lambda: ohm.reduced_units(),
+                              lambda: ureg.Quantity(6.0, ureg.amp * ureg.ohm).to_reduced_units())
+    cases['compact_units'] = (lambda: big.compact_units(), lambda: ureg.Quantity(3000.0, ureg.volt).to_compact())
+
+    # MetaValue delegation
+    meta = BenchmarkMetaValue(Value(2.0, ureg.volt))
+    cases['MetaValue mul'] = (lambda: meta * a, lambda: qv * qa)
+    cases['MetaValue add'] = (lambda: meta + mv, lambda: qv + qmv)
+    cases['MetaValue rtruediv'] = (lambda: a / meta, lambda: qa / qv)
+
+    # pickling
+    values = [Value(float(i), ureg.volt) for i in range(1000)]
+    quantities = [ureg.Quantity(float(i), ureg.volt) for i in range(1000)]
+    cases['pickle Value'] = (lambda: pickle.loads(pickle.dumps(v)), lambda: qv)
+    cases['pickle 1000 Values'] = (lambda: pickle.loads(pickle.dumps(values)), lambda: quantities)
+    return cases
+
+
+def time_call(function, min_time=0.2, repeat=3):
+    """
+    Times a function with no arguments, calling it enough times to run for at least min_time
+
+    Args:
+        function (callable): The function
+        min_time (float, optional): The minimum seconds for one repeat.  Default is 0.2
+        repeat (int, optional): The number of repeats.  Default is 3
+
+    Returns:
+        float of the best seconds per call
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(number):
+            function()
+        seconds = time.perf_counter() - start
+        if seconds >= min_time:
+            break
+        number *= 2
+    best = seconds / number
+    for r in range(repeat - 1):
+        start = time.perf_counter()
+        for i in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run(names=None, min_time=0.2, repeat=3, include_import=True):
+    """
+    Runs the benchmarks
+
+    Args:
+        names (iterable, optional): The names of the benchmarks to run.  Default is all
+        min_time (float, optional): The minimum seconds for one repeat of each benchmark.  Default is 0.2
+        repeat (int, optional): The number of repeats.  Default is 3
+        include_import (bool, optional): Also time importing physics.value in a new process.  Default is True
+
+    Returns:
+        dict of the results, with the 'seconds' per call and if the result 'matches' the Pint oracle
+    """
+    results = {}
+    if include_import and (names is None or 'import physics.value' in names):
+        # the import runs in a new process, so the oracle is that the process ran without errors
+        results['import physics.value'] = {'seconds': time_import('import physics.value', repeat=repeat),
+                                           'matches': True}
+    for name, (function, oracle) in _cases().items():
+        if names is not None and name not in names:
+            continue
+        results[name] = {'seconds': time_call(function, min_time, repeat), 'matches': matches(function(), oracle())}
+    return results
+
+
+def compare(results, baseline, tolerance=1.25):
+    """
+    Compares results to a baseline
+
+    Args:
+        results (dict): The results of run
+        baseline (dict): The results of an earlier run
+        tolerance (float, optional): The ratio of the times above which a benchmark is a regression.  Default is 1.25
+
+    Returns:
+        dict of the name of each regression to its ratio of the time to the baseline
+    """
+    regressions = {}
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['seconds'] / baseline[name]['seconds']
+            if ratio > tolerance:
+                regressions[name] = ratio
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the Physics package against Pint')
+    parser.add_argument('--output', help='the JSON file to write the results to')
+    parser.add_argument('--baseline', help='a JSON file from an earlier run to compare to')
+    parser.add_argument('--tolerance', type=float, default=1.25, help='the slowdown ratio that is a regression')
+    parser.add_argument('--min-time', type=float, default=0.2, help='the minimum seconds for each timing')
+    args = parser.parse_args(args)
+
+    results = run(min_time=args.min_time)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+
+    for name, result in results.items():
+        line = '{0:<24} {1:12.3f} us'.format(name, result['seconds'] * 1e6)
+        if name in baseline:
+            line += '  {0:6.2f}x baseline'.format(result['seconds'] / baseline[name]['seconds'])
+        if not result['matches']:
+            line += '  WRONG RESULT'
+        if name in regressions:
+            line += '  REGRESSION'
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_version(), 'pint': pint.__version__, 'numpy': np.__version__,
+                       'results': results}, f, indent=2, sort_keys=True)
+
+    wrong = [name for name, result in results.items() if not result['matches']]
+    return 1 if wrong or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
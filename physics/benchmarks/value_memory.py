@@ -0,0 +1,59 @@
+# --Memory and allocation benchmark for Value----------
+# Run with: python -m physics.benchmarks.value_memory
+#
+# Builds 1M Values with the public constructor and 1M Values from arithmetic and reports the time, the memory held per
+# Value (tracemalloc) and the number of memory blocks allocated per Value.
+import gc
+import sys
+import time
+import tracemalloc
+from physics.value import Value, ureg
+
+
+def measure(build, n):
+    """
+    Measures building n Values
+
+    Args:
+        build (callable): Function that takes n and returns a list of n Values
+        n (int): The number of Values
+
+    Returns:
+        dict with the seconds, bytes per Value and blocks per Value
+    """
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    values = build(n)
+    seconds = time.perf_counter() - start
+    blocks = sys.getallocatedblocks() - blocks
+
+    # measure the memory in a second pass, since tracemalloc slows down the allocations
+    del values
+    gc.collect()
+    tracemalloc.start()
+    values = build(n)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del values
+
+    return {'seconds': seconds, 'bytes_per_value': size / n, 'blocks_per_value': blocks / n}
+
+
+def main(n=1000000):
+    unit = ureg.volt
+    two = Value(2.0, ureg.ampere)
+    cases = {
+        'Value(x, unit)': lambda n: [Value(float(i), unit) for i in range(n)],
+        'Value * Value': lambda n: [two * two for i in range(n)],
+    }
+    results = {}
+    for name, build in cases.items():
+        results[name] = measure(build, n)
+        print('{0:<16} {1:7.2f} s {2:8.1f} bytes/Value {3:6.2f} blocks/Value'.format(
+            name, results[name]['seconds'], results[name]['bytes_per_value'], results[name]['blocks_per_value']))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,51 @@
 # --The configuration file for Physics----------
+import importlib.util
+import os
 
 
 # --Tensorflow Flags------------------
-tf_flag = True
-try:
-    import tensorflow as tf
-    tf_dtype = tf.float32
+# tensorflow takes seconds to import, so only check that it is installed here.  It is imported by import_tf() the
+# first time a named Value needs a placeholder.
+tf_flag = importlib.util.find_spec('tensorflow') is not None
+tf = None
 
-except:
-    tf_flag = False
 
+def import_tf():
+    """Imports tensorflow the first time it is needed.  If the import fails then tf_flag is set to False.
 
+        Returns:
+            :return module: The tensorflow module, or None if tensorflow could not be imported
+    """
+    global tf, tf_flag, tf_dtype
+    if tf is None and tf_flag:
+        try:
+            import tensorflow
+            tf = tensorflow
+            tf_dtype = tf.float32
+        except Exception:
+            tf_flag = False
+    return tf
+
+
+def __getattr__(name):
+    # tf_dtype is only defined once tensorflow is imported
+    if name == 'tf_dtype' and import_tf() is not None:
+        return tf_dtype
+    raise AttributeError('module {0} has no attribute {1}'.format(__name__, name))
+
+
+# --Unit Cache Flags------------------
+# the max number of entries in the unit algebra cache used by the Value operators
+unit_cache_size = 1024
+# the max number of unit strings cached by physics.units.str_to_pint (and of units by pint_to_str)
+unit_string_cache_size = 4096
+
+# --Registry Cache Flags------------------
+# the directory used to cache the parsed Pint UnitRegistry and the unit tables between processes.  None turns the cache
+# off.  Can also be set with the PHYSICS_CACHE_DIR environment variable
+registry_cache_dir = os.environ.get('PHYSICS_CACHE_DIR', None)
+
+# --Profiling Flags------------------
+# profile the Value allocations, operators and conversions from import and print a report when python exits (see
+# physics.profiling).  Can also be set with the PHYSICS_PROFILE environment variable
+profile = os.environ.get('PHYSICS_PROFILE', '') not in ('', '0')
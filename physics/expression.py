@@ -0,0 +1,304 @@
+# H1 -- Deferred expressions
+# **************************
+# The Value operators compute a new Value at every step.  An Expression records the operations instead, so a formula
+# can be built once and then evaluated over whole arrays of inputs in one numpy pass.  The units are checked and the
+# scale factors folded in while the graph is built, so evaluating only does float math.
+#
+# The Value, MetaValue and ValueArray operators return NotImplemented for an Expression, so existing formulas work
+# unchanged when they are given Inputs:
+#
+#     def ohm(current, resistance):
+#         return current * resistance
+#
+#     voltage = ohm(Input('I', ureg.amp), Input('R', ureg.ohm))
+#     voltage(I=np.linspace(0, 1, 1000), R=Value(2, ureg.ohm))
+#     ValueArray([0., ..., 2.], ampere * ohm)
+import numpy as np
+import pint
+from physics.units import ureg, unit_algebra, convert
+from physics.value import ValueArray, SuperValue, DeferredValue, _new_value
+
+# the numpy functions for each operation
+_functions = {'mul': np.multiply,
+              'div': np.divide,
+              'add': np.add,
+              'sub': np.subtract,
+              'neg': np.negative,
+              'abs': np.abs,
+              'pow': np.power,
+              'sqrt': np.sqrt}
+
+
+class Expression(DeferredValue):
+
+    """A node of a deferred expression graph.  Use Input for the variables of the graph, the other nodes are made by
+    the operators.
+
+        Args:
+            op (str): The operation, 'input', 'const' or a key of _functions
+            args (tuple): The Expressions that are the operands
+            unit (pint.unit._Unit): The unit of the result
+            factor (float, optional): The scale factor applied to the result of the operation
+            data: The name of an 'input', the magnitude of a 'const' or the exponent of a 'pow'
+    """
+
+    __slots__ = ('op', 'args', 'unit', 'factor', 'data', '_plan')
+
+    # larger than the ValueArray __array_priority__, so numpy defers to the Expression operators
+    __array_priority__ = 19
+
+    def __init__(self, op, args, unit, factor=1.0, data=None):
+        self.op = op
+        self.args = args
+        self.unit = unit
+        self.factor = factor
+        self.data = data
+        self._plan = None
+
+    # --building the graph------------------
+
+    def _operand(self, other, unit):
+        # give other as an Expression.  Plain numbers have the given unit, like in the Value operators
+        if isinstance(other, Expression):
+            return other
+        if isinstance(other, (SuperValue, ValueArray)):
+            return constant(other.magnitude, other.unit)
+        return constant(other, unit)
+
+    def _product(self, op, a, b):
+        unit, factor = unit_algebra(op, a.unit, b.unit)
+        if a.op == 'const' and b.op == 'const':
+            return constant(_functions[op](a.data, b.data) * factor, unit)
+        return Expression(op, (a, b), unit, factor)
+
+    def _sum(self, op, a, b):
+        unit, factor = unit_algebra('add', a.unit, b.unit)
+        if unit is None:
+            raise pint.DimensionalityError(a.unit, b.unit)
+        assert factor is not None, 'Units with an offset (i.e. degC) can not be added in an Expression'
+        if factor != 1.0:
+            b = b._scale(factor, unit)
+        if a.op == 'const' and b.op == 'const':
+            return constant(_functions[op](a.data, b.data), unit)
+        return Expression(op, (a, b), unit)
+
+    def _scale(self, factor, unit):
+        # give this Expression multiplied by factor, folding the factor into the node if possible
+        if self.op == 'const':
+            return constant(self.data * factor, unit)
+        if self.op in ('mul', 'div', 'pow', 'sqrt'):
+            return Expression(self.op, self.args, unit, self.factor * factor, self.data)
+        return Expression('mul', (self, constant(factor, ureg.dimensionless)), unit)
+
+    def __mul__(self, other):
+        return self._product('mul', self, self._operand(other, ureg.dimensionless))
+
+    def __rmul__(self, other):
+        return self._product('mul', self._operand(other, ureg.dimensionless), self)
+
+    def __truediv__(self, other):
+        return self._product('div', self, self._operand(other, ureg.dimensionless))
+
+    def __rtruediv__(self, other):
+        return self._product('div', self._operand(other, ureg.dimensionless), self)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __add__(self, other):
+        return self._sum('add', self, self._operand(other, self.unit))
+
+    def __radd__(self, other):
+        return self._sum('add', self._operand(other, self.unit), self)
+
+    def __sub__(self, other):
+        return self._sum('sub', self, self._operand(other, self.unit))
+
+    def __rsub__(self, other):
+        return self._sum('sub', self._operand(other, self.unit), self)
+
+    def __neg__(self):
+        if self.op == 'const':
+            return constant(-self.data, self.unit)
+        return Expression('neg', (self,), self.unit)
+
+    def __abs__(self):
+        if self.op == 'const':
+            return constant(np.abs(self.data), self.unit)
+        return Expression('abs', (self,), self.unit)
+
+    def __pow__(self, power, modulo=None):
+        assert not isinstance(power, (Expression, SuperValue)), 'The power of an Expression must be a number'
+        unit, factor = unit_algebra('pow', self.unit, power)
+        if self.op == 'const':
+            return constant(self.data ** power * factor, unit)
+        return Expression('pow', (self,), unit, factor, power)
+
+    def sqrt(self):
+        unit, factor = unit_algebra('pow', self.unit, 0.5)
+        if self.op == 'const':
+            return constant(np.sqrt(self.data) * factor, unit)
+        return Expression('sqrt', (self,), unit, factor)
+
+    def __str__(self):
+        if self.op == 'input':
+            return self.data
+        if self.op == 'const':
+            return '{0} {1}'.format(self.data, self.unit)
+        return '{0}({1})'.format(self.op, ', '.join(str(arg) for arg in self.args))
+
+    def __repr__(self):
+        return 'Expression({0}, {1})'.format(self, self.unit)
+
+    # --evaluating the graph------------------
+
+    @property
+    def inputs(self):
+        """Gives a dict of the names and units of the Inputs of the graph"""
+        return {step[1]: step[2] for step in self.plan() if step[0] == 'input'}
+
+    def plan(self):
+        """
+        Gives the steps to evaluate the graph.  Each step is (op, data, unit, factor, indices of the operand steps).
+        Equal subexpressions are only one step, so they are only computed once.
+
+        Returns:
+            list of tuples, the last step is the result
+        """
+        if self._plan is None:
+            steps = []
+            keys = {}
+            index = {}
+
+            def visit(node):
+                if id(node) in index:
+                    return index[id(node)]
+                args = tuple(visit(arg) for arg in node.args)
+                data = node.data
+                if node.op == 'const':
+                    key = (node.op, np.asarray(data).tobytes(), np.shape(data), node.unit)
+                elif node.op == 'input':
+                    key = (node.op, data)
+                else:
+                    key = (node.op, data, node.unit, node.factor, args)
+                if key not in keys:
+                    keys[key] = len(steps)
+                    steps.append((node.op, data, node.unit, node.factor, args))
+                elif node.op == 'input':
+                    assert steps[keys[key]][2] == node.unit, 'The input {0} is used with the units {1} and {2}'.format(
+                        data, steps[keys[key]][2], node.unit)
+                index[id(node)] = keys[key]
+                return keys[key]
+
+            visit(self)
+            self._plan = steps
+        return self._plan
+
+    def evaluate(self, unit=None, **inputs):
+        """
+        Evaluates the graph for arrays (or single values) of the inputs in one numpy pass
+
+        Args:
+            unit (ureg.unit, optional): The unit of the result.  Default is the unit of the Expression
+            **inputs: The value of each Input by name.  Can be a Value, MetaValue, ValueArray, a collection of Values
+                or a number or np.ndarray, which is taken to be in the unit of the Input
+
+        Returns:
+            ValueArray, or a Value if all the inputs are single values
+        """
+        results = []
+        for op, data, step_unit, factor, args in self.plan():
+            if op == 'input':
+                assert data in inputs, 'You must give a value for the input {0}'.format(data)
+                result = _magnitude(inputs[data], step_unit)
+            elif op == 'const':
+                result = data
+            elif op == 'pow':
+                result = results[args[0]] ** data
+            else:
+                result = _functions[op](*[results[i] for i in args])
+            if factor != 1.0:
+                result = result * factor
+            results.append(result)
+
+        magnitude, result_unit = results[-1], self.unit
+        if unit is not None and unit != self.unit:
+            magnitude, result_unit = convert(magnitude, self.unit, unit)
+        if np.ndim(magnitude) == 0:
+            return _new_value(float(magnitude), result_unit)
+        return ValueArray(magnitude, result_unit)
+
+    __call__ = evaluate
+
+
+def _magnitude(value, unit):
+    # give the magnitude of an input in unit
+    if isinstance(value, (SuperValue, ValueArray)):
+        if value.unit == unit:
+            return value.magnitude
+        return convert(np.asarray(value.magnitude, dtype=np.float64), value.unit, unit)[0]
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return value
+    # np.asarray would drop the units of a list of Values, since Value is a float
+    array = np.asarray(value, dtype=object)
+    if array.size > 0 and isinstance(array.flat[0], SuperValue):
+        return ValueArray.from_values(array, unit).magnitude
+    return array.astype(np.float64)
+
+
+def Input(name, unit=ureg.dimensionless):
+    """
+    Makes a variable of an Expression
+
+    Args:
+        name (str): The name of the input, used as the keyword in Expression.evaluate
+        unit (ureg.unit, optional): The unit of the input.  Default is dimensionless
+
+    Returns:
+        Expression
+    """
+    assert isinstance(unit, pint.unit._Unit), 'You must create an Input with a unit form physics.value.ureg.'
+    return Expression('input', (), unit, data=name)
+
+
+def constant(magnitude, unit=ureg.dimensionless):
+    """
+    Makes a constant of an Expression
+
+    Args:
+        magnitude (float or np.ndarray): The magnitude
+        unit (ureg.unit, optional): The unit.  Default is dimensionless
+
+    Returns:
+        Expression
+    """
+    if isinstance(magnitude, np.ndarray):
+        magnitude = np.array(magnitude, dtype=np.float64)
+    else:
+        magnitude = float(magnitude)
+    return Expression('const', (), unit, data=magnitude)
+
+
+def deferred(function, **units):
+    """
+    Builds the Expression of a formula by calling it with an Input for each keyword
+
+    Args:
+        function (callable): The formula, made of the Value operators
+        **units: The unit of each argument of the function by name
+
+    Returns:
+        Expression
+
+    For Example::
+        def power(current, resistance):
+            return current ** 2 * resistance
+
+        expression = deferred(power, current=ureg.amp, resistance=ureg.ohm)
+        expression(current=np.linspace(0, 1, 100), resistance=[Value(1, ureg.ohm), Value(2, ureg.milliohm)] * 50)
+    """
+    result = function(**{name: Input(name, unit) for name, unit in units.items()})
+    if not isinstance(result, Expression):
+        # the formula did not use any of the inputs
+        result = constant(result.magnitude, result.unit) if isinstance(result, SuperValue) else constant(result)
+    return result
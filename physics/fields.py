@@ -1,6 +1,7 @@
 # H1 -- For the Field class
 # *************************
-from physics.units import complete_units, ureg, pint_to_str, str_to_pint
+from physics.units import ureg, pint_to_str, str_to_pint, convert
+from physics.value import ValueArray, SuperValue
 import pint
 import numpy as np
 import physics.conf as conf
@@ -83,3 +84,192 @@ class Field(object):
 
     def __getstate__(self):
         return (self.name, self.field)
+
+
+# H3 -- FieldTable Class
+# ----------------------
+
+
+class FieldTable(object):
+
+    """Columnar table of simulation output keyed by Field.  Each column is a contiguous float64 np.ndarray in the unit of
+    its Field, so the units are checked and converted once per column instead of once per Value.
+
+        Args:
+            columns (dict, optional): The columns, keyed by Field.  The values can be a ValueArray, a collection of Values
+                or an np.ndarray of floats that are already in the unit of the Field.  All columns must have the same length
+
+        Basic Example::
+            temperature = Field('temperature', name='T')
+            flux = Field('heat_flux', name='q')
+            table = FieldTable({temperature: ValueArray(np.array([300., 310., 320.]), ureg.kelvin),
+                                flux: [Value(1, ureg.watt / ureg.meter ** 2)] * 3})
+            hot = table[table[temperature] > Value(305, ureg.kelvin)]
+            print(hot[temperature])
+            [310. 320.] kelvin
+    """
+
+    def __init__(self, columns=None):
+        self._columns = {}
+        self._length = None
+        for field, values in (columns or {}).items():
+            self.add_column(field, values)
+
+    @staticmethod
+    def _field_unit(field):
+        return ureg.dimensionless if field.unit is None else field.unit
+
+    def _as_column(self, field, values):
+        # give the values as a 1d float64 np.ndarray in the unit of the field
+        unit = self._field_unit(field)
+        if isinstance(values, ValueArray):
+            assert values.unit.dimensionality == unit.dimensionality, 'The column for {0} has the unit {1}, but it ' \
+                'should have the dimensions {2}.'.format(field, values.unit, unit.dimensionality)
+            magnitude = values.magnitude if values.unit == unit else convert(values.magnitude, values.unit, unit)[0]
+        elif isinstance(values, np.ndarray) and values.dtype != object:
+            magnitude = values
+        else:
+            # np.asarray would drop the units of a list of Values, since Value is a float
+            array = np.asarray(values, dtype=object)
+            if array.size > 0 and isinstance(array.flat[0], SuperValue):
+                magnitude = ValueArray.from_values(array, unit).magnitude
+            else:
+                magnitude = array.astype(np.float64)
+        magnitude = np.ascontiguousarray(magnitude, dtype=np.float64)
+        assert magnitude.ndim == 1, 'The columns of a FieldTable must be 1d'
+        return magnitude
+
+    def add_column(self, field, values):
+        """
+        Adds (or replaces) a column
+
+        Args:
+            field (Field): The Field of the column
+            values (ValueArray or iterable): The values, see FieldTable
+        """
+        assert isinstance(field, Field), 'The columns of a FieldTable must be keyed by Field.'
+        column = self._as_column(field, values)
+        if any(key != field for key in self._columns):
+            assert len(column) == self._length, 'The column for {0} has {1} rows, but the table has {2}'.format(
+                field, len(column), self._length)
+        self._columns[field] = (field, column)
+        self._length = len(column)
+
+    # --columns------------------
+
+    @property
+    def fields(self):
+        """Gives the list of the Fields of the columns"""
+        return [field for field, _ in self._columns.values()]
+
+    def column(self, field):
+        """
+        Gives the magnitudes of a column, in the unit of its Field
+
+        Args:
+            field (Field or str): The Field or the name of the Field
+
+        Returns:
+            np.ndarray of float64 (not a copy)
+        """
+        return self._columns[self._key(field)][1]
+
+    def _key(self, field):
+        if isinstance(field, Field):
+            return field
+        matches = [f for f, _ in self._columns.values() if f.name == field]
+        assert len(matches) == 1, 'There are {0} columns named {1}'.format(len(matches), field)
+        return matches[0]
+
+    def select(self, fields):
+        """
+        Gives a table with some of the columns.  The columns are shared, not copied
+
+        Args:
+            fields (iterable): The Fields or the names of the Fields
+
+        Returns:
+            FieldTable
+        """
+        table = FieldTable()
+        for field in fields:
+            table._columns[self._key(field)] = self._columns[self._key(field)]
+        table._length = self._length if table._columns else None
+        return table
+
+    # --rows------------------
+
+    def __len__(self):
+        return 0 if self._length is None else self._length
+
+    def filter(self, rows):
+        """
+        Gives a table with some of the rows
+
+        Args:
+            rows (np.ndarray, slice or int): A bool mask (i.e. from comparing a column to a Value), indices or a slice
+
+        Returns:
+            FieldTable
+        """
+        if isinstance(rows, int):
+            rows = slice(rows, rows + 1 if rows != -1 else None)
+        table = FieldTable()
+        for key, (field, column) in self._columns.items():
+            table._columns[key] = (field, column[rows])
+        table._length = len(next(iter(table._columns.values()))[1]) if table._columns else None
+        return table
+
+    def __getitem__(self, item):
+        """Gives a ValueArray for a Field or name, a table of columns for a list of Fields or names and a table of rows
+        for a mask, indices or slice"""
+        if isinstance(item, (Field, str)):
+            field, column = self._columns[self._key(item)]
+            return ValueArray(column, self._field_unit(field))
+        if isinstance(item, (list, tuple)) and len(item) > 0 and isinstance(item[0], (Field, str)):
+            return self.select(item)
+        return self.filter(item)
+
+    def __contains__(self, field):
+        return field in self._columns
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    @classmethod
+    def concatenate(cls, tables):
+        """
+        Joins tables by rows, i.e. the chunks of a simulation.  The columns are converted once per chunk if the units
+        of the Fields are different
+
+        Args:
+            tables (iterable): The FieldTables, which must have the same Fields
+
+        Returns:
+            FieldTable
+        """
+        tables = list(tables)
+        assert len(tables) > 0, 'You must give at least one FieldTable to concatenate'
+        result = cls()
+        for key, (field, _) in tables[0]._columns.items():
+            unit = cls._field_unit(field)
+            chunks = []
+            for table in tables:
+                assert key in table._columns, 'The column {0} is not in all the tables'.format(field)
+                chunk_field, column = table._columns[key]
+                chunk_unit = cls._field_unit(chunk_field)
+                chunks.append(column if chunk_unit == unit else convert(column, chunk_unit, unit)[0])
+            result._columns[key] = (field, np.concatenate(chunks))
+            result._length = len(result._columns[key][1])
+        assert all(len(table._columns) == len(result._columns) for table in tables), 'The tables must have the same ' \
+                                                                                      'Fields'
+        return result
+
+    def to_dict(self):
+        """Gives a dict of Field to ValueArray"""
+        return {field: self[field] for field in self.fields}
+
+    def __str__(self):
+        return 'FieldTable({0} rows: {1})'.format(len(self), ', '.join(str(field) for field in self.fields))
+
+    __repr__ = __str__
@@ -0,0 +1,152 @@
+# H1 -- Unit kernels
+# ******************
+# A function made of the Value operators pays for the unit math of every operator on every call, even though the units
+# are the same each time.  The kernel decorator checks the units once per unit signature (the units of the arguments)
+# and then calls the function with plain floats (or np.ndarray) in base units, attaching the cached unit to the result.
+#
+# On the first call with a unit signature the function is run with the Values, like normal, and with the base unit
+# magnitudes.  If the two results do not match (i.e. the function makes its own Values or uses Value methods) then the
+# signature always runs with Values, so the results are the same as without the decorator.
+import collections
+import functools
+import numpy as np
+from physics.units import unit_base
+from physics.value import SuperValue, ValueArray, _new_value
+
+# how to make a result from its base unit magnitude
+_Output = collections.namedtuple('_Output', ['unit', 'scale', 'offset'])
+_missing = object()
+
+
+def _as_input(arg):
+    # give np.ndarray with dtype=object of Values as a ValueArray, so it has one unit
+    if isinstance(arg, np.ndarray) and arg.dtype == object:
+        return ValueArray.from_values(arg)
+    return arg
+
+
+def _unit(arg):
+    if isinstance(arg, (SuperValue, ValueArray)):
+        return arg.unit
+    return None
+
+
+def _base(unit):
+    # give the (scale, offset) to convert a magnitude in unit to base units, or None for a plain number
+    if unit is None:
+        return None
+    return unit_base(unit)[:2]
+
+
+def _base_magnitudes(args, bases):
+    # give the magnitudes of args in base units, plain numbers are left as they are
+    return [arg if base is None else arg.magnitude * base[0] + base[1] for arg, base in zip(args, bases)]
+
+
+def _output(result):
+    # give the (unit, scale, offset) to make the result from its base unit magnitude, or None for a plain number
+    if isinstance(result, tuple):
+        return tuple(_output(r) for r in result)
+    if isinstance(result, (SuperValue, ValueArray)):
+        scale, offset, _ = unit_base(result.unit)
+        return _Output(result.unit, scale, offset)
+    return None
+
+
+def _attach(raw, output):
+    # give the result of the function from the base unit magnitudes it returned
+    if output is None:
+        return raw
+    if not isinstance(output, _Output):
+        return tuple(_attach(r, o) for r, o in zip(raw, output))
+    unit, scale, offset = output
+    magnitude = (raw - offset) / scale if offset else raw / scale
+    if isinstance(magnitude, float) or np.ndim(magnitude) == 0:
+        return _new_value(float(magnitude), unit)
+    return ValueArray(magnitude, unit)
+
+
+def _matches(raw, result):
+    # check the base unit result of the function is the same as the Value result
+    if isinstance(result, tuple):
+        return isinstance(raw, tuple) and len(raw) == len(result) and all(_matches(r, v) for r, v in zip(raw, result))
+    if isinstance(raw, (SuperValue, ValueArray)):
+        return False
+    if isinstance(result, (SuperValue, ValueArray)):
+        scale, offset, _ = unit_base(result.unit)
+        result = result.magnitude * scale + offset
+    try:
+        return bool(np.allclose(raw, result, rtol=1e-9, atol=0.0, equal_nan=True))
+    except (TypeError, ValueError):
+        return False
+
+
+def _call(function, args, names):
+    # call the function with the last len(names) args as keywords
+    if not names:
+        return function(*args)
+    return function(*args[:-len(names)], **dict(zip(names, args[-len(names):])))
+
+
+def kernel(function):
+    """
+    Decorator for a function made of Value operators, so the units are only checked once for each unit signature
+
+    Args:
+        function (callable): The function.  The arguments can be Values, MetaValues, ValueArrays, np.ndarray of Values
+            or plain numbers, and it must return a Value, ValueArray, number or tuple of these
+
+    Returns:
+        callable with the same arguments.  The hits and misses of the unit signature cache are given by
+        cache_info() and the cache is cleared by cache_clear()
+
+    For Example::
+        @kernel
+        def power(current, resistance):
+            return current ** 2 * resistance
+
+        power(Value(2, ureg.amp), Value(3, ureg.ohm))  # checks the units
+        power(Value(4, ureg.amp), Value(1, ureg.ohm))  # float math
+        power.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=None, currsize=1)
+    """
+    # the (scales and offsets of the arguments, output) of each unit signature, or False if the signature must run with
+    # Values
+    signatures = {}
+    counts = [0, 0]
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        args = [_as_input(arg) for arg in args]
+        names = tuple(kwargs)
+        args.extend(_as_input(arg) for arg in kwargs.values())
+        key = (names,) + tuple([_unit(arg) for arg in args])
+
+        plan = signatures.get(key, _missing)
+        if plan is _missing:
+            counts[1] += 1
+            result = _call(function, args, names)
+            bases = [_base(unit) for unit in key[1:]]
+            try:
+                valid = _matches(_call(function, _base_magnitudes(args, bases), names), result)
+            except Exception:
+                valid = False
+            signatures[key] = (bases, _output(result)) if valid else False
+            return result
+
+        counts[0] += 1
+        if plan is False:
+            return _call(function, args, names)
+        bases, output = plan
+        return _attach(_call(function, _base_magnitudes(args, bases), names), output)
+
+    def cache_info():
+        return functools._CacheInfo(counts[0], counts[1], None, len(signatures))
+
+    def cache_clear():
+        signatures.clear()
+        counts[:] = [0, 0]
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
@@ -1,3 +1,6 @@
+from physics.materials.properties import TemperatureProperty, to_kelvin
+from physics.value import ValueArray, SuperValue
+import numpy as np
 
 
 class Material(object):
@@ -7,6 +10,26 @@ class Material(object):
         self.name = name
         self.thermal_conductivity = thermal_conductivity
 
+    def property_at(self, name, temperature):
+        """Gives a property at temperatures.  A TemperatureProperty (see physics.materials.properties) is evaluated
+        over all the temperatures in one call, while a fixed Value is the same at every temperature.
+
+            Args:
+                name (str): The property, i.e. 'thermal_conductivity'
+                temperature (Value, ValueArray, iterable or float): The temperatures.  Plain numbers are in kelvin
+
+            Returns:
+                Value for a single temperature, otherwise ValueArray with the shape of temperature
+        """
+        prop = getattr(self, name)
+        if isinstance(prop, TemperatureProperty):
+            return prop(temperature)
+        assert isinstance(prop, SuperValue), 'The property {0} of {1} is not a Value'.format(name, self.name)
+        shape = np.shape(to_kelvin(temperature))
+        if shape == ():
+            return prop
+        return ValueArray(np.full(shape, prop.magnitude), prop.unit)
+
 
 class Metal(Material):
 
@@ -27,4 +50,3 @@ class Insulator(Semiconductor):
 
     def __init__(self, *args, **kwargs):
         super(Semiconductor, self).__init__(*args, **kwargs)
-
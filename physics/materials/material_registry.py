@@ -1,5 +1,193 @@
-from .Material import *
+# H1 -- Material Registry
+# ***********************
+# The materials are loaded in bulk from a csv file into one float64 column per property, so a query over thousands
+# of materials is a few numpy calls instead of a loop over Material objects.  Each property is also kept sorted, so a
+# range query (i.e. bandgap in [1, 2] eV) is a binary search.
+#
+# The header of the csv file gives the unit of each property column in brackets:
+#     name,class,thermal_conductivity [watt / meter / kelvin],bandgap [electron_volt],dielectric [dimensionless]
+# Empty cells (i.e. the bandgap of a metal) are stored as nan.
+import csv
+import functools
+import os
+import numpy as np
+from physics.units import ureg, unit_algebra
+from physics.text_io import parse_header
+from physics.value import Value, ValueArray, SuperValue
+from physics.materials.Material import Material, Metal, Semiconductor, Insulator
 
+# the csv file shipped with the package
+default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'materials.csv')
 
-# create all the materials
+material_classes = {'Material': Material, 'Metal': Metal, 'Semiconductor': Semiconductor, 'Insulator': Insulator}
 
+
+class MaterialRegistry(object):
+
+    """Columnar registry of materials, indexed by class and by the sorted values of each property.
+
+        Args:
+            names (iterable): The name of each material
+            classes (iterable): The class name of each material, a key of material_classes
+            properties (dict): A ValueArray for each property, with one value per material (nan if it is missing)
+
+        Basic Example::
+            registry = MaterialRegistry.from_csv()
+            rows = registry.query('Semiconductor', bandgap=(Value(1, ureg.electron_volt), Value(2, ureg.electron_volt)))
+            print(registry.names[rows])
+            ['silicon' 'gallium arsenide' 'indium phosphide' 'cadmium telluride']
+    """
+
+    def __init__(self, names, classes, properties):
+        self.names = np.asarray(names, dtype=str)
+        self.classes = np.asarray(classes, dtype=str)
+        for class_name in np.unique(self.classes):
+            assert class_name in material_classes, 'The material class {0} is not one of {1}'.format(
+                class_name, list(material_classes.keys()))
+        self.properties = {}
+        for name, values in properties.items():
+            assert len(values) == len(self.names), 'The property {0} has {1} values, but there are {2} ' \
+                                                   'materials'.format(name, len(values), len(self.names))
+            self.properties[name] = values
+
+        # the index of each name and the rows of each class
+        self._rows = {name: row for row, name in enumerate(self.names)}
+        self._class_rows = {class_name: np.flatnonzero(self.classes == class_name)
+                            for class_name in np.unique(self.classes)}
+        # the rows of each property sorted by value, without the nan
+        self._sorted = {}
+        for name, values in self.properties.items():
+            order = np.argsort(values.magnitude, kind='stable')
+            order = order[~np.isnan(values.magnitude[order])]
+            self._sorted[name] = (order, values.magnitude[order])
+
+    @classmethod
+    def from_csv(cls, path=default_path):
+        """
+        Loads a registry from a csv file
+
+        Args:
+            path (str, optional): The csv file.  Default is the materials.csv shipped with the package
+
+        Returns:
+            MaterialRegistry
+        """
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = [row for row in reader if row]
+        assert header[:2] == ['name', 'class'], 'The first columns of the material file must be name and class'
+
+        columns = list(zip(*rows)) if rows else [()] * len(header)
+        properties = {}
+        for column, values in zip(header[2:], columns[2:]):
+            name, unit = parse_header(column)
+            magnitude = np.array([float(v) if v.strip() else np.nan for v in values], dtype=np.float64)
+            properties[name] = ValueArray(magnitude, unit)
+        return cls(columns[0], columns[1], properties)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def row(self, name):
+        """Gives the row of a material by name"""
+        return self._rows[name]
+
+    def _magnitude(self, prop, value):
+        # give value as a magnitude in the unit of the property
+        if value is None or not isinstance(value, SuperValue):
+            return value
+        unit, factor = unit_algebra('add', self.properties[prop].unit, value.unit)
+        assert unit is not None, 'The property {0} is in {1}, which can not be compared to {2}'.format(
+            prop, self.properties[prop].unit, value.unit)
+        if factor is None:
+            return ureg.Quantity(value.magnitude, value.unit).to(unit).magnitude
+        return value.magnitude * factor
+
+    def range_rows(self, prop, low=None, high=None):
+        """
+        Gives the rows with a property in [low, high] with a binary search
+
+        Args:
+            prop (str): The property
+            low (Value or float, optional): The lowest value, a float is in the unit of the property.  Default is no limit
+            high (Value or float, optional): The highest value.  Default is no limit
+
+        Returns:
+            np.ndarray of the sorted rows
+        """
+        order, values = self._sorted[prop]
+        start = 0 if low is None else np.searchsorted(values, self._magnitude(prop, low), side='left')
+        stop = len(values) if high is None else np.searchsorted(values, self._magnitude(prop, high), side='right')
+        return np.sort(order[start:stop])
+
+    def query(self, material_class=None, **ranges):
+        """
+        Gives the rows of the materials of a class with properties in ranges
+
+        Args:
+            material_class (str or type, optional): The class of the materials, only that exact class is matched (i.e.
+                'Semiconductor' does not include 'Insulator').  Default is all classes
+            **ranges: (low, high) for each property, see range_rows
+
+        Returns:
+            np.ndarray of the sorted rows.  Use registry.names[rows] for the names
+
+        For Example::
+            registry.query(Insulator, dielectric=(10, None), thermal_conductivity=(None, Value(5, ureg.watt / ureg.meter / ureg.kelvin)))
+        """
+        rows = None
+        if material_class is not None:
+            if isinstance(material_class, type):
+                material_class = material_class.__name__
+            rows = self._class_rows.get(material_class, np.zeros(0, dtype=np.intp))
+        for prop, (low, high) in ranges.items():
+            prop_rows = self.range_rows(prop, low, high)
+            rows = prop_rows if rows is None else np.intersect1d(rows, prop_rows, assume_unique=True)
+        if rows is None:
+            return np.arange(len(self))
+        return rows
+
+    def values(self, prop, rows=None):
+        """
+        Gives the values of a property
+
+        Args:
+            prop (str): The property
+            rows (np.ndarray, optional): The rows.  Default is all the materials
+
+        Returns:
+            ValueArray
+        """
+        values = self.properties[prop]
+        if rows is None:
+            return values
+        return ValueArray(values.magnitude[rows], values.unit)
+
+    def material(self, name):
+        """
+        Builds the Material object of a material
+
+        Args:
+            name (str or int): The name or row of the material
+
+        Returns:
+            Material (or Metal, Semiconductor, Insulator) with each property as a Value attribute
+        """
+        row = self._rows[name] if isinstance(name, str) else int(name)
+        cls = material_classes[self.classes[row]]
+        material = cls.__new__(cls)
+        Material.__init__(material, str(self.names[row]), None)
+        for prop, values in self.properties.items():
+            magnitude = values.magnitude[row]
+            setattr(material, prop, None if np.isnan(magnitude) else Value(float(magnitude), values.unit))
+        return material
+
+
+@functools.lru_cache(maxsize=None)
+def default_registry():
+    """Gives the registry of the materials.csv shipped with the package, loading it the first time"""
+    return MaterialRegistry.from_csv(default_path)
@@ -0,0 +1,177 @@
+# H1 -- Temperature dependent material properties
+# ************************************************
+# A property such as the thermal conductivity k(T) is evaluated at every node of a thermal simulation on every
+# iteration, so the properties take whole arrays of temperatures and are evaluated with numpy in one call.  The
+# interpolant of a table (the slope of each segment) is computed once when the property is made, and the parameters of
+# a formula are converted to plain floats once, so an evaluation is only float math.
+#
+# Basic Example::
+#     silicon.thermal_conductivity = PowerLaw(Value(148, ureg.watt / ureg.meter / ureg.kelvin), -1.3)
+#     silicon.property_at('thermal_conductivity', ValueArray(np.linspace(300, 400, 1000), ureg.kelvin))
+import numpy as np
+import pint
+from physics.units import ureg, unit_base, convert
+from physics.value import ValueArray, SuperValue, _new_value
+
+_temperature = ureg.kelvin.dimensionality
+
+
+def to_kelvin(temperature):
+    """
+    Gives the magnitude of temperatures in kelvin
+
+    Args:
+        temperature (Value, ValueArray, iterable or float): The temperatures.  Plain numbers are in kelvin
+
+    Returns:
+        float or np.ndarray of float64
+    """
+    if isinstance(temperature, (SuperValue, ValueArray)):
+        scale, offset, dimensionality = unit_base(temperature.unit)
+        if dimensionality != _temperature:
+            raise pint.DimensionalityError(temperature.unit, ureg.kelvin)
+        return temperature.magnitude * scale + offset
+    if isinstance(temperature, np.ndarray) and temperature.dtype != object:
+        return temperature
+    array = np.asarray(temperature, dtype=object)
+    if array.size > 0 and isinstance(array.flat[0], SuperValue):
+        return to_kelvin(ValueArray.from_values(array, ureg.kelvin))
+    return array.astype(np.float64) if array.ndim > 0 else float(temperature)
+
+
+def _magnitude(value, unit):
+    # give the magnitude of a Value (or plain number) in unit
+    if isinstance(value, (SuperValue, ValueArray)):
+        return convert(np.asarray(value.magnitude, dtype=np.float64), value.unit, unit)[0]
+    return value
+
+
+class TemperatureProperty(object):
+
+    """Base class of a material property that depends on temperature.  Subclasses give _evaluate, which takes the
+    temperatures in kelvin and gives the magnitudes in self.unit.
+
+        Args:
+            unit (ureg.unit): The unit of the property
+    """
+
+    def __init__(self, unit):
+        self.unit = unit
+
+    def _evaluate(self, kelvin):
+        raise NotImplementedError
+
+    def magnitude(self, temperature):
+        """Gives the magnitudes (in self.unit) of the property at temperatures, without making a ValueArray"""
+        return self._evaluate(to_kelvin(temperature))
+
+    def __call__(self, temperature):
+        """
+        Evaluates the property
+
+        Args:
+            temperature (Value, ValueArray, iterable or float): The temperatures.  Plain numbers are in kelvin
+
+        Returns:
+            Value for a single temperature, otherwise ValueArray with the shape of temperature
+        """
+        magnitude = self._evaluate(to_kelvin(temperature))
+        if np.ndim(magnitude) == 0:
+            return _new_value(float(magnitude), self.unit)
+        return ValueArray(magnitude, self.unit)
+
+
+class TabulatedProperty(TemperatureProperty):
+
+    """Property given by a table, linearly interpolated between the temperatures of the table.
+
+        Args:
+            temperatures (ValueArray or iterable): The temperatures of the table.  Plain numbers are in kelvin
+            values (ValueArray or iterable of Values): The value of the property at each temperature
+            extrapolate (bool, optional): Outside of the table, extend the first and last segments if True or use the
+                first and last values if False (default)
+    """
+
+    def __init__(self, temperatures, values, extrapolate=False):
+        if not isinstance(values, ValueArray):
+            values = ValueArray.from_values(values)
+        super(TabulatedProperty, self).__init__(values.unit)
+        kelvin = np.asarray(to_kelvin(temperatures), dtype=np.float64).ravel()
+        magnitude = np.asarray(values.magnitude, dtype=np.float64).ravel()
+        assert len(kelvin) == len(magnitude) and len(kelvin) >= 2, 'The table must have at least two temperatures ' \
+                                                                   'and one value for each'
+        order = np.argsort(kelvin)
+        self._kelvin = kelvin[order]
+        self._values = magnitude[order]
+        assert np.all(np.diff(self._kelvin) > 0), 'The temperatures of the table must be unique'
+        # the interpolant is the slope of each segment
+        self._slopes = np.diff(self._values) / np.diff(self._kelvin)
+        self.extrapolate = extrapolate
+
+    def _evaluate(self, kelvin):
+        if not self.extrapolate:
+            kelvin = np.clip(kelvin, self._kelvin[0], self._kelvin[-1])
+        segment = np.clip(np.searchsorted(self._kelvin, kelvin, side='right') - 1, 0, len(self._slopes) - 1)
+        return self._values[segment] + self._slopes[segment] * (kelvin - self._kelvin[segment])
+
+
+class ParametricProperty(TemperatureProperty):
+
+    """Property given by a formula of the temperature.
+
+        Args:
+            function (callable): Takes the temperatures in kelvin (float or np.ndarray) and the parameters as keywords
+                and gives the magnitudes in unit.  It must work on np.ndarray
+            unit (ureg.unit): The unit of the property
+            **parameters: Plain floats passed to the function
+    """
+
+    def __init__(self, function, unit, **parameters):
+        super(ParametricProperty, self).__init__(unit)
+        self.function = function
+        self.parameters = parameters
+
+    def _evaluate(self, kelvin):
+        return self.function(kelvin, **self.parameters)
+
+
+def _power_law(kelvin, value, reference, exponent):
+    return value * (kelvin / reference) ** exponent
+
+
+class PowerLaw(ParametricProperty):
+
+    """Property value * (T / reference) ** exponent, i.e. the thermal conductivity of a crystal.
+
+        Args:
+            value (Value): The property at the reference temperature
+            exponent (float): The exponent
+            reference (Value or float, optional): The reference temperature.  Default is 300 K
+    """
+
+    def __init__(self, value, exponent, reference=300.0):
+        super(PowerLaw, self).__init__(_power_law, value.unit, value=value.magnitude,
+                                       reference=float(to_kelvin(reference)), exponent=float(exponent))
+
+
+def _varshni(kelvin, bandgap, alpha, beta):
+    return bandgap - alpha * kelvin ** 2 / (kelvin + beta)
+
+
+class Varshni(ParametricProperty):
+
+    """The Varshni formula of the bandgap of a semiconductor, Eg(T) = Eg(0) - alpha * T ** 2 / (T + beta).
+
+        Args:
+            bandgap (Value): The bandgap at 0 K
+            alpha (Value): alpha in energy / kelvin
+            beta (Value or float): beta, a temperature
+
+        For Example, silicon::
+            Varshni(Value(1.166, ureg.eV), Value(4.73e-4, ureg.eV / ureg.kelvin), Value(636, ureg.kelvin))
+    """
+
+    def __init__(self, bandgap, alpha, beta):
+        super(Varshni, self).__init__(_varshni, bandgap.unit, bandgap=bandgap.magnitude,
+                                      alpha=float(_magnitude(alpha, bandgap.unit / ureg.kelvin)),
+                                      beta=float(to_kelvin(beta)))
@@ -0,0 +1,183 @@
+# H1 -- Profiling of the Value hot paths
+# **************************************
+# Counts and times the Value allocations, the Value and MetaValue operators, the unit conversions, the Pint Quantities
+# made by the fallback paths and the operators that dispatch to np.ndarray with dtype=object.  Each event is recorded
+# by the call site outside of the Physics package (the line of the formula that caused it).
+#
+# The instrumentation wraps the functions when enable() is called and restores them with disable(), so there is no
+# cost when profiling is off.  Set conf.profile (or the PHYSICS_PROFILE environment variable) to profile from import
+# and print the report when python exits.
+#
+# For Example::
+#     import physics.profiling as profiling
+#     with profiling.profile():
+#         model(Value(1, ureg.amp), Value(2, ureg.ohm))
+#     print(profiling.report())
+import contextlib
+import os
+import sys
+import time
+import numpy as np
+import pint
+import physics.units as units
+import physics.value as value
+
+# the events of each (event, file, line, function), holding [count, seconds]
+_stats = {}
+# the original functions, as (owner, name, original or None if it was inherited), while enabled
+_originals = []
+
+# frames in these directories (the whole Physics package, not only the modules that are wrapped) are skipped when
+# finding the call site, except the frames of the test modules
+_internal_dirs = tuple(os.path.dirname(os.path.abspath(module.__file__)) + os.sep for module in (np, pint, value))
+
+# the operators that are wrapped
+_value_operators = ('__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__', '__truediv__',
+                    '__rtruediv__', '__pow__', '__neg__', '__abs__', '__round__', '__eq__', '__ne__', '__lt__',
+                    '__le__', '__gt__', '__ge__')
+_meta_operators = ('__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__', '__truediv__',
+                   '__rtruediv__', '__neg__', '__eq__', '__lt__', '__gt__')
+
+
+def _call_site():
+    # give the (file, line, function) of the first frame outside of the Physics package, Pint and numpy
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(_internal_dirs) and \
+            not os.path.basename(frame.f_code.co_filename).startswith('test_'):
+        frame = frame.f_back
+    if frame is None:
+        return '<unknown>', 0, '<unknown>'
+    return frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name
+
+
+def _record(event, seconds):
+    key = (event,) + _call_site()
+    entry = _stats.get(key)
+    if entry is None:
+        _stats[key] = [1, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _instrument(event, function, operator=False):
+    # give function wrapped to record event.  Operators with an np.ndarray operand are also recorded as a dispatch
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _record(event, seconds)
+            if operator and len(args) > 1 and isinstance(args[1], np.ndarray):
+                _record('object ndarray dispatch', seconds)
+    wrapper.__wrapped__ = function
+    wrapper.__name__ = getattr(function, '__name__', event)
+    return wrapper
+
+
+def _patch(owner, name, event, static=False, operator=False):
+    original = owner.__dict__.get(name) if isinstance(owner, type) else getattr(owner, name)
+    wrapper = _instrument(event, getattr(owner, name), operator)
+    _originals.append((owner, name, original))
+    setattr(owner, name, staticmethod(wrapper) if static else wrapper)
+
+
+def _patch_function(function, event):
+    # wrap a module level function in every Physics module that has imported it by name
+    for module in list(sys.modules.values()):
+        if getattr(module, '__name__', '').startswith('physics') and getattr(module, function.__name__, None) is function:
+            _patch(module, function.__name__, event)
+
+
+def is_enabled():
+    """Gives True if the profiling is on"""
+    return len(_originals) > 0
+
+
+def enable():
+    """Turns on the profiling by wrapping the Value hot paths.  Does nothing if it is already on"""
+    if is_enabled():
+        return
+    # allocations
+    _patch(value.Value, '__init__', 'Value allocation')
+    _patch_function(value._new_value, 'Value allocation')
+    # operators
+    for name in _value_operators:
+        _patch(value.Value, name, 'Value.' + name, operator=True)
+    for name in _meta_operators:
+        _patch(value.MetaValue, name, 'MetaValue.' + name, operator=True)
+    # conversions
+    _patch_function(units.convert, 'unit conversion')
+    _patch_function(units._pint_convert, 'pint conversion fallback')
+    # every Pint Quantity, i.e. the offset unit (degC) paths in the operators
+    _patch(units.ureg.Quantity, '__new__', 'pint Quantity', static=True)
+
+
+def disable():
+    """Turns off the profiling and restores the original functions.  The recorded stats are kept"""
+    while _originals:
+        owner, name, original = _originals.pop()
+        if original is None:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+
+
+def reset():
+    """Clears the recorded stats"""
+    _stats.clear()
+
+
+@contextlib.contextmanager
+def profile():
+    """Context manager that turns on the profiling for the with block"""
+    enabled = is_enabled()
+    enable()
+    try:
+        yield
+    finally:
+        if not enabled:
+            disable()
+
+
+def stats():
+    """
+    Gives the recorded stats
+
+    Returns:
+        dict of (event, file, line, function) to (count, seconds).  The seconds include the time of the events inside
+        the event, i.e. the allocation in an operator
+    """
+    return {key: tuple(entry) for key, entry in _stats.items()}
+
+
+def summary():
+    """
+    Gives the recorded stats summed over the call sites
+
+    Returns:
+        dict of event to (count, seconds)
+    """
+    result = {}
+    for (event, _, _, _), (count, seconds) in _stats.items():
+        total = result.get(event, (0, 0.0))
+        result[event] = (total[0] + count, total[1] + seconds)
+    return result
+
+
+def report(limit=30):
+    """
+    Gives a table of the events of each call site, sorted by the total time
+
+    Args:
+        limit (int, optional): The number of rows.  Default is 30
+
+    Returns:
+        str of the table
+    """
+    lines = ['{0:>10} {1:>12}  {2:<28} {3}'.format('count', 'seconds', 'event', 'call site')]
+    rows = sorted(_stats.items(), key=lambda item: item[1][1], reverse=True)
+    for (event, filename, line, function), (count, seconds) in rows[:limit]:
+        lines.append('{0:>10} {1:>12.6f}  {2:<28} {3}:{4}({5})'.format(count, seconds, event, filename, line, function))
+    return '\n'.join(lines)
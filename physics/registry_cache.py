@@ -0,0 +1,172 @@
+# H1 -- On-disk cache of the Pint UnitRegistry
+# ********************************************
+# Building pint.UnitRegistry() parses the full Pint definitions file, which dominates the start up time of short lived
+# processes.  If conf.registry_cache_dir (or the PHYSICS_CACHE_DIR environment variable) is set, the parsed registry
+# is saved there the first time and reloaded by later processes.  The cache files are named by the Pint and python
+# versions, so updating Pint invalidates them.
+import copyreg
+import io
+import os
+import pickle
+import sys
+import tempfile
+import pint
+from pint.context import _expression_to_function
+from pint.util import ParserHelper, UnitsContainer
+import physics.conf as conf
+
+# bump this if the layout of the cache files changes
+cache_version = 1
+
+# the registry attributes that are rebuilt by pint.UnitRegistry(filename=None) instead of being cached
+_rebuilt_attributes = ('_parsers', 'Unit', 'Quantity', 'Measurement', 'Group', 'System', '_groups', '_systems',
+                       '_contexts', '_active_ctx')
+
+
+def cache_path(name):
+    """Gives the path of a cache file, or None if the cache is turned off
+
+        Args:
+            :param name: the name of the cached object (i.e. 'registry')
+            :type str: python string class
+
+        Returns:
+            :return str: The path of the cache file
+    """
+    if not conf.registry_cache_dir:
+        return None
+    return os.path.join(conf.registry_cache_dir, '{0}-pint{1}-py{2}.{3}-v{4}.pickle'.format(
+        name, pint.__version__, sys.version_info[0], sys.version_info[1], cache_version))
+
+
+def _dumps(obj):
+    # ParserHelper and UnitsContainer use __slots__ and are used as dict keys, so pickle them by their contents
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[ParserHelper] = lambda p: (ParserHelper, (p.scale, dict(p._d)))
+    pickler.dispatch_table[UnitsContainer] = lambda u: (UnitsContainer, (dict(u._d),))
+    pickler.dump(obj)
+    return buffer.getvalue()
+
+
+def read_cache(name):
+    """Reads a cached object
+
+        Args:
+            :param name: the name of the cached object
+            :type str: python string class
+
+        Returns:
+            :return object: The cached object, or None if the cache is turned off, missing or unreadable
+    """
+    path = cache_path(name)
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def write_cache(name, obj):
+    """Writes an object to the cache.  The file is written to a temporary file first so other processes never read a
+    partial file.
+
+        Args:
+            :param name: the name of the cached object
+            :type str: python string class
+            :param obj: the object to cache, must be picklable
+    """
+    path = cache_path(name)
+    if path is None:
+        return
+    try:
+        os.makedirs(conf.registry_cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=conf.registry_cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_dumps(obj))
+        os.replace(tmp_path, path)
+    except OSError:
+        # the cache is only an optimization, so do not fail if it can not be written
+        pass
+
+
+def _registry_state(registry):
+    state = {key: value for key, value in registry.__dict__.items() if key not in _rebuilt_attributes}
+    state['_groups'] = {name: dict(group.__dict__) for name, group in registry._groups.items()}
+    state['_systems'] = {name: dict(system.__dict__) for name, system in registry._systems.items()}
+
+    # the context functions are closures of their equation strings, so save the equations
+    contexts = {}
+    for name, context in registry._contexts.items():
+        contexts[name] = (type(context), {'name': context.name,
+                                          'aliases': context.aliases,
+                                          'defaults': context.defaults,
+                                          'funcs': {edge: func.__closure__[0].cell_contents
+                                                    for edge, func in context.funcs.items()}})
+    state['_contexts'] = contexts
+    return state
+
+
+def _registry_from_state(state):
+    # an empty registry builds the Unit, Quantity, Group and System classes bound to this registry
+    registry = pint.UnitRegistry(filename=None)
+    state = dict(state)
+    groups = state.pop('_groups')
+    systems = state.pop('_systems')
+    contexts = state.pop('_contexts')
+    registry.__dict__.update(state)
+
+    registry._groups = {}
+    for name, group_state in groups.items():
+        group = object.__new__(registry.Group)
+        group.__dict__.update(group_state)
+        registry._groups[name] = group
+
+    registry._systems = {}
+    for name, system_state in systems.items():
+        system = object.__new__(registry.System)
+        system.__dict__.update(system_state)
+        registry._systems[name] = system
+
+    registry._contexts = {}
+    functions = {}
+    built = {}
+    for name, (cls, context_state) in contexts.items():
+        # aliases share the same context
+        key = (cls, context_state['name'])
+        if key not in built:
+            context = cls(context_state['name'], context_state['aliases'], context_state['defaults'])
+            for edge, equation in context_state['funcs'].items():
+                if equation not in functions:
+                    functions[equation] = _expression_to_function(equation)
+                context.funcs[edge] = functions[equation]
+                context.relation_to_context[edge] = context
+            built[key] = context
+        registry._contexts[name] = built[key]
+
+    return registry
+
+
+def load_registry():
+    """Gives the UnitRegistry, loading it from the cache if conf.registry_cache_dir is set.  If the cache is missing or
+    out of date then the registry is built by Pint and saved to the cache.
+
+        Returns:
+            :return pint.UnitRegistry: The unit registry
+    """
+    if cache_path('registry') is None:
+        return pint.UnitRegistry()
+
+    state = read_cache('registry')
+    if state is not None:
+        try:
+            return _registry_from_state(state)
+        except Exception:
+            pass
+
+    registry = pint.UnitRegistry()
+    write_cache('registry', _registry_state(registry))
+    return registry
@@ -0,0 +1,146 @@
+# H1 -- Bulk serialization of Values
+# **********************************
+# Pickling a collection of Values pickles the full Pint unit of every Value.  The format here stores each unique unit
+# once as a string, the magnitudes as one packed float64 buffer and the index of the unit of every Value.
+#
+# Layout:
+#     b'PHYV' | version (uint8) | header length (uint32) | JSON header | magnitudes (float64) | unit codes (uint32)
+#
+# The JSON header holds the kind ('values' or 'value_array'), the shape, the unit strings and the optional names.
+import json
+import struct
+import numpy as np
+from physics.units import str_to_pint
+from physics.value import Value, ValueArray, SuperValue, _new_value
+
+magic = b'PHYV'
+version = 1
+_prefix = struct.Struct('<4sBI')
+
+
+def unit_to_str(unit):
+    """Gives an exact string for a unit, that can be parsed by str_to_pint.  Unlike str(unit), the exponents
+    are not rounded
+
+        Args:
+            unit (ureg.unit): The unit
+
+        Returns:
+            str of the unit
+
+        For Example::
+            unit_to_str(ureg.kiloohm * ureg.microampere)
+            'kiloohm * microampere'
+    """
+    items = sorted(unit._units.items())
+    if len(items) == 0:
+        return 'dimensionless'
+    return ' * '.join(name if power == 1 else '{0} ** {1!r}'.format(name, power) for name, power in items)
+
+
+def _encode(values):
+    # give the kind, shape, magnitudes, codes, unit strings and names of the values
+    if isinstance(values, ValueArray):
+        return 'value_array', values.shape, np.ascontiguousarray(values.magnitude, dtype='<f8'), None, \
+               [unit_to_str(values.unit)], None
+
+    kind = 'list' if isinstance(values, (list, tuple)) else 'values'
+    values = np.asarray(values, dtype=object)
+    flat = values.ravel()
+    # MetaValues are stored by their Value
+    flat = [v.value if not isinstance(v, Value) and isinstance(v, SuperValue) else v for v in flat]
+
+    magnitudes = np.fromiter((v.magnitude for v in flat), dtype='<f8', count=len(flat))
+    units = {}
+    codes = np.fromiter((units.setdefault(v.unit, len(units)) for v in flat), dtype='<u4', count=len(flat))
+    names = [v.name for v in flat]
+    if all(name is None for name in names):
+        names = None
+    return kind, values.shape, magnitudes, codes, [unit_to_str(unit) for unit in units.keys()], names
+
+
+def dumps(values):
+    """
+    Serializes a list, np.ndarray (dtype=object) or ValueArray of Values and MetaValues to bytes
+
+    Args:
+        values (iterable): The Values.  MetaValues are stored by their Value
+
+    Returns:
+        bytes
+    """
+    kind, shape, magnitudes, codes, units, names = _encode(values)
+    header = json.dumps({'kind': kind, 'shape': list(shape), 'units': units, 'names': names}).encode('utf8')
+    # pad the header so the magnitudes are 8 byte aligned
+    header += b' ' * (-(_prefix.size + len(header)) % 8)
+    parts = [_prefix.pack(magic, version, len(header)), header, magnitudes.tobytes()]
+    if codes is not None:
+        parts.append(codes.tobytes())
+    return b''.join(parts)
+
+
+def loads_raw(data):
+    """
+    Reads bytes made by dumps without making any Values.  The magnitudes and codes are views of data, so this is as
+    fast as reading the buffer
+
+    Args:
+        data (bytes): The bytes made by dumps
+
+    Returns:
+        dict with the 'kind', 'shape', 'magnitudes' (float64 np.ndarray), 'codes' (np.ndarray of the index of the unit
+        of each magnitude, None for a ValueArray), 'units' (list of ureg.unit) and 'names' (list or None)
+    """
+    data = memoryview(data)
+    tag, file_version, header_length = _prefix.unpack_from(data)
+    assert tag == magic, 'The data was not made by physics.serialization.dumps'
+    assert file_version == version, 'The data is version {0}, but only version {1} can be read'.format(file_version,
+                                                                                                    version)
+    offset = _prefix.size
+    header = json.loads(bytes(data[offset:offset + header_length]).decode('utf8'))
+    offset += header_length
+
+    size = int(np.prod(header['shape'], dtype=np.int64))
+    magnitudes = np.frombuffer(data, dtype='<f8', count=size, offset=offset)
+    offset += magnitudes.nbytes
+    codes = None
+    if header['kind'] != 'value_array':
+        codes = np.frombuffer(data, dtype='<u4', count=size, offset=offset)
+
+    return {'kind': header['kind'],
+            'shape': tuple(header['shape']),
+            'magnitudes': magnitudes,
+            'codes': codes,
+            'units': [str_to_pint(unit) for unit in header['units']],
+            'names': header['names']}
+
+
+def loads(data):
+    """
+    Reads bytes made by dumps
+
+    Args:
+        data (bytes): The bytes made by dumps
+
+    Returns:
+        The same kind of collection that was dumped: a list or np.ndarray (dtype=object) of Values or a ValueArray.
+        MetaValues are loaded as their Value
+    """
+    raw = loads_raw(data)
+    if raw['kind'] == 'value_array':
+        return ValueArray(magnitude=raw['magnitudes'].reshape(raw['shape']).copy(), unit=raw['units'][0])
+
+    units = raw['units']
+    magnitudes = raw['magnitudes'].tolist()
+    codes = raw['codes'].tolist()
+    if raw['names'] is None:
+        # the units were parsed from the header, so the checks in Value.__init__ are not needed
+        values = [_new_value(magnitude, units[code]) for magnitude, code in zip(magnitudes, codes)]
+    else:
+        values = [Value(magnitude, units[code], name=name)
+                  for magnitude, code, name in zip(magnitudes, codes, raw['names'])]
+    if raw['kind'] == 'list':
+        return values
+    result = np.empty(len(values), dtype=object)
+    result[:] = values
+    return result.reshape(raw['shape'])
@@ -0,0 +1,151 @@
+# H1 -- Memory-mapped storage of unit-tagged arrays
+# **************************************************
+# An array is saved as a small JSON header (the unit, the shape and the Field) followed by the raw float64 magnitudes
+# in C order, like a .npy file.  load() opens the magnitudes with np.memmap, so opening a large file is instant and
+# slicing only reads the pages that are touched.
+#
+# Layout:
+#     b'PHYM' | version (uint8) | header length (uint32) | JSON header padded with spaces | magnitudes (float64)
+#
+# The header is padded with room to spare, so append() can grow the first axis by rewriting the shape in place.
+import json
+import os
+import struct
+import numpy as np
+from physics.fields import Field
+from physics.serialization import unit_to_str
+from physics.units import convert, str_to_pint
+from physics.value import ValueArray
+
+magic = b'PHYM'
+version = 1
+_prefix = struct.Struct('<4sBI')
+# the header is padded to a multiple of this (so the magnitudes are aligned) plus at least this many spare bytes
+_header_align = 64
+
+
+def _as_value_array(values, unit=None):
+    # give values as a ValueArray in unit (the unit of values if None)
+    if not isinstance(values, ValueArray):
+        return ValueArray.from_values(values, unit)
+    if unit is None or values.unit == unit:
+        return values
+    return ValueArray(*convert(values.magnitude, values.unit, unit))
+
+
+def _pack_header(header, length=None):
+    text = json.dumps(header).encode('utf8')
+    if length is None:
+        length = -(-(_prefix.size + len(text) + _header_align) // _header_align) * _header_align - _prefix.size
+    assert len(text) <= length, 'The header of the file is too small for the new shape'
+    return _prefix.pack(magic, version, length) + text + b' ' * (length - len(text))
+
+
+def read_header(path):
+    """
+    Reads the header of a file made by save
+
+    Args:
+        path (str): The path of the file
+
+    Returns:
+        dict with the 'shape' (tuple), 'unit' (ureg.unit), 'field' (Field or None) and 'offset' (int, the position of
+        the magnitudes in the file)
+    """
+    with open(path, 'rb') as f:
+        tag, file_version, length = _prefix.unpack(f.read(_prefix.size))
+        assert tag == magic, 'The file {0} was not made by physics.storage.save'.format(path)
+        assert file_version == version, 'The file is version {0}, but only version {1} can be read'.format(file_version,
+                                                                                                        version)
+        header = json.loads(f.read(length).decode('utf8'))
+
+    unit = str_to_pint(header['unit'])
+    field = None
+    if header['field'] is not None:
+        field = Field(header['field']['field'], name=header['field']['name'], unit=unit)
+    return {'shape': tuple(header['shape']), 'unit': unit, 'field': field, 'offset': _prefix.size + length}
+
+
+def _header(shape, unit, field):
+    return {'shape': list(shape),
+            'unit': unit_to_str(unit),
+            'field': None if field is None else {'field': field.field, 'name': field.name}}
+
+
+def save(path, values, field=None):
+    """
+    Saves a ValueArray or a collection of Values to path, replacing the file if it exists
+
+    Args:
+        path (str): The path of the file
+        values (ValueArray or iterable): The Values.  They are converted to the unit of the field if it is given
+        field (Field, optional): The Field of the values, which is saved in the header
+
+    For Example::
+        save('temperature.phym', ValueArray(np.zeros((100, 100)), ureg.kelvin), Field('temperature', name='T'))
+        array = load('temperature.phym')
+    """
+    array = _as_value_array(values, None if field is None else field.unit)
+    with open(path, 'wb') as f:
+        f.write(_pack_header(_header(array.shape, array.unit, field)))
+        f.write(np.ascontiguousarray(array.magnitude, dtype='<f8').tobytes())
+
+
+def load(path, mode='r'):
+    """
+    Opens a file made by save.  The magnitudes are memory-mapped, so only the slices that are used are read.
+
+    Args:
+        path (str): The path of the file
+        mode (str, optional): The np.memmap mode.  'r' (default) is read only, 'r+' writes changes to the file and 'c'
+            is copy on write
+
+    Returns:
+        ValueArray with a memory-mapped magnitude.  Use read_header(path)['field'] for the Field
+    """
+    header = read_header(path)
+    shape = header['shape']
+    if int(np.prod(shape)) == 0:
+        # np.memmap can not map an empty file
+        return ValueArray(np.zeros(shape), header['unit'])
+    magnitude = np.memmap(path, dtype='<f8', mode=mode, offset=header['offset'], shape=shape)
+    return ValueArray(magnitude, header['unit'])
+
+
+def append(path, values, field=None):
+    """
+    Appends values to the first axis of the array in path, i.e. the results of the next simulation step.  If the file
+    does not exist it is made by save.
+
+    Args:
+        path (str): The path of the file
+        values (ValueArray or iterable): The Values.  They are converted to the unit of the file and must have the
+            shape of the file without the first axis (one step), or the shape of the file (several steps)
+        field (Field, optional): The Field, only used if the file is made
+
+    Returns:
+        tuple of the new shape of the file
+    """
+    if not os.path.isfile(path):
+        save(path, values, field)
+        return read_header(path)['shape']
+
+    header = read_header(path)
+    shape = header['shape']
+    assert len(shape) > 0, 'You can not append to a file with a single value'
+    array = _as_value_array(values, header['unit'])
+    magnitude = np.ascontiguousarray(array.magnitude, dtype='<f8')
+    if magnitude.shape == shape[1:]:
+        magnitude = magnitude[np.newaxis]
+    assert magnitude.shape[1:] == shape[1:], 'The values have shape {0}, but the file has shape {1}'.format(
+        magnitude.shape, shape)
+    new_shape = (shape[0] + magnitude.shape[0],) + shape[1:]
+
+    with open(path, 'r+b') as f:
+        # write the data before the shape, so an interrupted append leaves the file as it was
+        f.seek(header['offset'] + int(np.prod(shape)) * 8)
+        f.write(magnitude.tobytes())
+        f.truncate()
+        f.seek(0)
+        f.write(_pack_header(_header(new_shape, header['unit'], header['field']), header['offset'] - _prefix.size))
+    return new_shape
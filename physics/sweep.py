@@ -0,0 +1,153 @@
+# H1 -- Parameter sweeps over processes
+# *************************************
+# Maps a function over large collections of Values in a pool of worker processes, for models with python control flow
+# that can not be vectorized.  Pickling an np.ndarray of Values for every task sends the full Pint unit of each Value,
+# so instead each input is converted to one unit and its magnitudes are put in multiprocessing.shared_memory.  The
+# workers get the name of the memory and the unit string of each input once per batch, make the Values of their rows
+# and send back the magnitudes and unit of the results, which are gathered into ValueArrays.
+#
+# The function must be picklable (defined at the top level of a module), like for any process pool.
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+import numpy as np
+from physics.serialization import unit_to_str
+from physics.units import ureg, unit_algebra, convert, str_to_pint
+from physics.value import ValueArray, SuperValue, _new_value
+
+
+def _as_magnitudes(values):
+    # give the magnitudes (float64 np.ndarray) and unit (or None for plain numbers) of an input
+    if isinstance(values, ValueArray):
+        return np.ascontiguousarray(values.magnitude, dtype=np.float64), values.unit
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return np.ascontiguousarray(values, dtype=np.float64), None
+    # np.asarray would drop the units of a list of Values, since Value is a float
+    array = np.asarray(values, dtype=object)
+    if array.size > 0 and isinstance(array.flat[0], SuperValue):
+        array = ValueArray.from_values(array)
+        return array.magnitude, array.unit
+    return array.astype(np.float64), None
+
+
+def _gather(results):
+    # give the magnitudes and unit string (or the np.ndarray and None) of one output of a batch
+    first = results[0]
+    if not isinstance(first, SuperValue):
+        return np.asarray(results), None
+    unit = first.unit
+    magnitudes = np.empty(len(results), dtype=np.float64)
+    for i, result in enumerate(results):
+        if result.unit == unit:
+            magnitudes[i] = result.magnitude
+        else:
+            _, factor = unit_algebra('add', unit, result.unit)
+            magnitudes[i] = result.magnitude * factor if factor is not None else \
+                ureg.Quantity(result.magnitude, result.unit).to(unit).magnitude
+    return magnitudes, unit_to_str(unit)
+
+
+def _run_batch(function, specs, start, stop, constants):
+    # run the function on the rows [start, stop) of the inputs in shared memory
+    memories = []
+    try:
+        columns = []
+        for name, memory_name, size, unit in specs:
+            # the workers share the resource tracker of the main process, which unlinks the memory
+            memory = shared_memory.SharedMemory(name=memory_name)
+            memories.append(memory)
+            magnitudes = np.ndarray((size,), dtype=np.float64, buffer=memory.buf)[start:stop].tolist()
+            columns.append((name, magnitudes, None if unit is None else str_to_pint(unit)))
+
+        results = []
+        for i in range(stop - start):
+            kwargs = dict(constants)
+            for name, magnitudes, unit in columns:
+                kwargs[name] = magnitudes[i] if unit is None else _new_value(magnitudes[i], unit)
+            results.append(function(**kwargs))
+        del columns
+    finally:
+        for memory in memories:
+            memory.close()
+
+    if isinstance(results[0], tuple):
+        return tuple(_gather([result[j] for result in results]) for j in range(len(results[0])))
+    return _gather(results)
+
+
+def _combine(batches):
+    # join the outputs of the batches into a ValueArray (or np.ndarray for outputs without units)
+    unit = batches[0][1]
+    if unit is None:
+        return np.concatenate([magnitudes for magnitudes, _ in batches])
+    unit = str_to_pint(unit)
+    chunks = []
+    for magnitudes, batch_unit in batches:
+        batch_unit = str_to_pint(batch_unit)
+        chunks.append(magnitudes if batch_unit == unit else convert(magnitudes, batch_unit, unit)[0])
+    return ValueArray(np.concatenate(chunks), unit)
+
+
+def sweep(function, inputs, constants=None, processes=None, batch_size=None):
+    """
+    Calls function for each row of the inputs in a pool of worker processes
+
+    Args:
+        function (callable): Takes each input (and constant) as a keyword and gives a Value, a number or a tuple of these.
+            Must be picklable
+        inputs (dict): The inputs by keyword.  Each is a ValueArray, a collection of Values (or MetaValues) or an
+            np.ndarray of numbers, with the same length.  The Values of an input are converted to the unit of the first
+        constants (dict, optional): Keywords passed to every call.  They are pickled once per batch
+        processes (int, optional): The number of worker processes.  Default is os.cpu_count().  With 0 the function
+            is called in this process
+        batch_size (int, optional): The rows of each task.  Default splits the rows into 4 batches per process
+
+    Returns:
+        ValueArray (or np.ndarray for outputs without units), or a tuple of these if the function gives a tuple
+
+    For Example::
+        def breakdown(voltage, thickness):
+            if voltage / thickness > Value(1, ureg.volt / ureg.nanometer):
+                return Value(1, ureg.amp)
+            return Value(0, ureg.amp)
+
+        sweep(breakdown, {'voltage': [Value(v, ureg.volt) for v in range(100)]},
+              constants={'thickness': Value(10, ureg.nanometer)})
+    """
+    constants = dict(constants or {})
+    names = list(inputs.keys())
+    columns = [_as_magnitudes(inputs[name]) for name in names]
+    size = len(columns[0][0]) if columns else 0
+    assert all(len(magnitudes) == size for magnitudes, _ in columns), 'All the inputs must have the same length'
+    assert size > 0, 'The inputs must have at least one row'
+
+    processes = os.cpu_count() if processes is None else processes
+    if batch_size is None:
+        batch_size = max(1, -(-size // (max(processes, 1) * 4)))
+    bounds = [(start, min(start + batch_size, size)) for start in range(0, size, batch_size)]
+
+    memories = []
+    try:
+        specs = []
+        for name, (magnitudes, unit) in zip(names, columns):
+            memory = shared_memory.SharedMemory(create=True, size=max(magnitudes.nbytes, 1))
+            memories.append(memory)
+            np.ndarray(magnitudes.shape, dtype=np.float64, buffer=memory.buf)[:] = magnitudes
+            specs.append((name, memory.name, size, None if unit is None else unit_to_str(unit)))
+
+        if processes == 0:
+            # run here, with the same batches as the workers so the results are the same
+            batches = [_run_batch(function, specs, start, stop, constants) for start, stop in bounds]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = [executor.submit(_run_batch, function, specs, start, stop, constants)
+                           for start, stop in bounds]
+                batches = [future.result() for future in futures]
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+
+    if isinstance(batches[0], tuple):
+        return tuple(_combine([batch[j] for batch in batches]) for j in range(len(batches[0])))
+    return _combine(batches)
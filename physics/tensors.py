@@ -0,0 +1,97 @@
+# H1 -- Tensorflow placeholders for named Values
+# **********************************************
+# A named Value is an input of a tensorflow graph.  Making a new tf.placeholder for every named Value grows the graph
+# with name_1, name_2, ... each time the inputs are rebuilt, so the placeholders are kept in a registry keyed by the
+# graph, name, shape and dtype and the same tensor is given back.
+import weakref
+import numpy as np
+import physics.conf as conf
+
+# the placeholders of each graph, keyed by (name, shape, dtype).  Entries are removed with the graph
+_registry = weakref.WeakKeyDictionary()
+
+
+def _tf_v1():
+    # the graph mode api, which is tf.compat.v1 in tensorflow 2
+    tf = conf.import_tf()
+    if tf is None:
+        return None
+    return getattr(getattr(tf, 'compat', None), 'v1', tf)
+
+
+def placeholder(name, shape=(None, 1), dtype=None):
+    """Gives the placeholder for a name in the default graph, making it the first time
+
+        Args:
+            name (str): The name of the placeholder
+            shape (tuple, optional): The shape of the placeholder.  Default is (None, 1)
+            dtype (tf.DType, optional): The dtype.  Default is conf.tf_dtype
+
+        Returns:
+            The tf.placeholder, or None if tensorflow is not available
+    """
+    tf = _tf_v1()
+    if tf is None:
+        return None
+    if dtype is None:
+        dtype = conf.tf_dtype
+    graph = tf.get_default_graph()
+    placeholders = _registry.setdefault(graph, {})
+    key = (name, tuple(shape), dtype)
+    if key not in placeholders:
+        placeholders[key] = tf.placeholder(name=name, shape=shape, dtype=dtype)
+    return placeholders[key]
+
+
+def clear_placeholders():
+    """Forgets the placeholders of all graphs, so the next named Values make new placeholders"""
+    _registry.clear()
+
+
+def _feed_shape(shape, size):
+    # give the shape to feed size magnitudes to a placeholder of shape, the same as Value.tf_feed for a single Value
+    shape = tuple(shape)
+    if len(shape) == 0:
+        return ()
+    return (size,) + (1,) * (len(shape) - 1)
+
+
+def feed_dict(values=(), arrays=None, dtype=np.float32):
+    """Builds one feed_dict for many named Values and arrays.  Values with the same placeholder are fed together as a
+    batch, with one array made for each placeholder instead of one reshape per Value.
+
+        Args:
+            values (iterable, optional): The named Values (or MetaValues)
+            arrays (dict, optional): Arrays (np.ndarray or ValueArray) to feed, keyed by placeholder or name.  A name
+                uses the placeholder of the name with shape (None, 1) and the default dtype
+            dtype (np.dtype, optional): The dtype of the fed arrays.  Default is np.float32
+
+        Returns:
+            dict of placeholders to np.ndarray
+
+        For Example::
+            values = [Value(i, ureg.volt, name='V') for i in range(100)]
+            session.run(output, feed_dict=feed_dict(values))
+    """
+    batches = {}
+    shapes = {}
+    for value in values:
+        tensor = value.placeholder
+        assert tensor is not None, 'The Value {0} does not have a placeholder. Be sure the conf.tf_flag is True and a ' \
+                                   'name was given for the Value instance.'.format(value)
+        batches.setdefault(tensor, []).append(value.magnitude)
+        shapes[tensor] = value.tf_shape
+
+    feed = {}
+    for tensor, magnitudes in batches.items():
+        array = np.fromiter(magnitudes, dtype=dtype, count=len(magnitudes))
+        feed[tensor] = array.reshape(_feed_shape(shapes[tensor], len(magnitudes)))
+
+    for key, array in (arrays or {}).items():
+        tensor = placeholder(key) if isinstance(key, str) else key
+        array = np.asarray(getattr(array, 'magnitude', array), dtype=dtype)
+        if array.ndim == 1 and len(tensor.shape) == 2:
+            # feed a 1d array as a column, like a batch of Values
+            array = array.reshape(-1, 1)
+        feed[tensor] = array
+    return feed
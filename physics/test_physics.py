@@ -1,7 +1,51 @@
-from physics.value import Value, ureg, MetaValue
-from physics.fields import Field
+from physics.value import Value, ValueArray, ureg, MetaValue
+from physics.fields import Field, FieldTable
+from physics.units import unit_algebra, unit_cache_info, clear_unit_cache, conversion_cache_info, str_to_pint, \
+    unit_string_cache_info, pint_to_str
+import physics.units as units
+import physics.vectorized as vectorized
+import physics.registry_cache as registry_cache
+import physics.serialization as serialization
+import physics.storage as storage
+from physics.expression import Input, deferred
+from physics.kernel import kernel
+import physics.tensors as tensors
+import physics.benchmarks.suite as suite
+import physics.profiling as profiling
+from physics.materials.material_registry import MaterialRegistry, default_registry
+from physics.materials.Material import Semiconductor, Insulator
+from physics.materials.properties import TabulatedProperty, PowerLaw, Varshni
+from physics.sweep import sweep
+import physics.text_io as text_io
+from physics.uncertainty import UncertainValue, monte_carlo
+import physics.conf as conf
+import pint
 import numpy as np
+import pickle
+import io
+import operator
+import json
+import subprocess
+import sys
+import tempfile
+import os
 import unittest
+from unittest import mock
+
+
+class PickleMetaValue(MetaValue):
+    # MetaValue classes must be importable to be pickled
+
+    def __init__(self, value):
+        self.value = value
+
+
+def sweep_model(voltage, resistance, limit):
+    # a model with python control flow for test_sweep, at the top level so it can be pickled
+    current = voltage / resistance
+    if current > limit:
+        return limit, 1
+    return current, 0
 
 
 class TestPhysicsPackage(unittest.TestCase):
@@ -97,4 +141,739 @@ class TestPhysicsPackage(unittest.TestCase):
         # test the divide function
         self.assertEqual(d / e_meta, b, 'Error in MetaValue.__truediv__()')
         self.assertEqual(d_meta / e_meta, b, 'Error in MetaValue.__truediv__()')
-        self.assertEqual(a, a / a_n, 'Error in MetaValue.__truediv__()')
\ No newline at end of file
+        self.assertEqual(a, a / a_n, 'Error in MetaValue.__truediv__()')
+
+    def test_valuearray(self):
+
+        # test arrays of any rank
+        a = Value.array_like(array=np.arange(24).reshape((2, 3, 4)), unit=ureg.millivolt)
+        self.assertTrue(isinstance(a, ValueArray), 'Error in Value.array_like()')
+        self.assertEqual(Value(5, ureg.millivolt), a[0, 1, 1], 'Error in ValueArray.__getitem__()')
+
+        # slices are views of the same buffer
+        b = a[1]
+        b[0, 0] = Value(1, ureg.volt)
+        self.assertEqual(Value(1000, ureg.millivolt), a[1, 0, 0], 'Error in ValueArray.__setitem__()')
+
+        # test math operations with Values, floats and ValueArrays
+        v = Value(2, ureg.volt)
+        e = Value(2, ureg.ohm)
+        self.assertEqual(Value(2001, ureg.millivolt), (a + v)[0, 0, 1], 'Error in ValueArray.__add__()')
+        self.assertEqual(Value(1999, ureg.millivolt), (v - a)[0, 0, 1], 'Error in ValueArray.__rsub__()')
+        self.assertEqual(Value(3, ureg.milliamp), (a / e)[0, 1, 2], 'Error in ValueArray.__truediv__()')
+        self.assertEqual(Value(12, ureg.millivolt), (2 * a)[0, 1, 2], 'Error in ValueArray.__rmul__()')
+        self.assertEqual(Value(0.5, ureg.volt**-1), (1 / v * a / a)[0, 0, 1], 'Error in ValueArray.__truediv__()')
+
+        # test broadcasting between ValueArrays
+        c = a[0] * Value.array_like(array=np.array([1, 2, 3, 4]), unit=ureg.amp)
+        self.assertEqual((3, 4), c.shape, 'Error in ValueArray broadcasting')
+        self.assertEqual(Value(6, ureg.milliwatt), c[0, 2], 'Error in ValueArray.__mul__()')
+
+        # test the comparisons and conversion from object arrays
+        self.assertTrue(np.all(a[0] < v), 'Error in ValueArray.__lt__()')
+        d = ValueArray.from_values(np.array([Value(1, ureg.volt), Value(5, ureg.millivolt)], dtype=object))
+        self.assertTrue(np.allclose([1, 0.005], d.magnitude), 'Error in ValueArray.from_values()')
+
+    def test_unit_cache(self):
+
+        clear_unit_cache()
+        a = Value(2, ureg.amp)
+        e = Value(3, ureg.ohm)
+        for i in range(10):
+            d = a * e
+        info = unit_cache_info()
+        self.assertEqual(1, info.misses, 'Error in unit_algebra() cache misses')
+        self.assertEqual(9, info.hits, 'Error in unit_algebra() cache hits')
+        self.assertEqual(Value(6, ureg.volt), d, 'Error in Value.__mul__()')
+
+        # adding converts the magnitude with the cached scale factor
+        self.assertEqual((ureg.volt, 0.001), unit_algebra('add', ureg.volt, ureg.millivolt), 'Error in unit_algebra()')
+        self.assertEqual(Value(1.5, ureg.volt), Value(1, ureg.volt) + Value(500, ureg.millivolt), 'Error in Value.__add__()')
+        self.assertEqual(None, unit_algebra('add', ureg.volt, ureg.amp)[0], 'Error in unit_algebra()')
+
+        # units with an offset are left to Pint, even the same unit, so the ambiguous operations still raise
+        self.assertEqual((ureg.degC, None), unit_algebra('add', ureg.degC, ureg.degC), 'Error in unit_algebra()')
+        for operation in (operator.add, operator.mul):
+            with self.assertRaises(pint.OffsetUnitCalculusError):
+                operation(Value(1, ureg.degC), Value(2, ureg.degC))
+            with self.assertRaises(pint.OffsetUnitCalculusError):
+                operation(ValueArray(np.ones(2), ureg.degC), ValueArray(np.ones(2), ureg.degC))
+        self.assertEqual(Value(-1, ureg.delta_degC), Value(1, ureg.degC) - Value(2, ureg.degC), 'Error in Value.__sub__()')
+        self.assertEqual(ureg.delta_degC, (ValueArray(np.ones(2), ureg.degC) - Value(2, ureg.degC)).unit,
+                         'Error in ValueArray.__sub__()')
+        with self.assertRaises(pint.OffsetUnitCalculusError):
+            Value(1, ureg.degC) * Value(2, ureg.volt)
+        self.assertEqual(Value(0.5), Value(1, ureg.degC) / Value(2, ureg.degC), 'Error in Value.__truediv__()')
+        self.assertEqual(Value(3, ureg.degC), Value(3, ureg.degC), 'Error in Value.__eq__()')
+
+        clear_unit_cache()
+        self.assertEqual(0, unit_cache_info().currsize, 'Error in clear_unit_cache()')
+
+    def test_comparisons(self):
+
+        a = Value(2, ureg.volt)
+        b = Value(5, ureg.millivolt)
+        c = Value(0.1, ureg.kilovolt)
+
+        # test the comparisons between different prefixes
+        self.assertTrue(b < a, 'Error in Value.__lt__()')
+        self.assertTrue(c >= a, 'Error in Value.__ge__()')
+        self.assertTrue(Value(2000, ureg.millivolt) <= a, 'Error in Value.__le__()')
+        self.assertEqual(Value(2000, ureg.millivolt), a, 'Error in Value.__eq__()')
+        self.assertNotEqual(Value(2, ureg.amp), a, 'Error in Value.__ne__()')
+        self.assertTrue(Value(1, ureg.centimeter) == 0.01, 'Error in Value.__eq__()')
+        self.assertTrue(Value(0, ureg.degC) > 273, 'Error in Value.__gt__()')
+        with self.assertRaises(pint.DimensionalityError):
+            a < Value(2, ureg.amp)
+
+        # test the vectorized functions
+        values = [a, b, c]
+        self.assertEqual([1, 0, 2], list(vectorized.argsort(values)), 'Error in vectorized.argsort()')
+        self.assertEqual([b, a, c], sorted(values), 'Error in Value sorting')
+        self.assertEqual(1, vectorized.searchsorted(vectorized.sort(values), Value(1, ureg.volt)),
+                         'Error in vectorized.searchsorted()')
+        self.assertTrue(vectorized.min(values) is b, 'Error in vectorized.min()')
+        self.assertTrue(vectorized.max(values) is c, 'Error in vectorized.max()')
+        self.assertEqual(Value(5, ureg.volt), vectorized.max(Value.array_like(np.array([[1, 5], [3, 2]]), ureg.volt)),
+                         'Error in vectorized.max()')
+
+    def test_lazy_import(self):
+
+        # importing physics.value should not build the unit tables or import tensorflow
+        statement = 'import sys, physics.value, physics.units; ' \
+                    'assert physics.units._unit_tables is None; assert "tensorflow" not in sys.modules'
+        self.assertEqual(0, subprocess.call([sys.executable, '-c', statement]), 'Error in lazy import of physics.value')
+
+        # the tables are built on first access
+        from physics.units import complete_units, complete_units_dict, str_to_pint
+        self.assertEqual(90, len(complete_units), 'Error in physics.units.complete_units')
+        self.assertEqual(ureg.kiloohm, str_to_pint('kiloohm'), 'Error in str_to_pint()')
+
+    def test_registry_cache(self):
+
+        cache_dir = conf.registry_cache_dir
+        try:
+            with tempfile.TemporaryDirectory() as conf.registry_cache_dir:
+                # the first load writes the cache and the second reads it
+                registry_cache.load_registry()
+                self.assertTrue(registry_cache.read_cache('registry') is not None, 'Error in registry_cache.write_cache()')
+                registry = registry_cache.load_registry()
+
+                self.assertEqual(0.001, (1 * registry.millivolt).to(registry.volt).magnitude, 'Error in cached registry')
+                self.assertEqual(274.15, (1 * registry.degC).to(registry.kelvin).magnitude, 'Error in cached registry')
+                with registry.context('sp'):
+                    self.assertAlmostEqual(599.584916, (500 * registry.nanometer).to(registry.terahertz).magnitude, 5,
+                                           'Error in cached registry contexts')
+        finally:
+            conf.registry_cache_dir = cache_dir
+
+    def test_conversion_plans(self):
+
+        clear_unit_cache()
+        a = Value(3000, ureg.volt)
+        b = Value(2, ureg.milliamp) * Value(5, ureg.kiloohm)
+
+        # test the conversions against Pint
+        for value in [a, b]:
+            q = value.magnitude * value.unit
+            for result, expected in [(value.base_units(), q.to_base_units()),
+                                     (value.reduced_units(), q.to_reduced_units()),
+                                     (value.compact_units(), q.to_compact()),
+                                     (value.simplify_units(), q.to_reduced_units().to_compact())]:
+                self.assertEqual(expected.units, result.unit, 'Error in the Value conversions')
+                self.assertAlmostEqual(expected.magnitude, result.magnitude, 10, 'Error in the Value conversions')
+
+        # units with an offset are converted by Pint, but a prefix on them (i.e. kilodegC) is not the same temperature
+        c = Value(3000, ureg.degC)
+        self.assertEqual(Value(3273.15, ureg.kelvin), c.base_units(), 'Error in Value.base_units()')
+        with self.assertRaises(pint.OffsetUnitCalculusError):
+            c.compact_units()
+        with self.assertRaises(pint.OffsetUnitCalculusError):
+            c.simplify_units()
+        self.assertEqual(Value(3, ureg.kilovolt), a.compact_units(), 'Error in Value.compact_units()')
+        self.assertEqual(ureg.kilovolt, a.compact_units().unit, 'Error in Value.compact_units()')
+        self.assertEqual(ureg.millivolt, a.adjust_unit(ureg.millivolt).unit, 'Error in Value.adjust_unit()')
+
+        # repeated conversions use the cached plans
+        misses = conversion_cache_info().misses
+        a.adjust_unit(ureg.millivolt)
+        self.assertEqual(misses, conversion_cache_info().misses, 'Error in the conversion plan cache')
+
+        # a cached plan to a unit is one lookup, Pint does not parse a string or convert anything
+        millivolt = ureg.millivolt
+        array = ValueArray(np.array([1.0, 2.0]), ureg.volt)
+        with mock.patch.object(pint.util.ParserHelper, 'from_string', side_effect=AssertionError('Pint parsed')), \
+                mock.patch.object(units, '_pint_convert', side_effect=AssertionError('Pint converted')):
+            self.assertEqual(Value(3e6, millivolt), a.adjust_unit(millivolt), 'Error in the conversion plan cache')
+            self.assertTrue(np.allclose([1000, 2000], vectorized.convert(array, millivolt).magnitude),
+                            'Error in the conversion plan cache')
+
+        # test the conversions of arrays of Values
+        values = vectorized.convert([Value(2, ureg.volt), Value(5, ureg.millivolt)], ureg.millivolt)
+        self.assertEqual([Value(2000, ureg.millivolt), Value(5, ureg.millivolt)], list(values),
+                         'Error in vectorized.convert()')
+        values = vectorized.convert([Value(2000, ureg.volt), Value(0.005, ureg.volt)], 'compact')
+        self.assertEqual([ureg.kilovolt, ureg.millivolt], [v.unit for v in values], 'Error in vectorized.convert()')
+        array = Value.array_like(np.array([1, 2]), ureg.kilovolt).adjust_unit(ureg.volt)
+        self.assertTrue(np.allclose([1000, 2000], array.magnitude), 'Error in ValueArray.adjust_unit()')
+
+    def test_value_layout(self):
+
+        # Values have no __dict__ and store the magnitude once as the float
+        a = Value(3, ureg.amp) * Value(2, ureg.ohm)
+        self.assertFalse(hasattr(a, '__dict__'), 'Error in Value.__slots__')
+        self.assertEqual(6.0, a.magnitude, 'Error in Value.magnitude')
+        self.assertEqual(None, a.placeholder, 'Error in Value.placeholder')
+
+        # copy_value changes the magnitude and unit of a Value
+        b = Value(1, ureg.volt)
+        b.copy_value(Value(5, ureg.millivolt))
+        self.assertEqual(Value(5, ureg.millivolt), b, 'Error in Value.copy_value()')
+
+        # test pickling of Values and MetaValues
+        for value in [a, b]:
+            result = pickle.loads(pickle.dumps(value))
+            self.assertEqual(value, result, 'Error in pickling Value')
+            self.assertEqual(value.unit, result.unit, 'Error in pickling Value')
+
+        c = pickle.loads(pickle.dumps(PickleMetaValue(a)))
+        self.assertEqual(a, c, 'Error in pickling MetaValue')
+        self.assertEqual(Value(12, ureg.volt), c * Value(2, ureg.dimensionless), 'Error in pickling MetaValue')
+
+    def test_serialization(self):
+
+        # test a list of Values and MetaValues with mixed and fractional units
+        values = [Value(1.5, ureg.volt), Value(2, ureg.millivolt), Value(3, ureg.meter ** (1 / 3)),
+                  PickleMetaValue(Value(4, ureg.volt))]
+        result = serialization.loads(serialization.dumps(values))
+        self.assertIsInstance(result, list, 'Error in serialization.loads()')
+        for value, loaded in zip(values, result):
+            self.assertEqual(value.magnitude, loaded.magnitude, 'Error in serialization.loads()')
+            self.assertEqual(value.unit, loaded.unit, 'Error in serialization.loads()')
+
+        # the units are stored once
+        raw = serialization.loads_raw(serialization.dumps(values))
+        self.assertEqual(3, len(raw['units']), 'Error in serialization.loads_raw()')
+        self.assertEqual([0, 1, 2, 0], raw['codes'].tolist(), 'Error in serialization.loads_raw()')
+
+        # test arrays with names
+        array = np.array([[Value(1, ureg.amp, name='a'), Value(2, ureg.amp)]], dtype=object)
+        result = serialization.loads(serialization.dumps(array))
+        self.assertEqual((1, 2), result.shape, 'Error in serialization.loads()')
+        self.assertEqual('a', result[0, 0].name, 'Error in serialization.loads()')
+
+        # test a ValueArray
+        value_array = ValueArray(np.arange(6.).reshape(2, 3), ureg.ohm)
+        result = serialization.loads(serialization.dumps(value_array))
+        self.assertIsInstance(result, ValueArray, 'Error in serialization.loads()')
+        self.assertEqual(value_array.unit, result.unit, 'Error in serialization.loads()')
+        self.assertTrue(np.array_equal(value_array.magnitude, result.magnitude), 'Error in serialization.loads()')
+
+    def test_storage(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'temperature.phym')
+
+            # the values are saved in the unit of the field
+            array = ValueArray(np.arange(6.).reshape(2, 3), ureg.millikelvin)
+            storage.save(path, array, Field('temperature', name='T'))
+            header = storage.read_header(path)
+            self.assertEqual(Field('temperature', name='T'), header['field'], 'Error in storage.read_header()')
+            self.assertEqual(ureg.kelvin, header['unit'], 'Error in storage.read_header()')
+
+            result = storage.load(path)
+            self.assertEqual((2, 3), result.shape, 'Error in storage.load()')
+            self.assertTrue(np.allclose(array.magnitude / 1000, result.magnitude), 'Error in storage.load()')
+            self.assertEqual(Value(0.005, ureg.kelvin), result[1, 2], 'Error in storage.load()')
+
+            # append one step and then two steps
+            self.assertEqual((3, 3), storage.append(path, [Value(1, ureg.kelvin)] * 3), 'Error in storage.append()')
+            self.assertEqual((5, 3), storage.append(path, ValueArray(np.ones((2, 3)), ureg.kelvin)),
+                             'Error in storage.append()')
+            result = storage.load(path)
+            self.assertEqual((5, 3), result.shape, 'Error in storage.append()')
+            self.assertTrue(np.all(result.magnitude[2:] == 1), 'Error in storage.append()')
+            del result
+
+    def test_expression(self):
+
+        def power(current, resistance, offset):
+            voltage = current * resistance + offset
+            return voltage * voltage / resistance + (current * resistance + offset) * current
+
+        # the units are checked while the graph is built and equal subexpressions are one step
+        expression = deferred(power, current=ureg.amp, resistance=ureg.ohm, offset=ureg.millivolt)
+        self.assertEqual(ureg.amp ** 2 * ureg.ohm, expression.unit, 'Error in deferred()')
+        self.assertEqual(11, len(expression.plan()), 'Error in Expression.plan()')
+        with self.assertRaises(pint.DimensionalityError):
+            Input('V', ureg.volt) + Input('I', ureg.amp)
+
+        # evaluating gives the same result as the Value operators
+        current = np.linspace(0, 1, 5)
+        resistance = [Value(r, ureg.ohm) for r in [1, 2, 3, 4, 5]]
+        offset = PickleMetaValue(Value(5, ureg.millivolt))
+        result = expression(current=current, resistance=resistance, offset=Value(5, ureg.millivolt))
+        self.assertIsInstance(result, ValueArray, 'Error in Expression.evaluate()')
+        for i in range(5):
+            expected = power(Value(current[i], ureg.amp), resistance[i], offset)
+            self.assertAlmostEqual(expected.magnitude, result.magnitude[i], 12, 'Error in Expression.evaluate()')
+
+        # a list of Values in another prefix is converted to the unit of the Input
+        kiloohms = [Value(r / 1000, ureg.kiloohm) for r in [1, 2, 3, 4, 5]]
+        np.testing.assert_allclose(result.magnitude, expression(current=current, resistance=kiloohms,
+                                                                offset=Value(5, ureg.millivolt)).magnitude,
+                                   err_msg='Error in Expression.evaluate()')
+
+        # single values give a Value and the result can be converted
+        result = expression.evaluate(unit=ureg.milliwatt, current=Value(1, ureg.amp), resistance=resistance[0],
+                                     offset=offset)
+        self.assertAlmostEqual(2015.025, result.magnitude, 9, 'Error in Expression.evaluate()')
+        self.assertEqual(ureg.milliwatt, result.unit, 'Error in Expression.evaluate()')
+
+        # Value and MetaValue operators defer to the Expression
+        self.assertEqual(['I'], list((offset * Input('I', ureg.amp)).inputs), 'Error in MetaValue operators')
+
+    def test_kernel(self):
+
+        @kernel
+        def power(current, resistance, offset):
+            voltage = current * resistance + offset
+            return voltage * voltage / resistance
+
+        @kernel
+        def makes_values(current):
+            return current + Value(1, ureg.amp)
+
+        # the first call checks the units, later calls with the same units use floats
+        args = (Value(2, ureg.amp), Value(4, ureg.ohm), Value(2, ureg.millivolt))
+        expected = power.__wrapped__(*args)
+        for i in range(3):
+            result = power(*args)
+            self.assertAlmostEqual(expected.magnitude, result.magnitude, 12, 'Error in kernel()')
+            self.assertEqual(expected.unit, result.unit, 'Error in kernel()')
+        self.assertEqual((2, 1), power.cache_info()[:2], 'Error in kernel cache_info()')
+
+        # a new unit signature is a miss, and ValueArrays give ValueArrays
+        result = power(ValueArray(np.ones(3), ureg.milliamp), resistance=Value(4, ureg.ohm), offset=Value(0, ureg.volt))
+        self.assertIsInstance(result, ValueArray, 'Error in kernel()')
+        self.assertEqual((2, 2), power.cache_info()[:2], 'Error in kernel cache_info()')
+
+        # functions that make their own Values always run with Values
+        for i in range(2):
+            self.assertEqual(Value(1002, ureg.milliamp), makes_values(Value(2, ureg.milliamp)), 'Error in kernel()')
+        self.assertEqual((1, 1), makes_values.cache_info()[:2], 'Error in kernel cache_info()')
+
+    def test_tensors(self):
+
+        if conf.import_tf() is None:
+            self.skipTest('tensorflow is not installed')
+        graph = tensors._tf_v1().get_default_graph()
+
+        # rebuilding named Values reuses the placeholders, so the graph does not grow
+        values = [Value(1, ureg.volt, name='tensors_v'), Value(2, ureg.amp, name='tensors_i')]
+        size = len(graph.get_operations())
+        for i in range(10):
+            values = [Value(i, ureg.volt, name='tensors_v'), Value(i, ureg.amp, name='tensors_i')]
+        self.assertEqual(size, len(graph.get_operations()), 'Error in tensors.placeholder()')
+        self.assertIs(values[0].placeholder, tensors.placeholder('tensors_v'), 'Error in tensors.placeholder()')
+
+        # Values with the same placeholder are fed as one batch
+        batch = [Value(i, ureg.volt, name='tensors_v') for i in range(5)]
+        feed = tensors.feed_dict(batch, arrays={'tensors_i': np.arange(5.)})
+        self.assertEqual((5, 1), feed[values[0].placeholder].shape, 'Error in tensors.feed_dict()')
+        self.assertEqual((5, 1), feed[values[1].placeholder].shape, 'Error in tensors.feed_dict()')
+        self.assertEqual(batch[0].tf_feed.shape, tensors.feed_dict(batch[:1])[values[0].placeholder].shape,
+                         'Error in tensors.feed_dict()')
+
+    def test_benchmark_suite(self):
+
+        # every benchmark gives the same result as the pint oracle
+        results = suite.run(min_time=0.0, repeat=1, include_import=False)
+        self.assertEqual([], [name for name, result in results.items() if not result['matches']],
+                         'Error in benchmarks.suite.run()')
+
+        # the oracle check catches wrong results
+        self.assertFalse(suite.matches(Value(2, ureg.volt), ureg.Quantity(2, ureg.millivolt)),
+                         'Error in benchmarks.suite.matches()')
+
+        # slower results than the baseline are regressions
+        baseline = {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}}
+        self.assertEqual(['b'], list(suite.compare({'a': {'seconds': 1.1}, 'b': {'seconds': 2.0}}, baseline)),
+                         'Error in benchmarks.suite.compare()')
+
+    def test_profiling(self):
+
+        # nothing is wrapped when the profiling is off
+        mul = Value.__dict__['__mul__']
+        self.assertFalse(profiling.is_enabled(), 'Error in profiling.is_enabled()')
+
+        profiling.reset()
+        with profiling.profile():
+            a = Value(2, ureg.amp) * Value(3, ureg.ohm)
+            PickleMetaValue(a) * Value(1, ureg.amp)
+            Value(1, ureg.degC).adjust_unit(ureg.kelvin)
+            a * np.array([Value(1, ureg.amp)], dtype=object)
+            # the Values made inside the other Physics modules are charged to this line
+            vectorized.mean([Value(1, ureg.volt), Value(2, ureg.millivolt)])
+        self.assertIs(mul, Value.__dict__['__mul__'], 'Error in profiling.disable()')
+
+        summary = profiling.summary()
+        self.assertEqual(4, summary['Value.__mul__'][0], 'Error in profiling.summary()')
+        self.assertEqual(1, summary['MetaValue.__mul__'][0], 'Error in profiling.summary()')
+        self.assertEqual(1, summary['object ndarray dispatch'][0], 'Error in profiling.summary()')
+        self.assertTrue(summary['pint Quantity'][0] > 0, 'Error in profiling.summary()')
+        self.assertTrue(summary['Value allocation'][0] >= 6, 'Error in profiling.summary()')
+
+        # the events are recorded by the line that caused them
+        self.assertTrue(all(key[1] == __file__ for key in profiling.stats()), 'Error in profiling.stats()')
+        profiling.reset()
+
+    def test_field_table(self):
+
+        temperature = Field('temperature', name='T')
+        flux = Field('heat_flux', name='q')
+        flux_unit = ureg.watt / ureg.meter ** 2
+
+        # the columns are converted to the unit of the Field once
+        table = FieldTable({temperature: ValueArray(np.array([300., 310., 320.]), ureg.kelvin),
+                            flux: [Value(1, flux_unit), Value(2000, ureg.milliwatt / ureg.meter ** 2),
+                                   Value(3, flux_unit)]})
+        self.assertEqual(3, len(table), 'Error in FieldTable.__len__()')
+        self.assertTrue(np.allclose([1, 2, 3], table.column(flux)), 'Error in FieldTable.add_column()')
+        self.assertEqual(Value(2, flux_unit), table['q'][1], 'Error in FieldTable.__getitem__()')
+        with self.assertRaises(AssertionError):
+            table.add_column(Field('voltage', name='V'), np.ones(2))
+        with self.assertRaises(AssertionError):
+            FieldTable({temperature: ValueArray(np.ones(3), ureg.volt)})
+
+        # column selection and row filtering
+        self.assertEqual([flux], table[[flux]].fields, 'Error in FieldTable.select()')
+        hot = table[table[temperature] > Value(305, ureg.kelvin)]
+        self.assertEqual(2, len(hot), 'Error in FieldTable.filter()')
+        self.assertTrue(np.array_equal([2., 3.], hot.column('q')), 'Error in FieldTable.filter()')
+
+        # chunks in other units are converted when they are joined
+        chunk = FieldTable({Field('temperature', name='T', unit=ureg.degC): np.array([0.]), flux: np.array([4.])})
+        joined = FieldTable.concatenate([table, chunk])
+        self.assertEqual(4, len(joined), 'Error in FieldTable.concatenate()')
+        self.assertAlmostEqual(273.15, joined.column(temperature)[3], 9, 'Error in FieldTable.concatenate()')
+
+    def test_material_registry(self):
+
+        registry = default_registry()
+        self.assertIs(registry, default_registry(), 'Error in default_registry()')
+        self.assertTrue('silicon' in registry, 'Error in MaterialRegistry.from_csv()')
+
+        # range queries by class, with Values in other units or floats in the unit of the property
+        rows = registry.query('Semiconductor', bandgap=(Value(1, ureg.electron_volt), Value(2, ureg.electron_volt)))
+        self.assertEqual(['silicon', 'gallium arsenide', 'indium phosphide', 'cadmium telluride'],
+                         list(registry.names[rows]), 'Error in MaterialRegistry.query()')
+        bandgap = registry.values('bandgap', rows)
+        self.assertTrue(np.all((bandgap.magnitude >= 1) & (bandgap.magnitude <= 2)), 'Error in MaterialRegistry.values()')
+        self.assertEqual(['hafnium oxide'], list(registry.names[registry.query(Insulator, dielectric=(10, None))]),
+                         'Error in MaterialRegistry.query()')
+        millielectron_volt = registry.range_rows('bandgap', low=Value(5000, ureg.millielectron_volt))
+        self.assertTrue(all(registry.classes[row] == 'Insulator' for row in millielectron_volt),
+                        'Error in MaterialRegistry.range_rows()')
+
+        # Material objects are built on request, metals have no bandgap
+        silicon = registry.material('silicon')
+        self.assertIsInstance(silicon, Semiconductor, 'Error in MaterialRegistry.material()')
+        self.assertEqual(Value(1.12, ureg.electron_volt), silicon.bandgap, 'Error in MaterialRegistry.material()')
+        self.assertEqual(None, registry.material('copper').bandgap, 'Error in MaterialRegistry.material()')
+
+        # a registry from another csv file, queried in another temperature unit
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'materials.csv')
+            with open(path, 'w') as f:
+                f.write('name,class,melting_point [degC],bandgap [electron_volt]\n'
+                        'ice,Insulator,0,\n'
+                        'silicon,Semiconductor,1414,1.12\n')
+            registry = MaterialRegistry.from_csv(path)
+        self.assertEqual(2, len(registry), 'Error in MaterialRegistry.from_csv()')
+        self.assertTrue(np.isnan(registry.values('bandgap')[0].magnitude), 'Error in MaterialRegistry.from_csv()')
+        self.assertEqual(['silicon'], list(registry.names[registry.query(melting_point=(Value(500, ureg.kelvin), None))]),
+                         'Error in MaterialRegistry.query()')
+
+    def test_temperature_properties(self):
+
+        conductivity = ureg.watt / ureg.meter / ureg.kelvin
+        silicon = Semiconductor(Varshni(Value(1.166, ureg.eV), Value(4.73e-4, ureg.eV / ureg.kelvin),
+                                        Value(636, ureg.kelvin)),
+                                Value(11.7, ureg.dimensionless), 'silicon', PowerLaw(Value(148, conductivity), -1.3))
+
+        # a single temperature gives a Value, in any temperature unit
+        bandgap = silicon.property_at('bandgap', Value(300, ureg.kelvin))
+        self.assertAlmostEqual(1.166 - 4.73e-4 * 300 ** 2 / 936, bandgap.magnitude, 12, 'Error in Varshni()')
+        self.assertAlmostEqual(bandgap.magnitude, silicon.property_at('bandgap', Value(26.85, ureg.degC)).magnitude, 9,
+                               'Error in Material.property_at()')
+
+        # arrays of temperatures are evaluated in one call
+        temperature = ValueArray(np.array([300., 600.]), ureg.kelvin)
+        result = silicon.property_at('thermal_conductivity', temperature)
+        self.assertEqual(conductivity, result.unit, 'Error in PowerLaw()')
+        self.assertTrue(np.allclose([148, 148 * 2 ** -1.3], result.magnitude), 'Error in PowerLaw()')
+        self.assertTrue(np.array_equal([11.7, 11.7], silicon.property_at('dielectric', temperature).magnitude),
+                        'Error in Material.property_at()')
+
+        # tables are interpolated and clipped at the ends unless extrapolate is set
+        table = TabulatedProperty([200, 300, 400], [Value(200, conductivity), Value(148, conductivity),
+                                                    Value(100, conductivity)])
+        self.assertTrue(np.allclose([200, 174, 124, 100], table(np.array([100, 250, 350, 500])).magnitude),
+                        'Error in TabulatedProperty()')
+        table.extrapolate = True
+        self.assertAlmostEqual(252, table(100).magnitude, 9, 'Error in TabulatedProperty()')
+
+    def test_sweep(self):
+
+        voltage = [Value(v, ureg.volt) if v % 2 else Value(1000 * v, ureg.millivolt) for v in range(10)]
+        constants = {'resistance': Value(2, ureg.ohm), 'limit': Value(3, ureg.amp)}
+        expected = [sweep_model(v, constants['resistance'], constants['limit']) for v in voltage]
+
+        # the results are the same in this process and in worker processes
+        for processes in [0, 2]:
+            current, limited = sweep(sweep_model, {'voltage': voltage}, constants, processes=processes, batch_size=3)
+            self.assertIsInstance(current, ValueArray, 'Error in sweep()')
+            self.assertEqual(10, len(current), 'Error in sweep()')
+            for i, (expected_current, expected_limited) in enumerate(expected):
+                self.assertAlmostEqual(expected_current.magnitude, current[i].adjust_unit(expected_current.unit).magnitude,
+                                       12, 'Error in sweep()')
+                self.assertEqual(expected_limited, limited[i], 'Error in sweep()')
+
+    def test_unit_strings(self):
+
+        # any unit Pint can parse is allowed, and equivalent spellings give the same Unit object
+        clear_unit_cache()
+        unit = str_to_pint('kohm * m / s**2')
+        self.assertEqual(ureg.kiloohm * ureg.meter / ureg.second ** 2, unit, 'Error in str_to_pint()')
+        self.assertIs(unit, str_to_pint('kiloohm meter / second ** 2'), 'Error in str_to_pint()')
+        self.assertIs(str_to_pint('V'), str_to_pint('volt'), 'Error in str_to_pint()')
+        with self.assertRaises(EnvironmentError):
+            str_to_pint('not_a_unit')
+
+        # each string is parsed once
+        for i in range(10):
+            str_to_pint('mV')
+        info = unit_string_cache_info()
+        self.assertEqual(9, info.hits, 'Error in str_to_pint cache')
+        self.assertEqual(6, info.misses, 'Error in str_to_pint cache')
+
+    def test_text_export(self):
+        temperature = Field('temperature', name='T')
+        flux = Field('heat_flux', name='q')
+        table = FieldTable({temperature: ValueArray(np.array([300.0, 310.5, np.nan]), ureg.kelvin),
+                            flux: [Value(1, ureg.watt / ureg.meter ** 2), Value(2e-7, ureg.watt / ureg.meter ** 2),
+                                   Value(3, ureg.kilowatt / ureg.meter ** 2)]})
+
+        # csv with the units in the header, written in chunks
+        f = io.StringIO()
+        self.assertEqual(3, text_io.write_csv(f, table, chunk_size=2), 'Error in write_csv()')
+        self.assertEqual('T [kelvin],q [meter ** -2.0 * watt]\n300.0,1.0\n310.5,2e-07\nnan,3000.0\n', f.getvalue(),
+                         'Error in write_csv()')
+
+        # the exponents of the units are not rounded, so the units read back the same
+        f = io.StringIO()
+        text_io.write_csv(f, {'x': ValueArray(np.ones(2), ureg.meter ** (1 / 3))})
+        f.seek(0)
+        self.assertEqual(ureg.meter ** (1 / 3), text_io.read_csv(f)['x'].unit, 'Error in write_csv()')
+
+        # json lines
+        f = io.StringIO()
+        text_io.write_json_lines(f, {'v': [Value(1, ureg.volt), Value(5, ureg.millivolt)]}, fmt='%.3g')
+        lines = [json.loads(line) for line in f.getvalue().splitlines()]
+        self.assertEqual({'columns': ['v'], 'units': ['volt']}, lines[0], 'Error in write_json_lines()')
+        self.assertEqual([[1.0], [0.005]], lines[1:], 'Error in write_json_lines()')
+
+        # the string of each unit is cached
+        self.assertIs(pint_to_str(ureg.kelvin), pint_to_str(ureg.kelvin), 'Error in pint_to_str()')
+
+    def test_text_import(self):
+
+        # write a file and read it back in chunks
+        f = io.StringIO()
+        text_io.write_csv(f, {'T': ValueArray(np.linspace(300, 400, 11), ureg.kelvin),
+                              'q': ValueArray(np.arange(11.0), ureg.kilowatt / ureg.meter ** 2)})
+        f.seek(0)
+        chunks = list(text_io.iter_csv(f, chunk_size=4))
+        self.assertEqual([4, 4, 3], [len(chunk['T']) for chunk in chunks], 'Error in iter_csv()')
+        self.assertEqual(ureg.kilowatt / ureg.meter ** 2, chunks[0]['q'].unit, 'Error in iter_csv()')
+        np.testing.assert_allclose(chunks[2]['q'].magnitude, [8.0, 9.0, 10.0], err_msg='Error in iter_csv()')
+
+        # the chunks are FieldTables in the units of the fields
+        f.seek(0)
+        flux = Field('heat_flux', name='q')
+        table = text_io.read_csv(f, fields={'q': flux})
+        self.assertEqual([flux], table.fields, 'Error in read_csv()')
+        np.testing.assert_allclose(table.column(flux), np.arange(11.0) * 1000, err_msg='Error in read_csv()')
+
+        # empty cells are nan, columns without a unit are dimensionless
+        columns = text_io.read_csv(io.StringIO('T [degC],n\n1.5,\n,2\n'))
+        self.assertEqual(ureg.degC, columns['T'].unit, 'Error in read_csv()')
+        self.assertEqual(ureg.dimensionless, columns['n'].unit, 'Error in read_csv()')
+        np.testing.assert_array_equal([np.nan, 2.0], columns['n'].magnitude, err_msg='Error in read_csv()')
+
+        # one column with an empty cell keeps all of its rows
+        text = 'T [kelvin],q [watt / meter ** 2]\n300,1\n,5\n302,6\n'
+        temperature = Field('temperature', name='T')
+        table = text_io.read_csv(io.StringIO(text), fields={'T': temperature})
+        np.testing.assert_array_equal([300.0, np.nan, 302.0], table.column(temperature), err_msg='Error in read_csv()')
+        columns = text_io.read_csv(io.StringIO('T [kelvin],q [watt]\n300,\n301,5\n'), columns=['q'])
+        np.testing.assert_array_equal([np.nan, 5.0], columns['q'].magnitude, err_msg='Error in read_csv()')
+        columns = text_io.read_csv(io.StringIO('T [kelvin],q [watt]\n300,\n'))
+        np.testing.assert_array_equal([300.0], columns['T'].magnitude, err_msg='Error in read_csv()')
+
+    def test_uncertainty(self):
+        current = UncertainValue(2.0, 0.1, ureg.amp)
+        resistance = UncertainValue(np.array([10.0, 20.0]), 0.5, ureg.ohm)
+
+        # linear propagation, with Values as exact operands
+        voltage = current * resistance
+        self.assertEqual(ureg.amp * ureg.ohm, voltage.unit, 'Error in UncertainValue.__mul__()')
+        np.testing.assert_allclose(voltage.std, [np.hypot(1.0, 1.0), np.hypot(2.0, 1.0)],
+                                   err_msg='Error in UncertainValue.__mul__()')
+        total = Value(500, ureg.milliamp) + current
+        self.assertEqual((2.5, 0.1), (total.magnitude, total.std), 'Error in UncertainValue.__add__()')
+        ratio = Value(1, ureg.volt) / current
+        self.assertAlmostEqual(0.025, ratio.std, msg='Error in UncertainValue.__rtruediv__()')
+        self.assertAlmostEqual(0.4, (current ** 2).std, msg='Error in UncertainValue.__pow__()')
+        self.assertAlmostEqual(0.1 / (2 * np.sqrt(2)), current.sqrt().std, msg='Error in UncertainValue.sqrt()')
+        self.assertAlmostEqual(0.01 / np.log(10), UncertainValue(100, 1).log10().std,
+                               msg='Error in UncertainValue.log10()')
+        self.assertAlmostEqual(0.1, UncertainValue(25, 0.1, ureg.degC).adjust_unit(ureg.kelvin).std,
+                               msg='Error in UncertainValue.adjust_unit()')
+
+        # units with an offset follow the Pint rules of the Value operators
+        celsius = UncertainValue(20, 1, ureg.degC)
+        with self.assertRaises(pint.OffsetUnitCalculusError):
+            celsius + Value(1, ureg.kelvin)
+        with self.assertRaises(pint.OffsetUnitCalculusError):
+            celsius + celsius
+        difference = celsius - UncertainValue(10, 1, ureg.degC)
+        self.assertEqual(ureg.delta_degC, difference.unit, 'Error in UncertainValue.__sub__()')
+        self.assertEqual((10.0, np.hypot(1.0, 1.0)), (difference.magnitude, difference.std),
+                         'Error in UncertainValue.__sub__()')
+        self.assertEqual((Value(20, ureg.degC) - Value(10, ureg.degC)).unit, (celsius - Value(10, ureg.degC)).unit,
+                         'Error in UncertainValue.__sub__()')
+
+        # monte carlo agrees with the linear propagation for small uncertainties
+        def power(current, resistance):
+            return current ** 2 * resistance
+
+        result = monte_carlo(power, {'current': current, 'resistance': resistance}, samples=20000, random_state=0)
+        linear = power(current, resistance)
+        self.assertEqual(linear.unit, result.unit, 'Error in monte_carlo()')
+        np.testing.assert_allclose(result.magnitude, linear.magnitude, rtol=0.01, err_msg='Error in monte_carlo()')
+        np.testing.assert_allclose(result.std, linear.std, rtol=0.05, err_msg='Error in monte_carlo()')
+
+    def test_reductions(self):
+        values = [Value(2, ureg.volt), Value(500, ureg.millivolt), Value(0.5, ureg.volt)]
+
+        # the result is in the unit of the first Value
+        total = vectorized.sum(values)
+        self.assertEqual((3.0, ureg.volt), (total.magnitude, total.unit), 'Error in vectorized.sum()')
+        self.assertEqual(Value(1, ureg.volt), vectorized.mean(values), 'Error in vectorized.mean()')
+        self.assertAlmostEqual(np.std([2, 0.5, 0.5]), vectorized.std(values).magnitude, msg='Error in vectorized.std()')
+        np.testing.assert_allclose([2.0, 2.5, 3.0], vectorized.cumsum(values).magnitude,
+                                   err_msg='Error in vectorized.cumsum()')
+        array = ValueArray(np.arange(6.0).reshape(2, 3), ureg.amp)
+        np.testing.assert_allclose([3.0, 12.0], vectorized.sum(array, axis=1).magnitude,
+                                   err_msg='Error in vectorized.sum()')
+        with self.assertRaises(AssertionError):
+            vectorized.sum([Value(1, ureg.degC), Value(2, ureg.degC)])
+        with self.assertRaises(pint.DimensionalityError):
+            vectorized.sum([Value(1, ureg.volt), Value(2, ureg.amp)])
+
+        # integrating over a time Field gives the product unit
+        time = Field('time', name='t')
+        flux = Field('heat_flux', name='q')
+        table = FieldTable({time: ValueArray(np.linspace(0, 2, 5), ureg.second),
+                            flux: ValueArray(np.linspace(1, 3, 5), ureg.watt / ureg.meter ** 2)})
+        energy = vectorized.integrate(table[flux], table[time])
+        self.assertEqual(ureg.watt / ureg.meter ** 2 * ureg.second, energy.unit, 'Error in vectorized.integrate()')
+        self.assertAlmostEqual(4.0, energy.magnitude, msg='Error in vectorized.integrate()')
+        energy = vectorized.integrate([Value(1, ureg.watt), Value(3000, ureg.milliwatt)], dx=Value(2, ureg.second))
+        self.assertEqual(Value(4, ureg.joule), energy, 'Error in vectorized.integrate()')
+
+    def test_numpy_protocols(self):
+        voltage = ValueArray(np.array([1.0, 2.0]), ureg.volt)
+
+        # ufuncs keep and check the units
+        result = np.maximum(voltage, Value(1500, ureg.millivolt))
+        self.assertEqual(ureg.volt, result.unit, 'Error in np.maximum()')
+        np.testing.assert_allclose([1.5, 2.0], result.magnitude, err_msg='Error in np.maximum()')
+        self.assertEqual(ureg.volt ** 0.5, np.sqrt(voltage).unit, 'Error in np.sqrt()')
+        self.assertEqual(Value(2, ureg.meter), np.sqrt(Value(4, ureg.meter ** 2)), 'Error in np.sqrt()')
+        self.assertAlmostEqual(np.exp(2.0), np.exp(Value(2, ureg.meter) / Value(1000, ureg.millimeter)).magnitude,
+                               msg='Error in np.exp()')
+        with self.assertRaises(pint.DimensionalityError):
+            np.exp(voltage)
+        # units with an offset are not summed, and their differences are in the delta unit
+        celsius = ValueArray(np.array([20.0, 30.0]), ureg.degC)
+        with self.assertRaises(AssertionError):
+            np.add.reduce(celsius)
+        with self.assertRaises(AssertionError):
+            np.add.accumulate(celsius)
+        with self.assertRaises(pint.OffsetUnitCalculusError):
+            np.add(celsius, celsius)
+        self.assertEqual(ureg.delta_degC, np.subtract(celsius, Value(10, ureg.degC)).unit, 'Error in np.subtract()')
+        self.assertEqual(ureg.delta_degC, np.diff(celsius).unit, 'Error in np.diff()')
+        self.assertEqual(ureg.volt, np.diff(voltage).unit, 'Error in np.diff()')
+        # the angle ufuncs convert the angle once
+        self.assertEqual(Value(np.pi / 2, ureg.radian), np.deg2rad(Value(90, ureg.degree)), 'Error in np.deg2rad()')
+        self.assertAlmostEqual(180.0, np.rad2deg(Value(np.pi, ureg.radian)).magnitude, msg='Error in np.rad2deg()')
+        self.assertEqual(Value(np.pi / 2, ureg.radian), np.radians(Value(90)), 'Error in np.radians()')
+        with self.assertRaises(pint.DimensionalityError):
+            np.deg2rad(voltage)
+        # np.log10 is the log10 method, which keeps the unit
+        value = Value(2, ureg.volt)
+        self.assertEqual(value.log10(), np.log10(value), 'Error in np.log10()')
+        self.assertEqual(ureg.volt, np.log10(value).unit, 'Error in np.log10()')
+        self.assertEqual(voltage.log10().unit, np.log10(voltage).unit, 'Error in np.log10()')
+        np.testing.assert_allclose(voltage.log10().magnitude, np.log10(voltage).magnitude, err_msg='Error in np.log10()')
+        self.assertEqual([False, False], list(np.equal(voltage, Value(1, ureg.amp))), 'Error in np.equal()')
+
+        # out= writes into the buffer of a ValueArray
+        out = ValueArray(np.empty(2))
+        self.assertIs(out, np.multiply(voltage, Value(2, ureg.amp), out=out), 'Error in np.multiply(out=)')
+        self.assertEqual(ureg.volt * ureg.amp, out.unit, 'Error in np.multiply(out=)')
+        np.testing.assert_allclose([2.0, 4.0], out.magnitude, err_msg='Error in np.multiply(out=)')
+
+        # array functions
+        result = np.where(np.array([True, False]), voltage, Value(500, ureg.millivolt))
+        np.testing.assert_allclose([1.0, 0.5], result.magnitude, err_msg='Error in np.where()')
+        result = np.concatenate([voltage, [Value(3000, ureg.millivolt)]])
+        np.testing.assert_allclose([1.0, 2.0, 3.0], result.magnitude, err_msg='Error in np.concatenate()')
+        self.assertEqual(Value(3, ureg.volt), np.sum(voltage), 'Error in np.sum()')
+        self.assertEqual(ureg.volt ** 2, np.var(voltage).unit, 'Error in np.var()')
+        trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+        self.assertEqual(Value(1.5, ureg.volt * ureg.second),
+                         trapezoid(voltage, ValueArray(np.array([0.0, 1.0]), ureg.second)), 'Error in np.trapezoid()')
+        with self.assertRaises(TypeError):
+            np.fft.fft(voltage)
+
+        # a Value with an np.ndarray still uses the dtype=object path
+        result = np.array([1.0, 2.0]) * Value(2, ureg.volt)
+        self.assertEqual(object, result.dtype, 'Error in np.ndarray * Value')
+        self.assertEqual(Value(4, ureg.volt), result[1], 'Error in np.ndarray * Value')
+
+    def test_normalize(self):
+        values = [Value(2, ureg.millivolt), Value(0.005, ureg.volt), Value(3000, ureg.microvolt)]
+
+        # the unit of the first Value, or the given unit
+        result = vectorized.normalize(values)
+        self.assertEqual(ureg.millivolt, result.unit, 'Error in vectorized.normalize()')
+        np.testing.assert_allclose([2.0, 5.0, 3.0], result.magnitude, err_msg='Error in vectorized.normalize()')
+        result = vectorized.normalize(values, ureg.volt)
+        np.testing.assert_allclose([0.002, 0.005, 0.003], result.magnitude, err_msg='Error in vectorized.normalize()')
+
+        # the display prefix of the median magnitude
+        result = vectorized.normalize([Value(2e6, ureg.microvolt), Value(0.5, ureg.kilovolt), Value(3, ureg.volt)],
+                                      compact=True)
+        self.assertEqual(ureg.volt, result.unit, 'Error in vectorized.normalize()')
+        np.testing.assert_allclose([2.0, 500.0, 3.0], result.magnitude, err_msg='Error in vectorized.normalize()')
+
+        # units with an offset are converted on their own, different dimensions raise
+        result = ValueArray.from_values([Value(300, ureg.kelvin), Value(26.85, ureg.degC)])
+        np.testing.assert_allclose([300.0, 300.0], result.magnitude, err_msg='Error in ValueArray.from_values()')
+        with self.assertRaises(pint.DimensionalityError):
+            ValueArray.from_values([Value(1, ureg.volt), Value(1, ureg.amp)])
@@ -0,0 +1,234 @@
+# H1 -- Bulk text input and output of Values
+# *******************************************
+# Writes arrays and tables of Values as CSV or JSON lines with the unit of each column in the header, instead of
+# calling str() on every Value (which formats the Pint unit of each cell).  The magnitudes are formatted a chunk of rows
+# at a time with one string % operation, so the memory used is the same for a thousand rows or a billion (i.e. a
+# ValueArray memory-mapped by physics.storage.load).
+#
+# The CSV header gives the unit of each column in brackets, like the material registry files.  The units are written
+# with serialization.unit_to_str, which does not round the exponents, so they read back as the same unit:
+#     T [kelvin],q [meter ** -2.0 * watt]
+#     300.0,1.5
+# The first JSON line is the header, and each row is a JSON array:
+#     {"columns": ["T", "q"], "units": ["kelvin", "meter ** -2.0 * watt"]}
+#     [300.0, 1.5]
+#
+# iter_csv reads files with that header back a chunk of rows at a time, parsing each chunk straight into float64 arrays
+# with np.loadtxt (no Value or python float per cell), so a file of tens of GB is read with bounded memory.
+import contextlib
+import itertools
+import json
+import numpy as np
+from physics.fields import Field, FieldTable
+from physics.serialization import unit_to_str
+from physics.units import ureg, str_to_pint, convert
+from physics.value import ValueArray, SuperValue
+
+# the rows formatted at a time
+chunk_size = 65536
+
+
+def _column_name(key):
+    if isinstance(key, Field):
+        return key.name if key.name is not None else key.field
+    return str(key)
+
+
+def _as_column(key, values):
+    # give the (name, unit string, 1d magnitudes) of a column.  Columns keyed by a Field are in the unit of the Field
+    unit = key.unit if isinstance(key, Field) else None
+    if not isinstance(values, ValueArray):
+        array = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+        if array.dtype == object and array.size > 0 and isinstance(array.flat[0], SuperValue):
+            values = ValueArray.from_values(array, unit)
+        else:
+            values = ValueArray(np.asarray(array, dtype=np.float64), unit)
+    elif unit is not None and values.unit != unit:
+        values = ValueArray(*convert(values.magnitude, values.unit, unit))
+    magnitude = values.magnitude
+    assert np.ndim(magnitude) == 1, 'The column {0} must be 1d'.format(_column_name(key))
+    return _column_name(key), unit_to_str(values.unit), magnitude
+
+
+def _columns(values):
+    # give the columns of a FieldTable, a dict of columns, a ValueArray (each column of a 2d array is a column) or a
+    # collection of Values
+    if isinstance(values, FieldTable):
+        columns = [_as_column(field, values[field]) for field in values.fields]
+    elif isinstance(values, dict):
+        columns = [_as_column(key, column) for key, column in values.items()]
+    else:
+        if not isinstance(values, ValueArray):
+            values = ValueArray.from_values(values)
+        if values.ndim == 1:
+            columns = [_as_column('value', values)]
+        else:
+            assert values.ndim == 2, 'Only 1d and 2d arrays can be written as text'
+            columns = [_as_column(str(j), ValueArray(values.magnitude[:, j], values.unit))
+                       for j in range(values.shape[1])]
+    assert len(columns) > 0, 'There are no columns to write'
+    length = len(columns[0][2])
+    assert all(len(magnitude) == length for _, _, magnitude in columns), 'All the columns must have the same length'
+    return columns
+
+
+def _chunks(columns, row_format, size):
+    # give the text of each chunk of rows
+    length = len(columns[0][2])
+    for start in range(0, length, size):
+        stop = min(start + size, length)
+        rows = np.empty((stop - start, len(columns)), dtype=np.float64)
+        for j, (_, _, magnitude) in enumerate(columns):
+            rows[:, j] = magnitude[start:stop]
+        yield (row_format * (stop - start)) % tuple(rows.ravel().tolist())
+
+
+@contextlib.contextmanager
+def _open(file, mode='w'):
+    # give a text file for a path, or the file itself if it is already open
+    if isinstance(file, str):
+        with open(file, mode, newline='') as f:
+            yield f
+    else:
+        yield file
+
+
+def parse_header(column):
+    """
+    Gives the name and unit of a column header such as 'T [kelvin]'
+
+    Args:
+        column (str): The header of the column.  Without a unit in brackets the column is dimensionless
+
+    Returns:
+        (str, ureg.unit) of the name and unit
+    """
+    name, _, unit = column.partition('[')
+    return name.strip(), str_to_pint(unit.rstrip().rstrip(']').strip()) if unit else ureg.dimensionless
+
+
+def write_csv(file, values, fmt='%r', delimiter=',', chunk_size=chunk_size):
+    """
+    Writes Values as CSV with the unit of each column in the header
+
+    Args:
+        file (str or file): The path of the file (which is replaced) or an open text file
+        values (FieldTable, dict, ValueArray or iterable): The columns.  A dict is keyed by the name (or Field) of each
+            column, a 1d ValueArray or collection of Values is one column named 'value' and the columns of a 2d
+            ValueArray are named by their index.  Columns keyed by a Field are converted to the unit of the Field
+        fmt (str, optional): The % format of the magnitudes.  Default is '%r', the shortest string that reads back to the
+            same float
+        delimiter (str, optional): The delimiter.  Default is ','
+        chunk_size (int, optional): The rows formatted at a time
+
+    Returns:
+        int of the rows written
+
+    For Example::
+        write_csv('run.csv', {'T': ValueArray(np.linspace(300, 400, 10 ** 6), ureg.kelvin),
+                              'q': ValueArray(np.ones(10 ** 6), ureg.watt / ureg.meter ** 2)})
+    """
+    columns = _columns(values)
+    with _open(file) as f:
+        f.write(delimiter.join('{0} [{1}]'.format(name, unit) for name, unit, _ in columns) + '\n')
+        for text in _chunks(columns, delimiter.join([fmt] * len(columns)) + '\n', chunk_size):
+            f.write(text)
+    return len(columns[0][2])
+
+
+def write_json_lines(file, values, fmt='%r', chunk_size=chunk_size):
+    """
+    Writes Values as JSON lines.  The first line is the header with the name and unit of each column and each other
+    line is a row.  nan and inf are written as NaN and Infinity, like the json module
+
+    Args:
+        file (str or file): The path of the file (which is replaced) or an open text file
+        values (FieldTable, dict, ValueArray or iterable): The columns, see write_csv
+        fmt (str, optional): The % format of the magnitudes.  Default is '%r'
+        chunk_size (int, optional): The rows formatted at a time
+
+    Returns:
+        int of the rows written
+    """
+    columns = _columns(values)
+    with _open(file) as f:
+        f.write(json.dumps({'columns': [name for name, _, _ in columns], 'units': [unit for _, unit, _ in columns]}) +
+                '\n')
+        for text in _chunks(columns, '[' + ', '.join([fmt] * len(columns)) + ']\n', chunk_size):
+            # the only letters in a formatted number are in e, nan and inf
+            f.write(text.replace('nan', 'NaN').replace('inf', 'Infinity'))
+    return len(columns[0][2])
+
+
+# H3 -- Streaming CSV Reader
+# --------------------------
+
+
+def _parse_chunk(lines, delimiter, usecols):
+    # give the 2d float64 magnitudes of lines.  Empty cells are nan
+    try:
+        return np.loadtxt(lines, delimiter=delimiter, usecols=usecols, dtype=np.float64, ndmin=2)
+    except ValueError:
+        # np.loadtxt can not parse empty cells, np.genfromtxt can but is slower.  It gives a 1d array for one row or
+        # one column, so the rows are put back on the first axis
+        return np.genfromtxt(lines, delimiter=delimiter, usecols=usecols, dtype=np.float64).reshape(-1, len(usecols))
+
+
+def iter_csv(file, chunk_size=chunk_size, columns=None, fields=None, delimiter=','):
+    """
+    Reads a CSV file with the unit of each column in the header (see write_csv) a chunk of rows at a time
+
+    Args:
+        file (str or file): The path of the file or an open text file
+        chunk_size (int, optional): The rows of each chunk.  Every chunk has this many rows except the last
+        columns (iterable, optional): The names of the columns to read, the others are not parsed.  Default is all
+        fields (dict, optional): A Field for each column name.  The chunks are then FieldTables of only these columns,
+            converted to the units of the Fields
+        delimiter (str, optional): The delimiter.  Default is ','
+
+    Returns:
+        generator of dicts of the column name to a ValueArray of its chunk (or of FieldTables if fields is given)
+
+    For Example::
+        temperature = Field('temperature', name='T')
+        for chunk in iter_csv('run.csv', fields={'T': temperature}):
+            peak = max(peak, chunk.column(temperature).max())
+    """
+    with _open(file, 'r') as f:
+        header = [parse_header(column) for column in next(f).rstrip('\r\n').split(delimiter)]
+        names = [name for name, _ in header]
+        if fields is not None:
+            columns = list(fields.keys())
+        if columns is None:
+            columns = names
+        for name in columns:
+            assert name in names, 'The column {0} is not in the file, which has {1}'.format(name, names)
+        usecols = [names.index(name) for name in columns]
+
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            # each column of the transpose is contiguous
+            magnitude = np.ascontiguousarray(_parse_chunk(lines, delimiter, usecols).T)
+            chunk = {name: ValueArray(magnitude[j], header[usecols[j]][1]) for j, name in enumerate(columns)}
+            if fields is None:
+                yield chunk
+            else:
+                yield FieldTable({fields[name]: values for name, values in chunk.items()})
+
+
+def read_csv(file, columns=None, fields=None, delimiter=','):
+    """
+    Reads a whole CSV file with the unit of each column in the header, see iter_csv
+
+    Returns:
+        dict of the column name to a ValueArray (or a FieldTable if fields is given)
+    """
+    chunks = list(iter_csv(file, columns=columns, fields=fields, delimiter=delimiter))
+    if fields is not None:
+        return FieldTable.concatenate(chunks) if chunks else FieldTable()
+    if not chunks:
+        return {}
+    return {name: ValueArray(np.concatenate([chunk[name].magnitude for chunk in chunks]), values.unit)
+            for name, values in chunks[0].items()}
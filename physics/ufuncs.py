@@ -0,0 +1,442 @@
+# H1 -- numpy protocols for Value and ValueArray
+# ***********************************************
+# Value and ValueArray implement __array_ufunc__ and __array_function__ with the functions below, so numpy functions
+# such as np.exp, np.sqrt, np.maximum, np.where and np.concatenate keep (and check) the units instead of dropping them.
+# The unit rule of each call is worked out once with the cached unit algebra, and the numpy function runs on the raw
+# float64 magnitudes, including into the buffer of an out= ValueArray.
+#
+# For Example::
+#     voltage = ValueArray(np.array([1.0, 2.0]), ureg.volt)
+#     np.maximum(voltage, Value(1500, ureg.millivolt))
+#     ValueArray([1.5, 2. ], volt)
+#     np.exp(voltage / Value(1, ureg.volt), out=result)
+#
+# Plain numbers and np.ndarrays are taken as magnitudes in the unit of the Value they are used with, like the
+# operators.  A ufunc on a Value and an np.ndarray (not a ValueArray) uses the np.ndarray with dtype=object path, so
+# those results are the same as before these protocols were added.
+import operator
+import numpy as np
+import pint
+from physics.units import ureg, unit_algebra, unit_base, convert
+from physics.value import Value, ValueArray, SuperValue, _new_value
+
+# the ufuncs that need operands with the same dimensions and give that unit
+_same_unit = {np.add, np.subtract, np.maximum, np.minimum, np.fmax, np.fmin, np.hypot, np.remainder, np.fmod,
+              np.copysign, np.nextafter}
+# the ufuncs that compare operands with the same dimensions and give bools
+_comparisons = {np.equal, np.not_equal, np.less, np.less_equal, np.greater, np.greater_equal}
+# the ufuncs that keep the unit of their one operand
+_keep_unit = {np.negative, np.positive, np.absolute, np.fabs, np.rint, np.floor, np.ceil, np.trunc, np.conjugate,
+              np.spacing}
+# the ufuncs that are a power of their one operand
+_powers = {np.sqrt: 0.5, np.square: 2, np.cbrt: 1.0 / 3.0, np.reciprocal: -1}
+# the ufuncs that keep the unit of their one operand like the Value and ValueArray methods of the same name, so
+# np.log10(value) is value.log10()
+_methods = {np.log10}
+# the ufuncs that need a dimensionless operand and give a dimensionless result
+_dimensionless = {np.exp, np.exp2, np.expm1, np.log, np.log2, np.log1p, np.sin, np.cos, np.tan, np.arcsin,
+                  np.arccos, np.arctan, np.sinh, np.cosh, np.tanh, np.arcsinh, np.arccosh, np.arctanh}
+# the ufuncs that convert an angle, with the unit of the operand and the unit of the result.  A dimensionless operand
+# is taken as a magnitude in the unit of the operand, like a plain number
+_angles = {np.deg2rad: (ureg.degree, ureg.radian), np.radians: (ureg.degree, ureg.radian),
+           np.rad2deg: (ureg.radian, ureg.degree), np.degrees: (ureg.radian, ureg.degree)}
+# the ufuncs that give plain arrays without a unit
+_unitless = {np.isnan, np.isinf, np.isfinite, np.sign, np.signbit}
+# the ufuncs that can reduce or accumulate along an axis, giving the unit of the operand
+_reducible = {np.add, np.maximum, np.minimum, np.fmax, np.fmin}
+# the ufuncs that are the operators for units with an offset
+_offset_operators = {np.add: operator.add, np.subtract: operator.sub}
+
+
+def _operand(x):
+    # give the magnitude and unit (None for plain numbers and np.ndarrays) of an operand
+    if isinstance(x, (SuperValue, ValueArray)):
+        return x.magnitude, x.unit
+    if isinstance(x, (list, tuple)):
+        # np.asarray would drop the units of a list of Values, since Value is a float
+        x = np.asarray(x, dtype=object)
+    if isinstance(x, np.ndarray) and x.dtype == object and x.size > 0 and isinstance(x.flat[0], SuperValue):
+        x = ValueArray.from_values(x)
+        return x.magnitude, x.unit
+    return x, None
+
+
+def _in_unit(x, unit):
+    # give the magnitude of an operand in unit.  Plain numbers are already in unit
+    magnitude, x_unit = _operand(x)
+    if x_unit is None or x_unit == unit:
+        return magnitude
+    result, factor = unit_algebra('add', unit, x_unit)
+    if result is None:
+        raise pint.DimensionalityError(x_unit, unit)
+    if factor is None:
+        return convert(np.asarray(magnitude, dtype=np.float64), x_unit, unit)[0]
+    return magnitude * factor
+
+
+def _dimensionless_magnitude(magnitude, unit):
+    # give the magnitude of an operand that must be dimensionless, i.e. meter / millimeter is scaled by 1000
+    if unit is None:
+        return magnitude
+    scale, offset, dimensionality = unit_base(unit)
+    if dimensionality != ureg.dimensionless.dimensionality:
+        raise pint.DimensionalityError(unit, ureg.dimensionless)
+    return magnitude * scale + offset
+
+
+def _check_additive(unit):
+    assert unit_base(unit)[1] == 0, 'Values in {0} can not be added, as the unit has an offset'.format(unit)
+
+
+def _has_offset(inputs):
+    # check if any operand has a unit with an offset (i.e. degC)
+    return any(unit is not None and unit_base(unit)[1] != 0 for _, unit in map(_operand, inputs))
+
+
+def _wrap(result, unit):
+    # give a Value for a single magnitude, a ValueArray for an array and plain results without a unit
+    if unit is None:
+        return result
+    if np.ndim(result) == 0:
+        return _new_value(float(result), unit)
+    return ValueArray(result, unit)
+
+
+def _ufunc_rule(ufunc, method, inputs):
+    # give the magnitudes to pass to the ufunc, the unit of the result (None if it has no unit) and the factor to
+    # multiply the result with
+    parts = [_operand(x) for x in inputs]
+    units = [unit for _, unit in parts if unit is not None]
+    if not units:
+        # only the out= is a ValueArray
+        return [magnitude for magnitude, _ in parts], None, 1.0
+    if method != '__call__':
+        if ufunc not in _reducible:
+            return None
+        if ufunc is np.add:
+            _check_additive(parts[0][1])
+        return [parts[0][0]], parts[0][1], 1.0
+
+    if ufunc in _same_unit or ufunc is np.arctan2:
+        unit = units[0]
+        magnitudes = [_in_unit(x, unit) for x in inputs]
+        return magnitudes, ureg.dimensionless if ufunc is np.arctan2 else unit, 1.0
+    if ufunc in _comparisons:
+        (a, a_unit), (b, b_unit) = parts
+        if a_unit is not None and b_unit is not None:
+            if unit_algebra('add', a_unit, b_unit)[0] is None:
+                if ufunc in (np.equal, np.not_equal):
+                    # Values with different dimensions are never equal, like the operators
+                    return [np.zeros(np.broadcast(a, b).shape, dtype=bool), True], None, 1.0
+                raise pint.DimensionalityError(a_unit, b_unit)
+            return [a, _in_unit(inputs[1], a_unit)], None, 1.0
+        # a plain number is compared to the base unit magnitude, like the operators
+        magnitudes = []
+        for magnitude, unit in parts:
+            if unit is not None:
+                scale, offset, _ = unit_base(unit)
+                magnitude = magnitude * scale + offset
+            magnitudes.append(magnitude)
+        return magnitudes, None, 1.0
+    if ufunc in (np.multiply, np.matmul):
+        (a, a_unit), (b, b_unit) = parts
+        if a_unit is None or b_unit is None:
+            return [a, b], a_unit if b_unit is None else b_unit, 1.0
+        unit, factor = unit_algebra('mul', a_unit, b_unit)
+        return [a, b], unit, factor
+    if ufunc in (np.divide, np.true_divide):
+        (a, a_unit), (b, b_unit) = parts
+        if b_unit is None:
+            return [a, b], a_unit, 1.0
+        if a_unit is None:
+            unit, factor = unit_algebra('inv', b_unit)
+        else:
+            unit, factor = unit_algebra('div', a_unit, b_unit)
+        return [a, b], unit, factor
+    if ufunc is np.floor_divide:
+        # the factor must be applied before the floor, so Values are only floor divided by plain numbers or by Values
+        # with the same dimensions
+        (a, a_unit), (b, b_unit) = parts
+        if b_unit is None:
+            return [a, b], a_unit, 1.0
+        if a_unit is None:
+            return None
+        return [a, _in_unit(inputs[1], a_unit)], ureg.dimensionless, 1.0
+    if ufunc in (np.power, np.float_power):
+        (a, a_unit), (b, b_unit) = parts
+        b = _dimensionless_magnitude(b, b_unit)
+        if a_unit is None:
+            return [a, b], None, 1.0
+        assert np.ndim(b) == 0, 'A Value can only be raised to one power, as the result has one unit'
+        unit, factor = unit_algebra('pow', a_unit, float(b))
+        return [a, b], unit, factor
+    if ufunc in _powers:
+        unit, factor = unit_algebra('pow', parts[0][1], _powers[ufunc])
+        return [parts[0][0]], unit, factor
+    if ufunc in _keep_unit or ufunc in _methods:
+        return [parts[0][0]], parts[0][1], 1.0
+    if ufunc in _dimensionless:
+        return [_dimensionless_magnitude(*parts[0])], ureg.dimensionless, 1.0
+    if ufunc in _angles:
+        unit, result_unit = _angles[ufunc]
+        magnitude, x_unit = parts[0]
+        if x_unit != ureg.dimensionless:
+            magnitude = _in_unit(inputs[0], unit)
+        return [magnitude], result_unit, 1.0
+    if ufunc in _unitless:
+        return [parts[0][0]], None, 1.0
+    return None
+
+
+def array_ufunc(self, ufunc, method, inputs, kwargs):
+    """
+    Runs a ufunc on Values and ValueArrays, see ValueArray.__array_ufunc__
+
+    Args:
+        self (Value or ValueArray): The object numpy dispatched to
+        ufunc (np.ufunc): The ufunc
+        method (str): '__call__', 'reduce', 'accumulate', ...
+        inputs (tuple): The operands
+        kwargs (dict): The keywords of the ufunc, i.e. out, axis and where
+
+    Returns:
+        Value, ValueArray or np.ndarray, or NotImplemented for the ufuncs that do not have a unit rule
+    """
+    if any(isinstance(x, np.ndarray) for x in inputs) and not isinstance(self, ValueArray):
+        # a Value with an np.ndarray uses the dtype=object loop, which calls the Value operators for each element
+        inputs = tuple(np.array(x, dtype=object) if isinstance(x, SuperValue) else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    if ufunc in _offset_operators and method == '__call__' and 'out' not in kwargs and _has_offset(inputs):
+        # units with an offset are added and subtracted by the operators, which use the Pint rules (i.e. degC + degC
+        # raises and degC - degC is in delta_degC)
+        return _offset_operators[ufunc](*inputs)
+
+    rule = _ufunc_rule(ufunc, method, inputs)
+    if rule is None:
+        return NotImplemented
+    magnitudes, unit, factor = rule
+
+    out = kwargs.pop('out', None)
+    if out is None:
+        result = getattr(ufunc, method)(*magnitudes, **kwargs)
+        if factor != 1.0:
+            result = result * factor
+        return _wrap(result, unit)
+
+    # write into the buffers of the outputs, a ValueArray for results with a unit
+    assert len(out) == 1, 'Only ufuncs with one output are supported'
+    target = out[0]
+    if unit is not None:
+        assert isinstance(target, ValueArray), 'The out of a ufunc with a unit must be a ValueArray'
+        buffer = target.magnitude
+    else:
+        buffer = target.magnitude if isinstance(target, ValueArray) else target
+    getattr(ufunc, method)(*magnitudes, out=(buffer,), **kwargs)
+    if factor != 1.0:
+        np.multiply(buffer, factor, out=buffer, where=kwargs.get('where', True))
+    if isinstance(target, ValueArray):
+        target.unit = ureg.dimensionless if unit is None else unit
+    return target
+
+
+# H3 -- Array Functions
+# ---------------------
+
+# the implementation of each numpy function
+_functions = {}
+
+
+def _implements(*functions):
+    # register an implementation for numpy functions, skipping the ones this version of numpy does not have
+    def register(implementation):
+        for function in functions:
+            if function is not None:
+                _functions[function] = implementation
+        return implementation
+    return register
+
+
+def _numpy(name):
+    return getattr(np, name, None)
+
+
+def _out(kwargs):
+    # replace an out= ValueArray with its buffer, and give the ValueArray
+    out = kwargs.get('out')
+    if isinstance(out, ValueArray):
+        kwargs['out'] = out.magnitude
+    return out
+
+
+def _finish(result, unit, out):
+    if isinstance(out, ValueArray):
+        out.unit = unit
+        return out
+    return _wrap(result, unit)
+
+
+@_implements(np.sum, np.cumsum, _numpy('nansum'), _numpy('nancumsum'))
+def _additive(function, a, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    _check_additive(unit)
+    out = _out(kwargs)
+    return _finish(function(magnitude, *args, **kwargs), unit, out)
+
+
+@_implements(np.diff)
+def _diff(function, a, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    if unit_base(unit)[1] != 0:
+        # the differences of a unit with an offset are in its delta unit (i.e. delta_degC), like the operators
+        unit = (ureg.Quantity(1.0, unit) - ureg.Quantity(0.0, unit)).units
+    return _wrap(function(magnitude, *args, **kwargs), unit)
+
+
+@_implements(np.mean, np.std, np.median, np.min, np.max, np.amin, np.amax, np.ptp, np.sort, np.round,
+             _numpy('around'), np.copy, np.reshape, np.ravel, np.transpose, np.squeeze, np.flip, np.roll, np.take,
+             np.repeat, np.tile, np.expand_dims, np.moveaxis, np.swapaxes, np.atleast_1d, np.atleast_2d,
+             np.broadcast_to, np.nanmean, np.nanstd, np.nanmedian, np.nanmin, np.nanmax, np.percentile, np.quantile,
+             np.nanpercentile, np.nanquantile, np.linalg.norm, np.partition, np.trim_zeros, np.unique)
+def _keep_unit_function(function, a, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    out = _out(kwargs)
+    result = function(magnitude, *args, **kwargs)
+    if isinstance(result, tuple):
+        # np.unique with return_index etc. gives the values first
+        return (_wrap(result[0], unit),) + result[1:]
+    return _finish(result, unit, out)
+
+
+@_implements(np.var, np.nanvar)
+def _var(function, a, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    out = _out(kwargs)
+    unit, factor = unit_algebra('pow', unit, 2)
+    return _finish(function(magnitude, *args, **kwargs) * factor, unit, out)
+
+
+@_implements(np.argsort, np.argmin, np.argmax, np.argpartition, np.nanargmin, np.nanargmax, np.nonzero, np.flatnonzero,
+             np.count_nonzero, np.shape, np.ndim, np.size, np.argwhere)
+def _unitless_function(function, a, *args, **kwargs):
+    return function(_operand(a)[0], *args, **kwargs)
+
+
+def _join(arrays):
+    # give the magnitudes of a sequence of arrays in the unit of the first
+    unit = next(unit for _, unit in map(_operand, arrays) if unit is not None)
+    return [_in_unit(x, unit) for x in arrays], unit
+
+
+@_implements(np.concatenate, np.stack, np.vstack, np.hstack, np.dstack, np.column_stack, _numpy('row_stack'))
+def _join_function(function, arrays, *args, **kwargs):
+    magnitudes, unit = _join(arrays)
+    out = _out(kwargs)
+    return _finish(function(magnitudes, *args, **kwargs), unit, out)
+
+
+@_implements(np.append)
+def _append(function, arr, values, *args, **kwargs):
+    (arr, values), unit = _join([arr, values])
+    return _wrap(function(arr, values, *args, **kwargs), unit)
+
+
+@_implements(np.where)
+def _where(function, condition, *args):
+    if not args:
+        return function(_operand(condition)[0])
+    (x, y), unit = _join(args)
+    return _wrap(function(condition, x, y), unit)
+
+
+@_implements(np.clip)
+def _clip(function, a, a_min=None, a_max=None, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    out = _out(kwargs)
+    bounds = [None if bound is None else _in_unit(bound, unit) for bound in (a_min, a_max)]
+    return _finish(function(magnitude, *bounds, *args, **kwargs), unit, out)
+
+
+@_implements(np.isclose, np.allclose)
+def _isclose(function, a, b, rtol=1e-05, atol=1e-08, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    # a Value atol is converted, a plain atol is in the unit of a
+    return function(magnitude, _in_unit(b, unit), rtol, _in_unit(atol, unit), *args, **kwargs)
+
+
+@_implements(np.array_equal)
+def _array_equal(function, a1, a2, *args, **kwargs):
+    magnitude, unit = _operand(a1)
+    try:
+        return function(magnitude, _in_unit(a2, unit), *args, **kwargs)
+    except pint.DimensionalityError:
+        return False
+
+
+@_implements(np.searchsorted)
+def _searchsorted(function, a, v, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    return function(magnitude, _in_unit(v, unit), *args, **kwargs)
+
+
+@_implements(np.interp)
+def _interp(function, x, xp, fp, left=None, right=None, *args, **kwargs):
+    xp, x_unit = _operand(xp)
+    fp, unit = _operand(fp)
+    x = x if x_unit is None else _in_unit(x, x_unit)
+    left, right = [None if bound is None else _in_unit(bound, unit) for bound in (left, right)]
+    return _wrap(function(x, xp, fp, left, right, *args, **kwargs), unit)
+
+
+def _product_unit(a_unit, b_unit):
+    # give the unit and factor of a product where either operand may be plain
+    if a_unit is None or b_unit is None:
+        return a_unit if b_unit is None else b_unit, 1.0
+    return unit_algebra('mul', a_unit, b_unit)
+
+
+@_implements(np.dot, np.inner, np.outer, np.tensordot, np.vdot, np.kron, np.cross)
+def _product(function, a, b, *args, **kwargs):
+    (a, a_unit), (b, b_unit) = _operand(a), _operand(b)
+    unit, factor = _product_unit(a_unit, b_unit)
+    return _wrap(function(a, b, *args, **kwargs) * factor, unit)
+
+
+@_implements(_numpy('trapezoid'), _numpy('trapz'))
+def _trapezoid(function, y, x=None, dx=1.0, axis=-1):
+    y, unit = _operand(y)
+    if x is not None:
+        x, x_unit = _operand(x)
+    else:
+        dx, x_unit = _operand(dx)
+    unit, factor = _product_unit(unit, x_unit)
+    return _wrap(function(y, x=x, dx=dx, axis=axis) * factor, unit)
+
+
+@_implements(np.zeros_like, np.ones_like, np.empty_like)
+def _like(function, prototype, *args, **kwargs):
+    magnitude, unit = _operand(prototype)
+    return _wrap(function(magnitude, *args, **kwargs), unit)
+
+
+@_implements(np.full_like)
+def _full_like(function, a, fill_value, *args, **kwargs):
+    magnitude, unit = _operand(a)
+    return _wrap(function(magnitude, _in_unit(fill_value, unit), *args, **kwargs), unit)
+
+
+def array_function(self, func, types, args, kwargs):
+    """
+    Runs a numpy function on Values and ValueArrays, see ValueArray.__array_function__
+
+    Returns:
+        The result of func with the unit of the result, or NotImplemented (so numpy raises a TypeError) for the functions
+        that do not have a unit rule.  A Value is a float, so for a Value the other functions give what they did before
+        (the unit is dropped)
+    """
+    implementation = _functions.get(func)
+    if implementation is None:
+        if isinstance(self, Value):
+            return func._implementation(*args, **kwargs)
+        return NotImplemented
+    return implementation(func, *args, **kwargs)
@@ -0,0 +1,273 @@
+# H1 -- Uncertainty propagation
+# ******************************
+# An UncertainValue is a magnitude (a float or an np.ndarray of any shape) with a standard deviation of the same shape,
+# in one unit.  The operators propagate the standard deviations to first order (linear error propagation), treating the
+# operands as independent, so a whole array of measurements is propagated in one numpy pass.
+#
+# For functions that are far from linear over the spread of the inputs (or that use an input more than once, which the
+# linear propagation treats as independent), monte_carlo draws N samples of every input and evaluates the function once
+# on ValueArrays of shape (N, ...), instead of N times on single Values.
+#
+# Basic Example::
+#     current = UncertainValue(2.0, 0.1, ureg.amp)
+#     resistance = UncertainValue(np.array([10.0, 20.0]), np.array([0.5, 0.5]), ureg.ohm)
+#     print(current * resistance)
+#     [20. 40.] +/- [1.41421356 2.23606798] ampere * ohm
+import operator
+import numpy as np
+from physics.units import ureg, pint_to_str, unit_algebra, unit_base, convert
+from physics.value import ValueArray, SuperValue, DeferredValue, _new_value
+
+
+def _parts(other):
+    # give the magnitude, standard deviation and unit (None for a plain number) of an operand
+    if isinstance(other, UncertainValue):
+        return other.magnitude, other.std, other.unit
+    if isinstance(other, (SuperValue, ValueArray)):
+        return other.magnitude, 0.0, other.unit
+    return other, 0.0, None
+
+
+def _delta_factor(unit, target):
+    # give the factor to convert a difference (i.e. a standard deviation) from unit to target, without any offset
+    return unit_base(unit)[0] / unit_base(target)[0]
+
+
+class UncertainValue(DeferredValue):
+
+    """A Value (or array of Values) with a standard deviation, propagated through the operators to first order.
+
+        Args:
+            magnitude (float or np.ndarray): The magnitude
+            std (float or np.ndarray): The standard deviation, in unit.  It is broadcast to the shape of the magnitude
+            unit (pint.unit._Unit, optional): The unit.  Default is dimensionless
+
+        Basic Example::
+            length = UncertainValue(2.0, 0.01, ureg.meter)
+            area = length ** 2
+            print(area)
+            4.0 +/- 0.04 meter ** 2
+    """
+
+    __slots__ = ('magnitude', 'std', 'unit')
+
+    # this must be larger than the ValueArray __array_priority__ so numpy defers to the UncertainValue operators
+    __array_priority__ = 20
+
+    def __init__(self, magnitude, std, unit=ureg.dimensionless):
+        if unit is None:
+            unit = ureg.dimensionless
+        magnitude = np.asarray(magnitude, dtype=np.float64)
+        std = np.abs(np.broadcast_to(np.asarray(std, dtype=np.float64), magnitude.shape))
+        # scalars are kept as floats so the math is float math
+        self.magnitude = float(magnitude) if magnitude.ndim == 0 else magnitude
+        self.std = float(std) if std.ndim == 0 else std
+        self.unit = unit
+
+    @classmethod
+    def from_value(cls, value, std):
+        """
+        Gives an UncertainValue for a Value or ValueArray
+
+        Args:
+            value (Value or ValueArray): The nominal value
+            std (Value, ValueArray, float or np.ndarray): The standard deviation.  Plain numbers are in the unit of value
+
+        Returns:
+            UncertainValue
+        """
+        if isinstance(std, (SuperValue, ValueArray)):
+            std = np.asarray(std.magnitude, dtype=np.float64) * _delta_factor(std.unit, value.unit)
+        return cls(value.magnitude, std, value.unit)
+
+    # --properties------------------
+
+    @property
+    def value(self):
+        """Gives the nominal value as a Value (or a ValueArray for arrays)"""
+        if np.ndim(self.magnitude) == 0:
+            return _new_value(self.magnitude, self.unit)
+        return ValueArray(self.magnitude, self.unit)
+
+    @property
+    def relative(self):
+        """Gives the relative standard deviation std / |magnitude|"""
+        return self.std / np.abs(self.magnitude)
+
+    @property
+    def shape(self):
+        return np.shape(self.magnitude)
+
+    def __len__(self):
+        return len(self.magnitude)
+
+    def __getitem__(self, item):
+        return UncertainValue(np.asarray(self.magnitude)[item], np.asarray(self.std)[item], self.unit)
+
+    def unit_str(self):
+        return pint_to_str(self.unit)
+
+    def __str__(self):
+        return '{0} +/- {1} '.format(self.magnitude, self.std) + self.unit_str()
+
+    def __repr__(self):
+        return 'UncertainValue({0}, {1}, {2})'.format(repr(self.magnitude), repr(self.std), self.unit_str())
+
+    def adjust_unit(self, desired_unit):
+        magnitude, unit = convert(self.magnitude, self.unit, desired_unit)
+        return UncertainValue(magnitude, self.std * _delta_factor(self.unit, unit), unit)
+
+    def samples(self, n, random_state=None):
+        """
+        Draws normal samples of the value
+
+        Args:
+            n (int): The number of samples
+            random_state (np.random.Generator or int, optional): The generator or its seed
+
+        Returns:
+            ValueArray of shape (n,) + self.shape
+        """
+        generator = np.random.default_rng(random_state)
+        shape = (n,) + self.shape
+        return ValueArray(self.magnitude + generator.standard_normal(shape) * self.std, self.unit)
+
+    # --math operations------------------
+
+    def _other_in_unit(self, other):
+        # give the magnitude and standard deviation of other in the unit of this value, for add and sub.  None if
+        # either unit has an offset (i.e. degC), since those are not converted with a scale factor
+        magnitude, std, unit = _parts(other)
+        if unit is None:
+            return magnitude, std
+        result, factor = unit_algebra('add', self.unit, unit)
+        assert result is not None, 'You can only add values with the same dimensions'
+        if factor is None:
+            return None
+        return magnitude * factor, std * factor
+
+    def _pint_operation(self, other, operation):
+        # add or subtract units with an offset with Pint, like the Value operators, which raises if that is ambiguous
+        # (i.e. degC + degC) and gives a difference unit for degC - degC
+        magnitude, std, unit = _parts(other)
+        result = operation(ureg.Quantity(np.asarray(self.magnitude, dtype=np.float64), self.unit),
+                           ureg.Quantity(np.asarray(magnitude, dtype=np.float64), unit))
+        return UncertainValue(result.magnitude, np.hypot(self.std * _delta_factor(self.unit, result.units),
+                                                         std * _delta_factor(unit, result.units)), result.units)
+
+    def __neg__(self):
+        return UncertainValue(-self.magnitude, self.std, self.unit)
+
+    def __abs__(self):
+        return UncertainValue(np.abs(self.magnitude), self.std, self.unit)
+
+    def __add__(self, other):
+        parts = self._other_in_unit(other)
+        if parts is None:
+            return self._pint_operation(other, operator.add)
+        magnitude, std = parts
+        return UncertainValue(self.magnitude + magnitude, np.hypot(self.std, std), self.unit)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        parts = self._other_in_unit(other)
+        if parts is None:
+            return self._pint_operation(other, operator.sub)
+        magnitude, std = parts
+        return UncertainValue(self.magnitude - magnitude, np.hypot(self.std, std), self.unit)
+
+    def __rsub__(self, other):
+        return -self.__sub__(other)
+
+    def __mul__(self, other):
+        magnitude, std, unit = _parts(other)
+        factor = 1.0
+        if unit is not None:
+            unit, factor = unit_algebra('mul', self.unit, unit)
+        # d(ab) = b da + a db
+        return UncertainValue(self.magnitude * magnitude * factor,
+                              np.hypot(magnitude * self.std, self.magnitude * std) * factor,
+                              self.unit if unit is None else unit)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        magnitude, std, unit = _parts(other)
+        factor = 1.0
+        if unit is not None:
+            unit, factor = unit_algebra('div', self.unit, unit)
+        # d(a / b) = da / b - a db / b ** 2
+        return UncertainValue(self.magnitude / magnitude * factor,
+                              np.hypot(self.std / magnitude, self.magnitude * std / magnitude ** 2) * factor,
+                              self.unit if unit is None else unit)
+
+    def __rtruediv__(self, other):
+        magnitude, std, unit = _parts(other)
+        if unit is None:
+            unit, factor = unit_algebra('inv', self.unit)
+        else:
+            unit, factor = unit_algebra('div', unit, self.unit)
+        return UncertainValue(magnitude / self.magnitude * factor,
+                              np.hypot(std / self.magnitude, magnitude * self.std / self.magnitude ** 2) * factor,
+                              unit)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __pow__(self, power, modulo=None):
+        unit, factor = unit_algebra('pow', self.unit, power)
+        # d(a ** p) = p a ** (p - 1) da
+        return UncertainValue(self.magnitude ** power * factor,
+                              np.abs(power * self.magnitude ** (power - 1)) * self.std * factor, unit)
+
+    def sqrt(self):
+        return self ** 0.5
+
+    def log10(self):
+        # the unit is kept, like Value.log10
+        return UncertainValue(np.log10(self.magnitude), self.std / (np.abs(self.magnitude) * np.log(10)), self.unit)
+
+
+def monte_carlo(function, inputs, samples=10000, random_state=None):
+    """
+    Propagates uncertainties by evaluating a function once on N samples of every input
+
+    Args:
+        function (callable): Takes the inputs as keywords and gives a Value, ValueArray or a tuple of these.  It is
+            called with ValueArrays of shape (samples,) + the shape of each input, so it must use the operators (and
+            sqrt and log10) rather than python control flow on the values
+        inputs (dict): The inputs by keyword.  UncertainValues are sampled, other inputs are passed unchanged
+        samples (int, optional): The number of samples.  Default is 10000
+        random_state (np.random.Generator or int, optional): The generator or its seed
+
+    Returns:
+        UncertainValue (or tuple of these) with the mean and standard deviation of the samples of the result
+
+    For Example::
+        def power(current, resistance):
+            return current ** 2 * resistance
+
+        monte_carlo(power, {'current': UncertainValue(2.0, 0.1, ureg.amp),
+                            'resistance': UncertainValue(10.0, 0.5, ureg.ohm)})
+    """
+    generator = np.random.default_rng(random_state)
+    # the samples are the first axis, the inputs with fewer dimensions get axes of length 1 so they broadcast
+    ndim = max([len(value.shape) for value in inputs.values() if isinstance(value, UncertainValue)] + [0])
+    kwargs = {}
+    for name, value in inputs.items():
+        if isinstance(value, UncertainValue):
+            value = value.samples(samples, generator).reshape((samples,) + (1,) * (ndim - len(value.shape)) +
+                                                              value.shape)
+        kwargs[name] = value
+    result = function(**kwargs)
+    if isinstance(result, tuple):
+        return tuple(_summarize(r) for r in result)
+    return _summarize(result)
+
+
+def _summarize(result):
+    # give the mean and standard deviation of the samples (the first axis) of a result
+    magnitude, _, unit = _parts(result)
+    magnitude = np.asarray(magnitude, dtype=np.float64)
+    return UncertainValue(magnitude.mean(axis=0), magnitude.std(axis=0, ddof=1), unit)
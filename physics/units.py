@@ -1,7 +1,15 @@
 import pint
 import codecs
+import bisect
+import functools
+import math
+import physics.conf as conf
+import physics.registry_cache as registry_cache
 
-ureg = pint.UnitRegistry()
+# the registry is loaded from the on-disk cache if conf.registry_cache_dir is set
+ureg = registry_cache.load_registry()
+# pickled units (i.e. in a pickled Value) are loaded into the application registry, so make that ureg
+pint.set_application_registry(ureg)
 
 unit_options = {
     'unitless': ureg.dimensionless,
@@ -46,49 +54,123 @@ derived_units = {
 # the available operations of units
 operations = {'divide': '/', 'multiply': '*'}
 
-complete_units = [(unit_pint * prefix).to_compact().units for prefix in prefix_options.values() for unit_pint in unit_options.values()]
-complete_units_dict = {'{}'.format((unit_pint * prefix).to_compact().units): (unit_pint * prefix).to_compact().units for
-                       prefix in prefix_options.values() for unit_pint in unit_options.values()}
+# the unit tables below need ~90 Pint conversions, so they are built by unit_tables() the first time one is accessed
+# (i.e. physics.units.complete_units) instead of when physics.units is imported
+_unit_tables = None
 
-complete_units_str = {'{}'.format(unit_pint): '{}'.format(unit_pint) for unit_pint in complete_units}
 
-all_units = {unit: [(unit_pint * prefix).to_compact().units for prefix in prefix_options.values()] for unit, unit_pint in unit_options.items()}
+def _compact_units():
+    # convert each unit and prefix to its compact form once, the compact units are saved in the registry cache (if it
+    # is turned on) as UnitsContainers since Pint units can only be pickled into the application registry
+    key = (sorted(unit_options_str.items()), sorted(prefix_options.values()))
+    cached = registry_cache.read_cache('unit_tables')
+    if cached is not None and cached[0] == key:
+        return {option: ureg.Unit(container) for option, container in cached[1].items()}
 
-# list all the available units
-# all_units = [prefix[1] + unit for prefix in prefix_options.keys() for unit in unit_options.values()]
+    compact = {(unit, prefix): (unit_pint * prefix).to_compact().units for prefix in prefix_options.values()
+               for unit, unit_pint in unit_options.items()}
+    registry_cache.write_cache('unit_tables', (key, {option: unit_pint._units for option, unit_pint in compact.items()}))
+    return compact
 
-# useful for dash dropdown options
-all_unit_options = {unit: [{'label': '{}'.format(unit_pint), 'value': '{}'.format(unit_pint)} for unit_pint in all_units[unit]]
-                    for unit in all_units.keys()}
+
+def _build_unit_tables():
+    compact = _compact_units()
+
+    complete_units = list(compact.values())
+    complete_units_dict = {'{}'.format(unit_pint): unit_pint for unit_pint in complete_units}
+
+    complete_units_str = {'{}'.format(unit_pint): '{}'.format(unit_pint) for unit_pint in complete_units}
+
+    all_units = {unit: [compact[(unit, prefix)] for prefix in prefix_options.values()] for unit in unit_options.keys()}
+
+    # list all the available units
+    # all_units = [prefix[1] + unit for prefix in prefix_options.keys() for unit in unit_options.values()]
+
+    # useful for dash dropdown options
+    all_unit_options = {unit: [{'label': '{}'.format(unit_pint), 'value': '{}'.format(unit_pint)} for unit_pint in all_units[unit]]
+                        for unit in all_units.keys()}
+
+    return {'complete_units': complete_units,
+            'complete_units_dict': complete_units_dict,
+            'complete_units_str': complete_units_str,
+            'all_units': all_units,
+            'all_unit_options': all_unit_options}
+
+
+def unit_tables():
+    """Gives the unit tables (complete_units, complete_units_dict, complete_units_str, all_units and
+    all_unit_options), building them the first time this is called.
+
+        Returns:
+            :return dict: The tables keyed by their name
+    """
+    global _unit_tables
+    if _unit_tables is None:
+        _unit_tables = _build_unit_tables()
+    return _unit_tables
+
+
+def __getattr__(name):
+    # build the unit tables the first time one is accessed
+    if name in ('complete_units', 'complete_units_dict', 'complete_units_str', 'all_units', 'all_unit_options'):
+        return unit_tables()[name]
+    raise AttributeError('module {0} has no attribute {1}'.format(__name__, name))
+
+
+# the shared Unit object of each unit, keyed by its UnitsContainer
+_canonical_units = {}
+
+
+def canonical_unit(unit):
+    """Gives the shared Unit object for a unit, so equal units (i.e. parsed from 'kohm' and 'kiloohm') are the same
+    object
+
+        Args:
+            :param unit: the unit
+            :type pint.unit: Pint Unit object instance
+
+        Returns:
+            :return pint.unit: The first Unit object seen that is equal to unit
+    """
+    return _canonical_units.setdefault(unit._units, unit)
+
+
+@functools.lru_cache(maxsize=conf.unit_string_cache_size)
+def _parse_units(string):
+    return canonical_unit(ureg.parse_units(string))
 
 
 def str_to_pint(string):
-    """Converts a string to a Pint Unit
+    """Converts a string to a Pint Unit.  Any unit expression Pint can parse is allowed, and the results are cached so
+    each string is only parsed once.
 
         Args:
             :param string: the unit string to be converted
             :type str: python string class
 
         Returns:
-            :return pint.unit: Returns a unit for this string
+            :return pint.unit: Returns a unit for this string.  Equivalent spellings give the same Unit object
 
         Errors:
-            Raises an error if the unit string is not allowed
+            Raises an EnvironmentError if Pint can not parse the string
 
         For Example:
 
-        >>> str_to_pint('Ohm')
-        pint.unit(ohm)
+        >>> str_to_pint('kohm * m')
+        <Unit('kiloohm * meter')>
+        >>> str_to_pint('kiloohm meter') is str_to_pint('kohm * m')
+        True
     """
     try:
-        return complete_units_dict[string]
+        return _parse_units(string)
     except Exception:
-        raise EnvironmentError('The string {} is not in the allowed units'.format(string))
+        raise EnvironmentError('The string {} is not a unit'.format(string))
 
 
+@functools.lru_cache(maxsize=conf.unit_string_cache_size)
 def pint_to_str(pint_unit):
 
-    """Converts a Pint.Unit to a string
+    """Converts a Pint.Unit to a string.  Formatting a Pint unit is slow, so the string of each unit is cached
 
         Args:
             :param pint_unit: the unit to be converted to string
@@ -106,6 +188,262 @@ def pint_to_str(pint_unit):
     return '{}'.format(pint_unit)
 
 
+# H3 -- Unit Algebra Cache
+# ------------------------
+
+
+@functools.lru_cache(maxsize=conf.unit_cache_size)
+def _unit_algebra(op, unit_a, unit_b):
+    if op == 'mul' or op == 'div':
+        unit = unit_a * unit_b if op == 'mul' else unit_a / unit_b
+        # Pint can not scale a unit with an offset (i.e. degC * volt), so raise its OffsetUnitCalculusError here
+        ureg.Quantity(1.0, unit) * 1.0
+        return unit, 1.0
+    elif op == 'inv':
+        return (1 / unit_a).units, 1.0
+    elif op == 'pow':
+        return unit_a ** unit_b, 1.0
+    elif op == 'add':
+        if unit_a.dimensionality != unit_b.dimensionality:
+            return None, None
+        # an offset unit (i.e. degC) can not be added or converted with a scale factor, even to itself, so leave the
+        # factor as None and let Pint handle it
+        if unit_base(unit_a)[1] != 0.0 or unit_base(unit_b)[1] != 0.0:
+            return unit_a, None
+        if unit_a == unit_b:
+            return unit_a, 1.0
+        return unit_a, ureg.Quantity(1.0, unit_b).to(unit_a).magnitude
+    raise ValueError('The unit operation {} is not supported'.format(op))
+
+
+def unit_algebra(op, unit_a, unit_b=None):
+    """Gives the unit and scale factor for an operation between units.  The results are cached so the same units
+    are only computed by Pint once.
+
+        Args:
+            :param op: the operation, one of 'mul', 'div', 'inv', 'pow' or 'add'
+            :type str: python string class
+            :param unit_a: the unit of the first operand
+            :type pint.unit: Pint Unit object instance
+            :param unit_b: the unit of the second operand or the exponent for 'pow'.  Not used for 'inv'
+
+        Returns:
+            :return tuple: The result unit and the factor to multiply the magnitude with.  For 'add' the factor
+                converts the magnitude of unit_b into unit_a, the unit is None if the dimensions do not match and the
+                factor is None if the units have an offset (i.e. degC).  'mul' and 'div' raise the Pint
+                OffsetUnitCalculusError for a result with an offset unit, like Pint does
+
+        For Example:
+
+        >>> unit_algebra('mul', ureg.amp, ureg.ohm)
+        (<Unit('ampere * ohm')>, 1.0)
+        >>> unit_algebra('add', ureg.volt, ureg.millivolt)
+        (<Unit('volt')>, 0.001)
+    """
+    try:
+        return _unit_algebra(op, unit_a, unit_b)
+    except TypeError:
+        # unhashable input (i.e. an np.ndarray exponent), so skip the cache
+        return _unit_algebra.__wrapped__(op, unit_a, unit_b)
+
+
+@functools.lru_cache(maxsize=conf.unit_cache_size)
+def unit_base(unit):
+    """Gives the SI (base unit) scale factor, offset and dimensionality of a unit.  The results are cached so the same
+    unit is only converted by Pint once.
+
+        Args:
+            :param unit: the unit
+            :type pint.unit: Pint Unit object instance
+
+        Returns:
+            :return tuple: The scale, offset and dimensionality, where magnitude * scale + offset is the magnitude in
+                base units.  The offset is only non-zero for units like degC
+
+        For Example:
+
+        >>> unit_base(ureg.millivolt)
+        (0.001, 0.0, <UnitsContainer({'[current]': -1.0, '[length]': 2.0, '[mass]': 1.0, '[time]': -3.0})>)
+    """
+    offset = ureg.Quantity(0.0, unit).to_base_units().magnitude
+    scale = ureg.Quantity(1.0, unit).to_base_units().magnitude - offset
+    return scale, offset, unit.dimensionality
+
+
+def unit_string_cache_info():
+    """Gives the hits, misses, maxsize and currsize of the str_to_pint cache"""
+    return _parse_units.cache_info()
+
+
+def unit_cache_info():
+    """Gives the hits, misses, maxsize and currsize of the unit algebra cache"""
+    return _unit_algebra.cache_info()
+
+
+def clear_unit_cache():
+    """Clears the unit algebra, unit_base, unit string and conversion plan caches and resets the hit and miss counters"""
+    _unit_algebra.cache_clear()
+    _parse_units.cache_clear()
+    pint_to_str.cache_clear()
+    unit_base.cache_clear()
+    _conversion_plan.cache_clear()
+    _compact_info.cache_clear()
+
+
+# H3 -- Conversion Plan Cache
+# ---------------------------
+# A conversion plan is the result unit and the factor to multiply the magnitude with for converting a unit to a target.
+# The targets are a unit (or unit string) or one of the modes 'base', 'reduced', 'compact' and 'simplify'.  The compact
+# unit depends on the magnitude, so those plans are keyed by the power of 10 (in steps of 3) Pint would pick.
+
+conversion_modes = ('base', 'reduced', 'compact', 'simplify')
+
+
+def _pint_convert(quantity, target):
+    # a Unit target is not compared to the mode strings, since Pint would parse each string to compare them
+    if isinstance(target, str):
+        if target in ('compact', 'simplify') and unit_base(quantity.units)[1] != 0.0:
+            # Pint would put a prefix on the offset unit (i.e. kilodegC), which is not the same temperature
+            raise pint.OffsetUnitCalculusError(quantity.units, extra_msg=' The unit can not be made compact.')
+        if target == 'base':
+            return quantity.to_base_units()
+        elif target == 'reduced':
+            return quantity.to_reduced_units()
+        elif target == 'compact':
+            return quantity.to_compact()
+        elif target == 'simplify':
+            return quantity.to_reduced_units().to_compact()
+    return quantity.to(target)
+
+
+@functools.lru_cache()
+def _si_prefixes():
+    # the SI prefixes the same way Pint's to_compact() finds them
+    prefixes = {}
+    for prefix in ureg._prefixes.values():
+        try:
+            scale = prefix.converter.scale
+            log10_scale = int(math.log10(scale))
+            if log10_scale == math.log10(scale):
+                prefixes[log10_scale] = prefix.name
+        except Exception:
+            prefixes[0] = ''
+    prefixes = sorted(prefixes.items())
+    return [item[0] for item in prefixes], [item[1] for item in prefixes]
+
+
+@functools.lru_cache(maxsize=conf.unit_cache_size)
+def _compact_info(unit):
+    # give the factor to the unit without prefixes, the unit without prefixes and the unit (and power) that gets the
+    # new prefix.  None if the unit is unitless or has an offset, since Pint handles those
+    quantity = ureg.Quantity(1.0, unit)
+    if quantity.unitless or ureg.Quantity(0.0, unit).to_base_units().magnitude != 0.0:
+        return None
+    base = pint.util.infer_base_unit(quantity)
+    units = list(base.items())
+    units_numerator = [item for item in units if item[1] > 0]
+    unit_str, unit_power = units_numerator[0] if len(units_numerator) > 0 else units[0]
+    return quantity.to(base).magnitude, base, unit_str, unit_power
+
+
+def _compact_power(magnitude, info):
+    # the power of 10 of the compact prefix, see pint.quantity._Quantity.to_compact()
+    magnitude = abs(magnitude * info[0])
+    if info[3] > 0:
+        return int(math.floor(math.log10(magnitude) / info[3] / 3)) * 3
+    return int(math.ceil(math.log10(magnitude) / info[3] / 3)) * 3
+
+
+@functools.lru_cache(maxsize=conf.unit_cache_size)
+def _conversion_plan(unit, target):
+    if isinstance(target, tuple):
+        # ('compact', power)
+        powers, bases = _si_prefixes()
+        _, base, unit_str, _ = _compact_info(unit)
+        target = ureg.Unit(base.rename(unit_str, bases[bisect.bisect_left(powers, target[1])] + unit_str))
+
+    # units with an offset (i.e. degC) can not be converted with a factor, so Pint must be used
+    if _pint_convert(ureg.Quantity(0.0, unit), target).magnitude != 0.0:
+        return None, None
+    result = _pint_convert(ureg.Quantity(1.0, unit), target)
+    return result.units, result.magnitude
+
+
+def conversion_plan(unit, target, magnitude=None):
+    """Gives the cached conversion plan for converting a unit to the target.
+
+        Args:
+            :param unit: the unit to convert from
+            :type pint.unit: Pint Unit object instance
+            :param target: the unit to convert to or one of 'base', 'reduced', 'compact' or 'simplify'
+            :param magnitude: the magnitude, only needed for 'compact' and 'simplify' since the prefix depends on it
+            :type float: python float class
+
+        Returns:
+            :return tuple: The result unit and the factor to multiply the magnitude with.  Both are None if the
+                conversion needs Pint (i.e. offset units like degC, which raise a Pint OffsetUnitCalculusError for
+                'compact' and 'simplify')
+
+        For Example:
+
+        >>> conversion_plan(ureg.millivolt, 'base')
+        (<Unit('kilogram * meter ** 2 / ampere / second ** 3')>, 0.001)
+    """
+    if not isinstance(target, str):
+        return _conversion_plan(unit, target)
+
+    if target == 'simplify':
+        unit, factor = _conversion_plan(unit, 'reduced')
+        if unit is None:
+            return None, None
+        compact_unit, compact_factor = conversion_plan(unit, 'compact', magnitude * factor)
+        if compact_unit is None:
+            return None, None
+        return compact_unit, factor * compact_factor
+
+    if target == 'compact':
+        info = _compact_info(unit)
+        if info is None:
+            return None, None
+        # Pint leaves these magnitudes in the same unit
+        if magnitude == 0 or math.isnan(magnitude) or math.isinf(magnitude):
+            return unit, 1.0
+        target = ('compact', _compact_power(magnitude, info))
+
+    return _conversion_plan(unit, target)
+
+
+def convert(magnitude, unit, target):
+    """Converts a magnitude and unit to the target using the cached conversion plans.  Repeated conversions of the same
+    unit are one float multiply.
+
+        Args:
+            :param magnitude: the magnitude to convert.  Can be an np.ndarray, unless the target is 'compact' or
+                'simplify'
+            :param unit: the unit of the magnitude
+            :type pint.unit: Pint Unit object instance
+            :param target: the unit to convert to or one of 'base', 'reduced', 'compact' or 'simplify'
+
+        Returns:
+            :return tuple: The converted magnitude and its unit
+
+        For Example:
+
+        >>> convert(3000.0, ureg.volt, 'compact')
+        (3.0, <Unit('kilovolt')>)
+    """
+    result_unit, factor = conversion_plan(unit, target, magnitude)
+    if result_unit is None:
+        result = _pint_convert(ureg.Quantity(magnitude, unit), target)
+        return result.magnitude, result.units
+    return magnitude * factor, result_unit
+
+
+def conversion_cache_info():
+    """Gives the hits, misses, maxsize and currsize of the conversion plan cache"""
+    return _conversion_plan.cache_info()
+
+
 # # split units into basic units (i.e. removing operations)
 # def split_units(unit):
 #     assert isinstance(unit, str), 'The unit must be in str form.'
@@ -1,19 +1,27 @@
 # H1 -- For the Value class
 # *************************
-from physics.units import complete_units, ureg, pint_to_str, str_to_pint
+from physics.units import ureg, pint_to_str, str_to_pint, unit_algebra, unit_base, convert
 import pint
+import weakref
+import operator
 import numpy as np
 import physics.conf as conf
-
-if conf.tf_flag:
-    import tensorflow as tf
+import physics.tensors as tensors
 
 # H3 -- Value Class
 # -----------------
 
 
 class SuperValue(object):
-    pass
+    # no __dict__, so the Value subclass can use __slots__
+    __slots__ = ()
+
+
+class DeferredValue(object):
+    # objects that handle the Value operators themselves (i.e. physics.expression builds a graph from them and
+    # physics.uncertainty propagates standard deviations).  The Value and ValueArray operators return NotImplemented for
+    # them, so python calls their reflected operators
+    __slots__ = ()
 
 
 class MetaValue(SuperValue):
@@ -91,6 +99,32 @@ class MetaValue(SuperValue):
         return self.value * -1
 
 
+# the tensorflow fields of named Values, keyed by id(Value) and holding (placeholder, tf_shape).  Entries are removed
+# when the Value is garbage collected
+_tensors = {}
+
+
+def _set_tensor(value, placeholder=None, tf_shape=None):
+    key = id(value)
+    if placeholder is None and tf_shape is None:
+        return
+    if key not in _tensors:
+        weakref.finalize(value, _tensors.pop, key, None)
+        _tensors[key] = (None, None)
+    old_placeholder, old_tf_shape = _tensors[key]
+    _tensors[key] = (old_placeholder if placeholder is None else placeholder,
+                     old_tf_shape if tf_shape is None else tf_shape)
+
+
+def _new_value(magnitude, unit):
+    # the trusted constructor used by the operators.  It skips the checks in Value.__init__, so unit must be a Pint unit
+    value = float.__new__(Value, magnitude)
+    value.unit = unit
+    value.name = None
+    value._magnitude = None
+    return value
+
+
 class Value(float, SuperValue):
 
     """Value object built on the float object and using `Pint Units <https://pint.readthedocs.io/en/0.9/>`_.
@@ -116,31 +150,56 @@ class Value(float, SuperValue):
             ndarray([2.0 A*Ohm, 2.0 A*Ohm, 2.0 A*Ohm])
     """
 
+    # the magnitude is stored once as the float itself.  _magnitude is only set if the magnitude is changed after the
+    # Value is made (i.e. copy_value).  The tensorflow placeholder and shape are kept in the _tensors side table, so
+    # Values without a name do not carry them
+    __slots__ = ('unit', 'name', '_magnitude', '__weakref__')
+
     def __new__(cls, value, unit=ureg.dimensionless, tf_shape=None, name=None):
         # assert unit in complete_units, 'Your unit {0} is not in the list of available units'.format(unit)
         # value, unit = cls.SI_unit(value, unit)
         return float.__new__(cls, value)
 
+    @property
+    def magnitude(self):
+        magnitude = self._magnitude
+        if magnitude is None:
+            return float.__float__(self)
+        return magnitude
+
+    @magnitude.setter
+    def magnitude(self, _input):
+        self._magnitude = _input
+
+    @property
+    def placeholder(self):
+        return _tensors.get(id(self), (None, None))[0]
+
+    @placeholder.setter
+    def placeholder(self, _input):
+        _set_tensor(self, placeholder=_input)
+
+    @property
+    def tf_shape(self):
+        return _tensors.get(id(self), (None, None))[1]
+
+    @tf_shape.setter
+    def tf_shape(self, _input):
+        _set_tensor(self, tf_shape=_input)
+
     # return an np.ndarray of values given a unit and ndarray
     @classmethod
     def array_like(cls, array, unit):
         """
-        Converts all the floats in array to Values
+        Converts all the floats in array to a ValueArray sharing one unit
         Args:
-            array (np.ndarray): The array to be converted. Should be either 1D or 2D
+            array (np.ndarray): The array to be converted. Can be of any rank
             unit (urge.unit): The desired unit for all the values
 
         Returns:
-            np.ndarray with the new units
+            ValueArray with the new units
         """
-        if len(array.shape) == 1:
-            result = np.array([Value(value=x, unit=unit) for x in array], dtype=object)
-        elif len(array.shape) == 2:
-            result = np.array([[Value(value=x, unit=unit) for x in sub] for sub in array], dtype=object)
-        else:
-            raise ValueError('You are trying to convert an array with rank {0}, but only arrays with 1 or 2 dims'
-                             ' can be converted right now.'.format(len(array.shape)))
-        return result
+        return ValueArray(magnitude=np.array(array, dtype=np.float64), unit=unit)
 
     def unit_str(self):
 
@@ -178,7 +237,7 @@ class Value(float, SuperValue):
         # test = value * unit
         # test.to_reduced_units()
         self.unit = unit
-        self.magnitude = value
+        self._magnitude = None
         self.name = name
         # if the tf flag is raised and a name is give, then create a placeholder
         if conf.tf_flag:
@@ -188,174 +247,214 @@ class Value(float, SuperValue):
                 if tf_shape is None:
                     tf_shape = (None, 1)
                 self.tf_shape = tf_shape
-                self.placeholder = tf.placeholder(name=name, shape=self.tf_shape, dtype=conf.tf_dtype)
+                # the placeholders are reused by name, shape and dtype, so rebuilding named Values does not grow the graph
+                self.placeholder = tensors.placeholder(name, self.tf_shape)
 
     def adjust_unit(self, desired_unit):
-        tmp = self.magnitude*self.unit
-        tmp = tmp.to(desired_unit)
-        return Value(tmp.magnitude, tmp.units)
+        # the conversions use the cached conversion plans, see physics.units.convert
+        magnitude, unit = convert(self.magnitude, self.unit, desired_unit)
+        return _new_value(magnitude, unit)
 
     def simplify_units(self):
-        tmp = self.magnitude*self.unit
-        tmp = tmp.to_reduced_units().to_compact()
-        return Value(tmp.magnitude, tmp.units)
+        magnitude, unit = convert(self.magnitude, self.unit, 'simplify')
+        return _new_value(magnitude, unit)
 
     def compact_units(self):
-        tmp = self.magnitude * self.unit
-        tmp = tmp.to_compact()
-        return Value(tmp.magnitude, tmp.units)
+        magnitude, unit = convert(self.magnitude, self.unit, 'compact')
+        return _new_value(magnitude, unit)
 
     def base_units(self):
-        tmp = self.magnitude * self.unit
-        tmp = tmp.to_base_units()
-        return Value(tmp.magnitude, tmp.units)
+        magnitude, unit = convert(self.magnitude, self.unit, 'base')
+        return _new_value(magnitude, unit)
 
     def reduced_units(self):
-        tmp = self.magnitude*self.unit
-        tmp = tmp.to_reduced_units()
-        return Value(tmp.magnitude, tmp.units)
+        magnitude, unit = convert(self.magnitude, self.unit, 'reduced')
+        return _new_value(magnitude, unit)
 
     def __round__(self, n=None):
-        return Value(value=float.__round__(self, n), unit=self.unit)
+        return _new_value(float.__round__(self, n), self.unit)
 
     def __neg__(self):
-        return Value(value=self.magnitude*-1, unit=self.unit)
+        return _new_value(self.magnitude*-1, self.unit)
 
     def __mul__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
         # check if this is an ndarray, if so cast the value to an array of the same shape
         if isinstance(other, np.ndarray):
             return other * np.array([self], dtype=object)
 
         if not isinstance(other, SuperValue):
-            return Value(value=other*self.magnitude, unit=self.unit)
+            return _new_value(other*self.magnitude, self.unit)
 
-        result = self.magnitude * other.magnitude
-        #result = super(Value, self).__mul__(other)
-        # result = float.__mul__(other)
-        result *= self.unit * other.unit
-        result = Value(value=result.magnitude, unit=result.units)
-        return result
+        # the unit math is cached, so only the magnitudes are computed here
+        unit, factor = unit_algebra('mul', self.unit, other.unit)
+        return _new_value(self.magnitude * other.magnitude * factor, unit)
 
     # multiply is commutative
     __rmul__ = __mul__
 
     def __abs__(self):
-        return Value(value=abs(self.magnitude), unit=self.unit)
+        return _new_value(abs(self.magnitude), self.unit)
 
     def __truediv__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
         if isinstance(other, np.ndarray):
             return np.array([self], dtype=object) / other
         if not isinstance(other, SuperValue) and (isinstance(other, float) or isinstance(other, int)):
-            return Value(value=super(Value, self).__truediv__(other), unit=self.unit)
+            return _new_value(super(Value, self).__truediv__(other), self.unit)
         assert isinstance(other, SuperValue), 'You can only multiple Values with other Values'
         # result = self.magnitude * other.magnitude
         try:
             result = self.magnitude / other.magnitude
         except ZeroDivisionError:
             return np.inf
-        result *= (self.unit / other.unit)
-        result = Value(value=result.magnitude, unit=result.units)
-        return result
+        unit, factor = unit_algebra('div', self.unit, other.unit)
+        return _new_value(result * factor, unit)
 
     def __rtruediv__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
         if isinstance(other, np.ndarray):
             return other / np.array([self], dtype=object)
         if not isinstance(other, SuperValue) and (isinstance(other, float) or isinstance(other, int)):
-            return Value(value=super(Value, self).__rtruediv__(other), unit=(1/self.unit).units)
+            return _new_value(super(Value, self).__rtruediv__(other), unit_algebra('inv', self.unit)[0])
         assert isinstance(other, SuperValue), 'You can only multiple Values with other Values'
         # result = self.magnitude * other.magnitude
         # result = super(Value, self).__rtruediv__(other)
-        result = other.magnitude / self.magnitude
-        result *= (other.unit / self.unit)
-        result = Value(value=result.magnitude, unit=result.units)
-        return result
+        unit, factor = unit_algebra('div', other.unit, self.unit)
+        return _new_value(other.magnitude / self.magnitude * factor, unit)
 
     # this will force numpy to use my operators. May depreciate in the future
     __array_priority__ = 17
 
+    # numpy functions keep the unit, see physics.ufuncs
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return ufuncs.array_ufunc(self, ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        return ufuncs.array_function(self, func, types, args, kwargs)
+
     __div__ = __truediv__
     __rdiv__ = __rtruediv__
 
     def sqrt(self):
-        a = self.unit**0.5
-        return Value(value=self.magnitude**0.5, unit=a)
+        unit, factor = unit_algebra('pow', self.unit, 0.5)
+        return _new_value(self.magnitude**0.5 * factor, unit)
 
     def __pow__(self, power, modulo=None):
-        return Value(self.magnitude**power, unit=self.unit**power)
+        unit, factor = unit_algebra('pow', self.unit, power)
+        return _new_value(self.magnitude**power * factor, unit)
 
     def unit_copy(self, other):
         assert not isinstance(other, Value), "You cannot create a value from another value"
         assert isinstance(other, float) or isinstance(other, int), 'You can only create a value from a float or int'
-        return Value(value=other, unit=self.unit)
+        return _new_value(other, self.unit)
 
     def __add__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
         if isinstance(other, np.ndarray):
             return other + np.array([self], dtype=object)
 
         if not isinstance(other, SuperValue):
-            return Value(value=other + self.magnitude, unit=self.unit)
+            return _new_value(other + self.magnitude, self.unit)
 
-        assert other.unit.dimensionality == self.unit.dimensionality, 'You can only add values with the same dimensions'
+        unit, factor = unit_algebra('add', self.unit, other.unit)
+        assert unit is not None, 'You can only add values with the same dimensions'
+        if factor is not None:
+            return _new_value(self.magnitude + other.magnitude * factor, unit)
+        # units with an offset can not be scaled, so let Pint handle them
         # result = super(Value, self).__add__(other)
-        result = self.magnitude*self.unit + other.magnitude*other.unit
+        result = ureg.Quantity(self.magnitude, self.unit) + ureg.Quantity(other.magnitude, other.unit)
         # result *= self.unit * other.unit
-        result = Value(value=result.magnitude, unit=result.units)
+        result = _new_value(result.magnitude, result.units)
         return result
 
     # reverse add is the same as forward add
     __radd__ = __add__
 
     def __sub__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
         if isinstance(other, np.ndarray):
             return np.array([self], dtype=object) - other
         if not isinstance(other, SuperValue):
-            return Value(value=self.magnitude - other, unit=self.unit)
+            return _new_value(self.magnitude - other, self.unit)
         # if isinstance(other, float) or isinstance(other, int):
         #     return Value(value=super(Value, self).__sub__(other), unit=self.unit)
         # assert isinstance(other, Value), 'You can only multiple Values with other Values'
-        assert other.unit.dimensionality == self.unit.dimensionality, 'You can only add values with the same dimensions'
-        result = self.magnitude*self.unit - other.magnitude*other.unit
-        result = Value(value=result.magnitude, unit=result.units)
+        unit, factor = unit_algebra('add', self.unit, other.unit)
+        assert unit is not None, 'You can only add values with the same dimensions'
+        if factor is not None:
+            return _new_value(self.magnitude - other.magnitude * factor, unit)
+        result = ureg.Quantity(self.magnitude, self.unit) - ureg.Quantity(other.magnitude, other.unit)
+        result = _new_value(result.magnitude, result.units)
         return result
 
     def __rsub__(self, other):
         result = self.__sub__(other)
         return result*-1
 
-    def __eq__(self, other):
-        # Check they are both values
+    def _compare_magnitudes(self, other):
+        # give the two floats to compare, or None if the dimensions do not match.  The scale factors are cached, so
+        # no Pint Quantity is made unless the units have an offset (i.e. degC)
         if isinstance(other, SuperValue):
-            # check they are the same
-            return self.magnitude*self.unit == other.magnitude*other.unit
-        # if other is not unit, then they are not the same
-        else:
-            return self.base_units().magnitude == other
+            if other.unit is self.unit:
+                return self.magnitude, other.magnitude
+            unit, factor = unit_algebra('add', self.unit, other.unit)
+            if unit is None:
+                return None
+            if factor is None:
+                return self.magnitude, ureg.Quantity(other.magnitude, other.unit).to(self.unit).magnitude
+            return self.magnitude, other.magnitude * factor
+        # if other is not unit, then compare in base units
+        scale, offset, _ = unit_base(self.unit)
+        return self.magnitude * scale + offset, other
+
+    def _compare_magnitudes_or_raise(self, other):
+        result = self._compare_magnitudes(other)
+        if result is None:
+            raise pint.DimensionalityError(self.unit, other.unit)
+        return result
+
+    def __eq__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
+        result = self._compare_magnitudes(other)
+        # if the dimensions are different, then they are not the same
+        if result is None:
+            return False
+        return result[0] == result[1]
 
     def __gt__(self, other):
-        # Check they are both values
-        if isinstance(other, SuperValue):
-            # check they are the same
-            return self.magnitude * self.unit > other.magnitude * other.unit
-        # if other is not unit, then they are not the same
-        else:
-            return self.base_units().magnitude > other
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
+        a, b = self._compare_magnitudes_or_raise(other)
+        return a > b
 
     def __lt__(self, other):
-        # Check they are both values
-        if isinstance(other, SuperValue):
-            # check they are the same
-            return self.magnitude * self.unit < other.magnitude * other.unit
-        # if other is not unit, then they are not the same
-        else:
-            return self.base_units().magnitude < other
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
+        a, b = self._compare_magnitudes_or_raise(other)
+        return a < b
 
     def __le__(self, other):
-        return self.__eq__(other) or self.__lt__(other)
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
+        a, b = self._compare_magnitudes_or_raise(other)
+        return a <= b
 
     def __ge__(self, other):
-        return self.__eq__(other) or self.__gt__(other)
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
+        a, b = self._compare_magnitudes_or_raise(other)
+        return a >= b
 
     def __ne__(self, other):
+        if isinstance(other, (ValueArray, DeferredValue)):
+            return NotImplemented
         return not self.__eq__(other)
 
     # the copy value function. Used for taking an __input Value but keeping the tensor
@@ -366,7 +465,7 @@ class Value(float, SuperValue):
 
     # np functions
     def log10(self):
-        return Value(value=np.log10(self.magnitude), unit=self.unit)
+        return _new_value(np.log10(self.magnitude), self.unit)
 
     # define some properties
     @property
@@ -388,15 +487,17 @@ class Value(float, SuperValue):
         return np.reshape(np.array(self.magnitude), newshape=newshape)
 
     def __setstate__(self, state):
-        self.unit, self.magnitude, self.name, self.placeholder = state
+        self.unit, magnitude, self.name, placeholder = state
+        # only keep the magnitude if it is different from the float
+        self._magnitude = None if magnitude == float.__float__(self) else magnitude
         # if the placeholder is not None, then import it from the default graph
-        if self.placeholder is not None:
+        if placeholder is not None:
             try:
-                graph = tf.get_default_graph()
-                self.placeholder = graph.get_tensor_by_name(self.placeholder)
-            except KeyError:
-                # if the placeholder was not found, just save as None
-                self.placeholder = None
+                graph = conf.import_tf().get_default_graph()
+                self.placeholder = graph.get_tensor_by_name(placeholder)
+            except (KeyError, AttributeError):
+                # if the placeholder was not found (or tensorflow is not available), just save as None
+                pass
 
     def __getstate__(self):
         if self.placeholder is not None:
@@ -429,3 +530,318 @@ class Value(float, SuperValue):
 
         # if self.__value is None:
         #     raise ValueError('You have not set the value')
+
+
+# H3 -- ValueArray Class
+# ----------------------
+
+_get_unit = operator.attrgetter('unit')
+_get_magnitude = operator.attrgetter('magnitude')
+
+
+class ValueArray(object):
+
+    """Array of magnitudes stored in a single float64 np.ndarray that share one `Pint Unit`.
+
+        Unlike an np.ndarray of Value objects (dtype=object), the unit math is done once per operation and the
+        magnitudes are handled by numpy, so the arrays can be of any rank and broadcast like normal ndarrays.
+
+        Args:
+            magnitude (np.ndarray): The magnitudes of the array.  Is converted to float64 (without a copy if possible)
+            unit (pint.unit._Unit, optional): The unit for all the magnitudes.  Default is dimensionless ('')
+
+        Basic Example::
+            resistance = ValueArray(magnitude=np.array([1.0, 2.0, 3.0]), unit=ureg.ohm)
+            current = Value(value=2.0, unit=ureg.amp)
+            voltage = current * resistance
+            print(voltage)
+            [2. 4. 6.] A*Ohm
+
+        Indexing with a slice returns a ValueArray view of the same buffer, while indexing a single element returns a
+        Value::
+            print(voltage[1:])
+            [4. 6.] A*Ohm
+            print(voltage[0])
+            2.0 A*Ohm
+    """
+
+    # this must be larger than the Value __array_priority__ so numpy defers to the ValueArray operators
+    __array_priority__ = 18
+
+    # numpy functions such as np.exp, np.maximum and np.concatenate run on the magnitudes and keep the unit, see
+    # physics.ufuncs
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return ufuncs.array_ufunc(self, ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        return ufuncs.array_function(self, func, types, args, kwargs)
+
+    def __init__(self, magnitude, unit=ureg.dimensionless):
+        if unit is None:
+            unit = ureg.dimensionless
+        assert isinstance(unit, pint.unit._Unit), 'You must create a ValueArray with a unit form physics.value.ureg. See Docs for details.'
+        self.magnitude = np.asarray(magnitude, dtype=np.float64)
+        self.unit = unit
+
+    @classmethod
+    def from_values(cls, values, unit=None):
+        """
+        Creates a ValueArray from a collection of Value (or MetaValue) objects, such as a np.ndarray with dtype=object.
+        Values with different units (i.e. mV and V) are grouped by unit, and all the groups are converted with one
+        multiply by the cached scale factor of each group.
+
+        Args:
+            values (iterable): The Values to be converted.  All must have the same dimensionality
+            unit (ureg.unit, optional): The unit of the ValueArray.  Default is the unit of the first Value
+
+        Returns:
+            ValueArray with all the values converted to unit
+        """
+        values = np.asarray(values, dtype=object)
+        flat = values.ravel()
+        assert flat.size > 0 or unit is not None, 'You must give a unit to create a ValueArray from an empty collection'
+        units = list(map(_get_unit, flat))
+        if unit is None:
+            unit = units[0]
+        magnitude = np.fromiter(map(_get_magnitude, flat), dtype=np.float64, count=flat.size)
+
+        # group by the unit objects, the Values made by the same operator or constant share one
+        ids = np.fromiter(map(id, units), dtype=np.uint64, count=flat.size)
+        _, first, group = np.unique(ids, return_index=True, return_inverse=True)
+        factors = np.ones(len(first), dtype=np.float64)
+        for g, i in enumerate(first):
+            if units[i] == unit:
+                continue
+            result, factor = unit_algebra('add', unit, units[i])
+            if result is None:
+                raise pint.DimensionalityError(units[i], unit)
+            if factor is None:
+                # units with an offset (i.e. degC) can not be scaled, so that group is converted on its own
+                index = group.ravel() == g
+                magnitude[index] = convert(magnitude[index], units[i], unit)[0]
+            else:
+                factors[g] = factor
+        if np.any(factors != 1.0):
+            magnitude *= factors[group.ravel()]
+        return cls(magnitude=magnitude.reshape(values.shape), unit=unit)
+
+    # --numpy like properties------------------
+
+    @property
+    def shape(self):
+        return self.magnitude.shape
+
+    @property
+    def ndim(self):
+        return self.magnitude.ndim
+
+    @property
+    def size(self):
+        return self.magnitude.size
+
+    @property
+    def T(self):
+        return ValueArray(magnitude=self.magnitude.T, unit=self.unit)
+
+    def __len__(self):
+        return len(self.magnitude)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, item):
+        result = self.magnitude[item]
+        if np.ndim(result) == 0:
+            return _new_value(float(result), self.unit)
+        return ValueArray(magnitude=result, unit=self.unit)
+
+    def __setitem__(self, key, value):
+        if isinstance(value, (SuperValue, ValueArray)):
+            value = self._other_magnitude(value)
+        self.magnitude[key] = value
+
+    def reshape(self, *shape):
+        return ValueArray(magnitude=self.magnitude.reshape(*shape), unit=self.unit)
+
+    def copy(self):
+        return ValueArray(magnitude=self.magnitude.copy(), unit=self.unit)
+
+    def to_values(self):
+        """
+        Converts the ValueArray to an np.ndarray of Value objects (dtype=object).  Only use this for code that still
+        needs the object arrays, as every element becomes a Python object.
+
+        Returns:
+            np.ndarray with dtype=object
+        """
+        result = np.empty(self.shape, dtype=object)
+        for index, magnitude in np.ndenumerate(self.magnitude):
+            result[index] = _new_value(float(magnitude), self.unit)
+        return result
+
+    def unit_str(self):
+        return pint_to_str(self.unit)
+
+    def __str__(self):
+        return '{0} '.format(self.magnitude) + self.unit_str()
+
+    def __repr__(self):
+        return 'ValueArray({0}, {1})'.format(repr(self.magnitude), self.unit_str())
+
+    # --unit conversions------------------
+
+    def adjust_unit(self, desired_unit):
+        magnitude, unit = convert(self.magnitude, self.unit, desired_unit)
+        return ValueArray(magnitude=magnitude, unit=unit)
+
+    def base_units(self):
+        magnitude, unit = convert(self.magnitude, self.unit, 'base')
+        return ValueArray(magnitude=magnitude, unit=unit)
+
+    def reduced_units(self):
+        magnitude, unit = convert(self.magnitude, self.unit, 'reduced')
+        return ValueArray(magnitude=magnitude, unit=unit)
+
+    def _other_magnitude(self, other):
+        # give the magnitude of other in the unit of this array, other must have the same dimensions
+        unit, factor = unit_algebra('add', self.unit, other.unit)
+        assert unit is not None, 'You can only add values with the same dimensions'
+        if factor is None:
+            return ureg.Quantity(np.asarray(other.magnitude, dtype=np.float64), other.unit).to(self.unit).magnitude
+        if factor == 1.0:
+            return np.asarray(other.magnitude, dtype=np.float64)
+        return np.asarray(other.magnitude, dtype=np.float64) * factor
+
+    # --math operations------------------
+
+    def __neg__(self):
+        return ValueArray(magnitude=-self.magnitude, unit=self.unit)
+
+    def __abs__(self):
+        return ValueArray(magnitude=np.abs(self.magnitude), unit=self.unit)
+
+    def _has_offset(self, other):
+        # check if other has the dimensions of this array and either unit has an offset (i.e. degC)
+        unit, factor = unit_algebra('add', self.unit, other.unit)
+        return unit is not None and factor is None
+
+    def _pint_operation(self, other, operation):
+        # add or subtract units with an offset (i.e. degC) with Pint, which raises if that is ambiguous
+        result = operation(ureg.Quantity(self.magnitude, self.unit),
+                           ureg.Quantity(np.asarray(other.magnitude, dtype=np.float64), other.unit))
+        return ValueArray(magnitude=result.magnitude, unit=result.units)
+
+    def __add__(self, other):
+        if isinstance(other, DeferredValue):
+            return NotImplemented
+        if not isinstance(other, (SuperValue, ValueArray)):
+            return ValueArray(magnitude=self.magnitude + other, unit=self.unit)
+        if self._has_offset(other):
+            return self._pint_operation(other, operator.add)
+        return ValueArray(magnitude=self.magnitude + self._other_magnitude(other), unit=self.unit)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, DeferredValue):
+            return NotImplemented
+        if not isinstance(other, (SuperValue, ValueArray)):
+            return ValueArray(magnitude=self.magnitude - other, unit=self.unit)
+        if self._has_offset(other):
+            return self._pint_operation(other, operator.sub)
+        return ValueArray(magnitude=self.magnitude - self._other_magnitude(other), unit=self.unit)
+
+    def __rsub__(self, other):
+        if isinstance(other, DeferredValue):
+            return NotImplemented
+        return -self.__sub__(other)
+
+    def __mul__(self, other):
+        if isinstance(other, DeferredValue):
+            return NotImplemented
+        if not isinstance(other, (SuperValue, ValueArray)):
+            return ValueArray(magnitude=self.magnitude * other, unit=self.unit)
+        unit, factor = unit_algebra('mul', self.unit, other.unit)
+        return ValueArray(magnitude=self.magnitude * np.asarray(other.magnitude) * factor, unit=unit)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, DeferredValue):
+            return NotImplemented
+        if not isinstance(other, (SuperValue, ValueArray)):
+            return ValueArray(magnitude=self.magnitude / other, unit=self.unit)
+        unit, factor = unit_algebra('div', self.unit, other.unit)
+        return ValueArray(magnitude=self.magnitude / np.asarray(other.magnitude) * factor, unit=unit)
+
+    def __rtruediv__(self, other):
+        if isinstance(other, DeferredValue):
+            return NotImplemented
+        if not isinstance(other, (SuperValue, ValueArray)):
+            return ValueArray(magnitude=other / self.magnitude, unit=unit_algebra('inv', self.unit)[0])
+        unit, factor = unit_algebra('div', other.unit, self.unit)
+        return ValueArray(magnitude=np.asarray(other.magnitude) / self.magnitude * factor, unit=unit)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __pow__(self, power, modulo=None):
+        unit, factor = unit_algebra('pow', self.unit, power)
+        return ValueArray(magnitude=self.magnitude**power * factor, unit=unit)
+
+    def sqrt(self):
+        unit, factor = unit_algebra('pow', self.unit, 0.5)
+        return ValueArray(magnitude=np.sqrt(self.magnitude) * factor, unit=unit)
+
+    def log10(self):
+        return ValueArray(magnitude=np.log10(self.magnitude), unit=self.unit)
+
+    # --comparisons, these return np.ndarray of bool------------------
+
+    def _compare_magnitudes(self, other):
+        # give the magnitudes to compare, if other is not unit then compare in base units like Value
+        if isinstance(other, (SuperValue, ValueArray)):
+            return self.magnitude, self._other_magnitude(other)
+        scale, offset, _ = unit_base(self.unit)
+        return self.magnitude * scale + offset, other
+
+    def __eq__(self, other):
+        if isinstance(other, (SuperValue, ValueArray)) and unit_algebra('add', self.unit, other.unit)[0] is None:
+            return np.zeros(self.shape, dtype=bool)
+        a, b = self._compare_magnitudes(other)
+        return a == b
+
+    def __ne__(self, other):
+        return np.logical_not(self.__eq__(other))
+
+    def __lt__(self, other):
+        a, b = self._compare_magnitudes(other)
+        return a < b
+
+    def __le__(self, other):
+        a, b = self._compare_magnitudes(other)
+        return a <= b
+
+    def __gt__(self, other):
+        a, b = self._compare_magnitudes(other)
+        return a > b
+
+    def __ge__(self, other):
+        a, b = self._compare_magnitudes(other)
+        return a >= b
+
+    # ValueArray is mutable, so do not allow hashing
+    __hash__ = None
+
+
+# the numpy protocols of the classes above are in physics.ufuncs, which needs the classes
+import physics.ufuncs as ufuncs
+
+# the profiling wraps the classes above, so it is turned on after they are made
+if conf.profile:
+    import atexit
+    import sys
+    import physics.profiling as profiling
+    profiling.enable()
+    atexit.register(lambda: print(profiling.report(), file=sys.stderr))
@@ -0,0 +1,343 @@
+# H1 -- Vectorized functions for collections of Values
+# *****************************************************
+# These functions work on lists (or np.ndarray with dtype=object) of Value objects that may have different prefixes
+# (i.e. mV and V).  The magnitudes are converted to base units with one cached scale factor per unique unit and then
+# handled by numpy, so there is no Pint Quantity made per element.
+from physics.units import unit_base, unit_algebra
+from physics.value import Value, ValueArray, SuperValue, _new_value
+import physics.units as units
+import pint
+import numpy as np
+
+
+def base_magnitudes(values):
+    """
+    Gives the magnitudes of a collection of Values in base units
+
+    Args:
+        values (iterable): The Values (or MetaValues) or a ValueArray.  All must have the same dimensionality
+
+    Returns:
+        np.ndarray of float64 with the same shape as values
+    """
+    if isinstance(values, ValueArray):
+        scale, offset, _ = unit_base(values.unit)
+        return values.magnitude * scale + offset
+
+    values = np.asarray(values, dtype=object)
+    flat = values.ravel()
+    magnitude = np.array([v.magnitude for v in flat], dtype=np.float64)
+
+    # give each unique unit an index so there is only one cached lookup per unit
+    codes = {}
+    index = np.array([codes.setdefault(v.unit, len(codes)) for v in flat], dtype=np.intp)
+    bases = [unit_base(unit) for unit in codes.keys()]
+    for unit, base in zip(codes.keys(), bases):
+        if base[2] != bases[0][2]:
+            raise pint.DimensionalityError(unit, list(codes.keys())[0])
+    scale = np.array([base[0] for base in bases], dtype=np.float64)
+    offset = np.array([base[1] for base in bases], dtype=np.float64)
+
+    return (magnitude * scale[index] + offset[index]).reshape(values.shape)
+
+
+def _as_base(other, dimensionality):
+    # give the base unit magnitude of a single Value or collection of Values
+    if isinstance(other, SuperValue):
+        scale, offset, other_dimensionality = unit_base(other.unit)
+        if other_dimensionality != dimensionality:
+            raise pint.DimensionalityError(other.unit, dimensionality)
+        return other.magnitude * scale + offset
+    if _dimensionality(other) != dimensionality:
+        raise pint.DimensionalityError(_dimensionality(other), dimensionality)
+    return base_magnitudes(other)
+
+
+def _dimensionality(values):
+    if isinstance(values, ValueArray):
+        return values.unit.dimensionality
+    return unit_base(np.asarray(values, dtype=object).flat[0].unit)[2]
+
+
+def argsort(values, kind='stable'):
+    """
+    Gives the indices that would sort the values, like np.argsort
+
+    Args:
+        values (iterable): The Values, can have different prefixes but must have the same dimensionality
+        kind (str, optional): The numpy sorting algorithm.  Default is 'stable'
+
+    Returns:
+        np.ndarray of the indices
+
+    For Example::
+        values = [Value(2, ureg.volt), Value(5, ureg.millivolt), Value(0.1, ureg.kilovolt)]
+        argsort(values)
+        array([1, 0, 2])
+    """
+    return np.argsort(base_magnitudes(values), kind=kind)
+
+
+def sort(values):
+    """
+    Sorts the values, keeping the unit of each Value
+
+    Args:
+        values (iterable): The Values, can have different prefixes but must have the same dimensionality
+
+    Returns:
+        np.ndarray with dtype=object of the sorted Values, or a ValueArray if values is a ValueArray
+    """
+    index = argsort(values)
+    if isinstance(values, ValueArray):
+        return values[index]
+    return np.asarray(values, dtype=object)[index]
+
+
+def searchsorted(sorted_values, v, side='left'):
+    """
+    Finds the indices where v should be inserted into sorted_values to keep the order, like np.searchsorted
+
+    Args:
+        sorted_values (iterable): The sorted Values, can have different prefixes but must have the same dimensionality
+        v (Value or iterable): The Value or Values to insert
+        side (str, optional): 'left' or 'right', see np.searchsorted
+
+    Returns:
+        int or np.ndarray of ints
+    """
+    base = base_magnitudes(sorted_values)
+    return np.searchsorted(base, _as_base(v, _dimensionality(sorted_values)), side=side)
+
+
+def min(values):
+    """
+    Gives the smallest Value in values, keeping its unit
+
+    Args:
+        values (iterable): The Values, can have different prefixes but must have the same dimensionality
+
+    Returns:
+        Value
+    """
+    index = np.unravel_index(np.argmin(base_magnitudes(values)), np.shape(values))
+    if isinstance(values, ValueArray):
+        return values[index]
+    return np.asarray(values, dtype=object)[index]
+
+
+def max(values):
+    """
+    Gives the largest Value in values, keeping its unit
+
+    Args:
+        values (iterable): The Values, can have different prefixes but must have the same dimensionality
+
+    Returns:
+        Value
+    """
+    index = np.unravel_index(np.argmax(base_magnitudes(values)), np.shape(values))
+    if isinstance(values, ValueArray):
+        return values[index]
+    return np.asarray(values, dtype=object)[index]
+
+
+# H3 -- Reductions
+# -----------------
+# The reductions check the units once and convert the Values to the unit of the first one (one cached scale per unique
+# unit), then run a single numpy call, instead of folding an object array through Value.__add__.
+
+
+def _magnitudes(values, additive=False):
+    # give the magnitudes of values in the unit of the first Value (or of the ValueArray) and that unit
+    if not isinstance(values, ValueArray):
+        values = np.asarray(values, dtype=object)
+        assert values.size > 0, 'You must give at least one Value'
+        values = ValueArray.from_values(values)
+    unit, magnitude = values.unit, values.magnitude
+    if additive:
+        assert unit_base(unit)[1] == 0, 'Values in {0} can not be added, as the unit has an offset. Convert them to ' \
+                                        'an absolute unit (i.e. kelvin) first'.format(unit)
+    return magnitude, unit
+
+
+def _result(magnitude, unit):
+    # give a Value for a single magnitude, otherwise a ValueArray
+    if np.ndim(magnitude) == 0:
+        return _new_value(float(magnitude), unit)
+    return ValueArray(magnitude, unit)
+
+
+def sum(values, axis=None):
+    """
+    Gives the sum of values, like np.sum
+
+    Args:
+        values (iterable): The Values or a ValueArray.  They can have different prefixes but must have the same
+            dimensionality, and the unit can not have an offset (i.e. degC)
+        axis (int, optional): The axis to sum over.  Default is all the values
+
+    Returns:
+        Value in the unit of the first Value (or ValueArray if axis is given)
+
+    For Example::
+        sum([Value(2, ureg.volt), Value(5, ureg.millivolt)])
+        2.005 volt
+    """
+    magnitude, unit = _magnitudes(values, additive=True)
+    return _result(np.sum(magnitude, axis=axis), unit)
+
+
+def mean(values, axis=None):
+    """
+    Gives the mean of values, like np.mean
+
+    Args:
+        values (iterable): The Values or a ValueArray, with the same dimensionality
+        axis (int, optional): The axis of the mean.  Default is all the values
+
+    Returns:
+        Value in the unit of the first Value (or ValueArray if axis is given)
+    """
+    magnitude, unit = _magnitudes(values)
+    return _result(np.mean(magnitude, axis=axis), unit)
+
+
+def std(values, axis=None, ddof=0):
+    """
+    Gives the standard deviation of values, like np.std
+
+    Args:
+        values (iterable): The Values or a ValueArray, with the same dimensionality
+        axis (int, optional): The axis of the standard deviation.  Default is all the values
+        ddof (int, optional): The delta degrees of freedom, see np.std.  Default is 0
+
+    Returns:
+        Value in the unit of the first Value (or ValueArray if axis is given)
+    """
+    magnitude, unit = _magnitudes(values)
+    return _result(np.std(magnitude, axis=axis, ddof=ddof), unit)
+
+
+def cumsum(values, axis=None):
+    """
+    Gives the cumulative sum of values, like np.cumsum
+
+    Args:
+        values (iterable): The Values or a ValueArray, see sum
+        axis (int, optional): The axis of the sum.  Default is the flattened values
+
+    Returns:
+        ValueArray in the unit of the first Value
+    """
+    magnitude, unit = _magnitudes(values, additive=True)
+    return ValueArray(np.cumsum(magnitude, axis=axis), unit)
+
+
+# np.trapz was renamed np.trapezoid in numpy 2.0
+_trapezoid = getattr(np, 'trapezoid', None) or getattr(np, 'trapz')
+
+
+def integrate(values, x=None, dx=None, axis=-1):
+    """
+    Integrates values with the trapezoidal rule, like np.trapezoid.  The result has the unit of values times the unit
+    of x, i.e. watt * second for a power integrated over time
+
+    Args:
+        values (iterable): The Values or a ValueArray of the integrand
+        x (iterable, optional): The Values or a ValueArray of the sample points, i.e. the time column of a FieldTable
+        dx (Value, optional): The spacing of the sample points if x is not given
+        axis (int, optional): The axis to integrate over.  Default is the last
+
+    Returns:
+        Value (or ValueArray for values with more than one axis)
+
+    For Example::
+        time, flux = Field('time', name='t'), Field('heat_flux', name='q')
+        integrate(table[flux], table[time])
+        12.5 watt * second / meter ** 2
+    """
+    assert (x is None) != (dx is None), 'You must give either the sample points x or the spacing dx'
+    magnitude, unit = _magnitudes(values, additive=True)
+    if x is not None:
+        x, x_unit = _magnitudes(x)
+    else:
+        x_unit = dx.unit
+    result_unit, factor = unit_algebra('mul', unit, x_unit)
+    if x is not None:
+        return _result(_trapezoid(magnitude, x=x, axis=axis) * factor, result_unit)
+    return _result(_trapezoid(magnitude, dx=dx.magnitude, axis=axis) * factor, result_unit)
+
+
+def normalize(values, unit=None, compact=False):
+    """
+    Converts a collection of Values with mixed prefixes (i.e. mV and V from different instruments) to one unit.  The
+    Values are grouped by unit and converted with one multiply, see ValueArray.from_values
+
+    Args:
+        values (iterable): The Values (or MetaValues) or a ValueArray, with the same dimensionality
+        unit (ureg.unit or str, optional): The unit of the result.  Default is the unit of the first Value
+        compact (bool, optional): Use the prefix of unit that gives the median magnitude between 1 and 1000 (i.e.
+            millivolt for values around 0.005 volt) for displaying the values.  Default is False
+
+    Returns:
+        ValueArray
+
+    For Example::
+        normalize([Value(2, ureg.millivolt), Value(0.005, ureg.volt), Value(3000, ureg.microvolt)], compact=True)
+        ValueArray([2., 5., 3.], millivolt)
+    """
+    if isinstance(unit, str) and unit not in units.conversion_modes:
+        unit = units.str_to_pint(unit)
+    if isinstance(values, ValueArray):
+        array = values
+    else:
+        array = ValueArray.from_values(values, None if isinstance(unit, str) else unit)
+    if unit is not None and (isinstance(unit, str) or array.unit != unit):
+        array = ValueArray(*units.convert(array.magnitude, array.unit, unit))
+    if compact:
+        magnitude = np.abs(array.magnitude[np.isfinite(array.magnitude) & (array.magnitude != 0)])
+        if magnitude.size > 0:
+            # the prefix of the median, so a few outliers do not set the prefix of the whole collection
+            _, display = units.convert(float(np.median(magnitude)), array.unit, 'compact')
+            if display != array.unit:
+                array = ValueArray(*units.convert(array.magnitude, array.unit, display))
+    return array
+
+
+def convert(values, target):
+    """
+    Converts each Value in values to the target with the cached conversion plans (see physics.units.convert), so there
+    is one plan lookup per unique unit instead of a Pint conversion per Value
+
+    Args:
+        values (iterable): The Values (or MetaValues) or a ValueArray
+        target (ureg.unit or str): The unit to convert to or one of 'base', 'reduced', 'compact' or 'simplify'
+
+    Returns:
+        np.ndarray with dtype=object of the converted Values, or a ValueArray if values is a ValueArray
+    """
+    # a Unit target is not compared to the mode strings, since Pint would parse each string to compare them
+    compact = isinstance(target, str) and target in ('compact', 'simplify')
+    if isinstance(values, ValueArray):
+        assert not compact, 'A ValueArray has one unit, so it can not be made compact'
+        return ValueArray(*units.convert(values.magnitude, values.unit, target))
+
+    values = np.asarray(values, dtype=object)
+    flat = values.ravel()
+    magnitude = np.array([v.magnitude for v in flat], dtype=np.float64)
+    groups = {}
+    for i, v in enumerate(flat):
+        groups.setdefault(v.unit, []).append(i)
+
+    result = np.empty(flat.shape, dtype=object)
+    for unit, index in groups.items():
+        if compact:
+            # the prefix depends on the magnitude, so each Value gets its own (cached) plan
+            for i in index:
+                result[i] = Value(*units.convert(magnitude[i], unit, target))
+        else:
+            group_magnitude, group_unit = units.convert(magnitude[index], unit, target)
+            for i, m in zip(index, group_magnitude):
+                result[i] = Value(float(m), group_unit)
+    return result.reshape(values.shape)
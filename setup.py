@@ -13,6 +13,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     # url="https://github.com/pypa/sampleproject",
     packages=setuptools.find_packages(),
+    package_data={'physics.materials': ['*.csv']},
     install_requires=['pint', 'numpy'],
     classifiers=[
         "Programming Language :: Python :: 3",